@@ -227,6 +227,78 @@ def _door_state() -> dict[str, Any]:
         return {"inside_unlocked": None, "outside_unlocked": None, "available": False}
 
 
+def _camera_health() -> dict[str, Any] | None:
+    """Camera health snapshot of the running videostream (None if no stream is running)."""
+    try:
+        from src.backend import model_handler  # lazy import
+        if model_handler is None:
+            return None
+        return model_handler.get_camera_health_snapshot()
+    except Exception as e:
+        logging.debug(f"[API] camera_health: {e}")
+        return None
+
+
+def _image_buffer_stats() -> dict[str, Any] | None:
+    """Occupancy and memory use of the image buffer."""
+    try:
+        from src.camera import image_buffer  # lazy import
+        return image_buffer.get_stats()
+    except Exception as e:
+        logging.debug(f"[API] image_buffer_stats: {e}")
+        return None
+
+
+def _pipeline_stats() -> dict[str, Any] | None:
+    """Stage timing and queue occupancy of the pipelined model loop (None in serial mode)."""
+    try:
+        from src.backend import model_handler  # lazy import
+        if model_handler is None:
+            return None
+        return model_handler.get_pipeline_stats()
+    except Exception as e:
+        logging.debug(f"[API] pipeline_stats: {e}")
+        return None
+
+
+def _cascade_stats() -> dict[str, Any] | None:
+    """Stage counters of the model cascade (None if it is not enabled)."""
+    try:
+        from src.backend import model_handler  # lazy import
+        if model_handler is None:
+            return None
+        return model_handler.get_cascade_stats()
+    except Exception as e:
+        logging.debug(f"[API] cascade_stats: {e}")
+        return None
+
+
+def _fps_governor_stats() -> dict[str, Any] | None:
+    """State of the processing rate governor (None if it is not enabled)."""
+    try:
+        from src.backend import model_handler  # lazy import
+        if model_handler is None:
+            return None
+        return model_handler.get_fps_governor_stats()
+    except Exception as e:
+        logging.debug(f"[API] fps_governor_stats: {e}")
+        return None
+
+
+def _autotune_state() -> dict[str, Any] | None:
+    """State of the inference auto-tuner and the stored choice of the active model (None if disabled)."""
+    try:
+        from src.baseconfig import CONFIG
+        if not CONFIG.get('AUTOTUNE_ENABLED', False):
+            return None
+        from src.autotune import auto_tuner  # lazy import
+        from src.backend import _active_model_identity
+        return auto_tuner.get_state(*_active_model_identity())
+    except Exception as e:
+        logging.debug(f"[API] autotune_state: {e}")
+        return None
+
+
 def _set_manual_override(key: str) -> None:
     """Set a flag in the backend's manual_door_override dict. Backend loop picks it up."""
     from src import backend  # lazy import
@@ -289,7 +361,16 @@ async def status(request: Request):
     _, err = await _auth_or_fail(request)
     if err:
         return err
-    return _ok({"door": _door_state(), "mode": _current_mode()})
+    return _ok({
+        "door": _door_state(),
+        "mode": _current_mode(),
+        "camera": _camera_health(),
+        "image_buffer": _image_buffer_stats(),
+        "pipeline": _pipeline_stats(),
+        "cascade": _cascade_stats(),
+        "fps_governor": _fps_governor_stats(),
+        "autotune": _autotune_state(),
+    })
 
 
 async def _door_action(request: Request, override_key: str, success_msg: str):
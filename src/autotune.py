@@ -0,0 +1,293 @@
+"""Automatic tuning of the inference threads and the YOLO image size per model and device.
+
+With AUTOTUNE_ENABLED, the backend asks the tuner once a minute (periodic_check). If
+there is no stored choice for the active model on this device (first setup, new or
+changed model), the tuner sweeps thread counts and image sizes with the offline
+benchmark (src/model_benchmark.py) in a background thread. A configuration only runs
+while the flap is idle, which the backend defines as no motion and the live model loop
+paused, so the measurements do not compete with live inference. When motion starts
+during a run, the benchmark process is terminated at once and the run is repeated
+later. With camera-based motion detection the live model never pauses, so the backend
+does not start the tuner (use tools/model_benchmark.py with the service stopped).
+
+Selection: of the configurations that reach AUTOTUNE_TARGET_FPS with a p95 latency of
+at most AUTOTUNE_TARGET_LATENCY_MS, the one with the best accuracy wins. Accuracy is
+the agreement of the detected classes per frame with the largest image size (the
+size the model was trained for); ties go to the larger image size, then to the lower
+CPU use. If nothing meets the targets, the fastest configuration is used.
+
+The choice is stored in models/cache/autotune.json per device fingerprint and model,
+and used by the backend when it creates the model handler. While the Pi reports
+thermal throttling, the choice is re-validated (at most every
+REVALIDATE_MIN_INTERVAL_S); if it no longer meets the targets, the sweep is repeated.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time as tm
+from typing import Any, Callable
+
+from src.baseconfig import CONFIG
+from src.helper import get_device_fingerprint, get_throttle_state
+from src.paths import models_cache_root
+
+AUTOTUNE_FILE = "autotune.json"
+REVALIDATE_MIN_INTERVAL_S = 1800.0
+MAX_IMGSZ_OPTIONS = 3
+MAX_RUN_ATTEMPTS = 3
+IDLE_WAIT_TIMEOUT_S = 3600.0
+
+
+def _read_json(path: str) -> dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+
+def _targets() -> tuple[float, float]:
+    try:
+        target_fps = float(CONFIG.get('AUTOTUNE_TARGET_FPS', 5.0))
+    except (TypeError, ValueError):
+        target_fps = 5.0
+    try:
+        target_latency_ms = float(CONFIG.get('AUTOTUNE_TARGET_LATENCY_MS', 250))
+    except (TypeError, ValueError):
+        target_latency_ms = 250.0
+    return target_fps, target_latency_ms
+
+
+def meets_targets(result: dict) -> bool:
+    target_fps, target_latency_ms = _targets()
+    return bool(result.get("ok")) and result["fps"] >= target_fps and result["p95_ms"] <= target_latency_ms
+
+
+def detection_agreement(result: dict, reference: dict) -> float:
+    """Share of frames with the same detected classes as the reference configuration."""
+    frames = list(zip(result.get("detections") or [], reference.get("detections") or []))
+    if not frames:
+        return 1.0
+    return sum(1 for a, b in frames if a == b) / len(frames)
+
+
+def select_configuration(results: list[dict]) -> dict | None:
+    """Pick the configuration to use from benchmark results (see module docstring)."""
+    results = [r for r in results if r.get("ok")]
+    if not results:
+        return None
+    reference = max(results, key=lambda r: (r["imgsz"], r["threads"]))
+    for result in results:
+        result["agreement"] = round(detection_agreement(result, reference), 3)
+    feasible = [r for r in results if meets_targets(r)]
+    if feasible:
+        return max(feasible, key=lambda r: (r["agreement"], r["imgsz"], -r["cpu_percent"]))
+    return max(results, key=lambda r: r["fps"])
+
+
+class AutoTuner:
+    """Sweeps, stores and re-validates the inference configuration of the active model."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._state = "idle"
+        self._last_error: str | None = None
+        self._fingerprint: dict | None = None
+        # Models without benchmarkable files are not retried until the next start
+        self._unsupported: set[str] = set()
+
+    # ---- stored choices ----
+
+    def _path(self) -> str:
+        return os.path.join(models_cache_root(), AUTOTUNE_FILE)
+
+    def fingerprint(self) -> dict:
+        if self._fingerprint is None:
+            self._fingerprint = get_device_fingerprint()
+        return self._fingerprint
+
+    @staticmethod
+    def _model_key(model_id: str, backend: str) -> str:
+        return f"{model_id}|{backend}"
+
+    def get_choice(self, model_id: str, backend: str) -> dict | None:
+        """Stored configuration (threads, imgsz, ...) of a model on this device."""
+        device = _read_json(self._path()).get(self.fingerprint()["id"], {})
+        return device.get("models", {}).get(self._model_key(model_id, backend))
+
+    def _store_choice(self, model_id: str, backend: str, choice: dict) -> None:
+        with self._lock:
+            store = _read_json(self._path())
+            device = store.setdefault(self.fingerprint()["id"], {"device": self.fingerprint(), "models": {}})
+            device.setdefault("models", {})[self._model_key(model_id, backend)] = choice
+            os.makedirs(models_cache_root(), exist_ok=True)
+            tmp = f"{self._path()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(store, f, indent=2)
+            os.replace(tmp, self._path())
+
+    # ---- background runs ----
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def get_state(self, model_id: str | None = None, backend: str | None = None) -> dict:
+        """Tuner state; with model_id and backend also the stored choice of that model."""
+        state = {"state": self._state, "running": self.is_running(), "last_error": self._last_error}
+        if model_id:
+            state["choice"] = self.get_choice(model_id, backend or "")
+        return state
+
+    def periodic_check(self, model_id: str, backend: str, is_idle: Callable[[], bool],
+                       on_choice: Callable[[dict], None]) -> None:
+        """Start a sweep or a re-validation in the background if needed.
+
+        is_idle() tells whether a benchmark run may start now; on_choice(choice) is called
+        when a new or changed configuration was stored.
+        """
+        if self.is_running() or not model_id or self._model_key(model_id, backend) in self._unsupported:
+            return
+        choice = self.get_choice(model_id, backend)
+        mode = None
+        if choice is None:
+            mode = "sweep"
+        else:
+            throttle = get_throttle_state()
+            throttled = bool(throttle and (throttle["throttled_now"] or throttle["soft_temp_limit_now"]))
+            validated_at = float(choice.get("validated_at") or choice.get("tuned_at") or 0.0)
+            if throttled and (tm.time() - validated_at) >= REVALIDATE_MIN_INTERVAL_S:
+                mode = "revalidate"
+        if mode is None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, args=(mode, model_id, backend, is_idle, on_choice), name="autotune", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, mode: str, model_id: str, backend: str, is_idle: Callable[[], bool],
+             on_choice: Callable[[dict], None]) -> None:
+        from src.model_benchmark import discover_models  # lazy import to avoid an import cycle with src.model
+
+        try:
+            specs = [s for s in discover_models([backend]) if str(s["model_id"]) == str(model_id)]
+            if not specs:
+                self._unsupported.add(self._model_key(model_id, backend))
+                logging.info(f"[MODEL] Auto-tuning: no benchmarkable files for model {model_id} ({backend})")
+                return
+            spec = specs[0]
+            previous = self.get_choice(model_id, backend)
+
+            if mode == "revalidate" and previous is not None:
+                self._state = "revalidating"
+                logging.info(
+                    f"[MODEL] Auto-tuning: thermal throttling detected, re-validating {previous['threads']} threads, "
+                    f"imgsz {previous['imgsz']}"
+                )
+                result = self._benchmark_when_idle(dict(spec, imgsz=previous["imgsz"], threads=previous["threads"]), is_idle)
+                if result is not None and meets_targets(result):
+                    previous.update(validated_at=tm.time(), throttled_fps=result["fps"], throttled_p95_ms=result["p95_ms"])
+                    self._store_choice(model_id, backend, previous)
+                    logging.info(f"[MODEL] Auto-tuning: configuration still meets the targets while throttled ({result['fps']:.1f} FPS)")
+                    return
+                if result is None:
+                    return
+
+            self._state = "sweeping"
+            results = []
+            for imgsz, threads in self._candidates(spec):
+                result = self._benchmark_when_idle(dict(spec, imgsz=imgsz, threads=threads), is_idle)
+                if result is None:
+                    return
+                if result.get("ok"):
+                    results.append(result)
+                    logging.info(
+                        f"[MODEL] Auto-tuning: {threads} threads, imgsz {result['imgsz']}: {result['fps']:.1f} FPS, "
+                        f"p95 {result['p95_ms']:.0f}ms, CPU {result['cpu_percent']:.0f}%"
+                    )
+                else:
+                    logging.info(f"[MODEL] Auto-tuning: {threads} threads, imgsz {imgsz} failed: {result.get('error')}")
+
+            best = select_configuration(results)
+            if best is None:
+                self._last_error = "no configuration could be benchmarked"
+                logging.warning(f"[MODEL] Auto-tuning: {self._last_error}")
+                return
+            try:
+                from src.model_benchmark import store_benchmark_results
+                store_benchmark_results(results, self.fingerprint())
+            except Exception as e:
+                logging.debug(f"[MODEL] Auto-tuning: failed to store benchmark results: {e}")
+
+            target_fps, target_latency_ms = _targets()
+            choice = {
+                "threads": int(best["threads"]),
+                "imgsz": int(best["imgsz"]),
+                "fps": best["fps"],
+                "p95_ms": best["p95_ms"],
+                "agreement": best["agreement"],
+                "meets_targets": meets_targets(best),
+                "target_fps": target_fps,
+                "target_latency_ms": target_latency_ms,
+                "tuned_at": tm.time(),
+                "validated_at": tm.time(),
+                "throttled": mode == "revalidate",
+            }
+            self._store_choice(model_id, backend, choice)
+            logging.info(
+                f"[MODEL] Auto-tuning result for {model_id} ({backend}): {choice['threads']} threads, imgsz "
+                f"{choice['imgsz']} ({choice['fps']:.1f} FPS, p95 {choice['p95_ms']:.0f}ms, agreement "
+                f"{choice['agreement'] * 100:.0f}%){'' if choice['meets_targets'] else ' - targets not reached'}"
+            )
+            if previous is None or (previous["threads"], previous["imgsz"]) != (choice["threads"], choice["imgsz"]):
+                on_choice(choice)
+        except Exception as e:
+            self._last_error = str(e)
+            logging.error(f"[MODEL] Auto-tuning failed: {e}")
+        finally:
+            self._state = "idle"
+
+    @staticmethod
+    def _candidates(spec: dict) -> list[tuple[int, int]]:
+        """(imgsz, threads) pairs to sweep: image sizes up to the model's size, thread counts up to all cores."""
+        from src.model import YoloModel  # lazy import to avoid an import cycle with src.model
+
+        cores = multiprocessing.cpu_count()
+        threads = sorted({t for t in (1, 2, 4, 8) if t <= cores} | {cores})
+        if spec["imgsz_options"]:
+            sizes = list(spec["imgsz_options"])
+        else:
+            model_imgsz = int(spec.get("model_imgsz") or 320)
+            sizes = sorted({s for s in YoloModel.get_supported_image_sizes() if s <= model_imgsz and s % 64 == 0} | {model_imgsz})
+            sizes = sizes[-MAX_IMGSZ_OPTIONS:]
+        return [(imgsz, t) for imgsz in sizes for t in threads]
+
+    def _benchmark_when_idle(self, spec: dict, is_idle: Callable[[], bool]) -> dict | None:
+        """Benchmark a configuration while the flap is idle; None if it never got an idle slot."""
+        from src.model_benchmark import run_benchmark
+
+        try:
+            seconds = max(1.0, float(CONFIG.get('AUTOTUNE_SECONDS', 5.0)))
+        except (TypeError, ValueError):
+            seconds = 5.0
+        for __ in range(MAX_RUN_ATTEMPTS):
+            waited = 0.0
+            while not is_idle():
+                if waited >= IDLE_WAIT_TIMEOUT_S:
+                    logging.info("[MODEL] Auto-tuning: no idle time at the flap, postponed")
+                    return None
+                tm.sleep(5.0)
+                waited += 5.0
+            result = run_benchmark(spec, seconds=seconds, abort=lambda: not is_idle())
+            if not result.get("aborted") and is_idle():
+                return result
+            logging.info("[MODEL] Auto-tuning: motion during the benchmark run, aborted it and repeating it later")
+        return None
+
+
+# Global auto-tuner instance
+auto_tuner = AutoTuner()
@@ -17,7 +17,9 @@ else:
 from src.camera import image_buffer
 from src.helper import sigterm_monitor, EventType, check_allowed_to_exit
 from src.event_timeline import TimelineAction, timeline_append
-from src.model import ModelHandler, YoloModel
+from src.model import ModelHandler, YoloModel, yolo_backend_for_device
+from src.autotune import auto_tuner
+from src.replay import ReplayEventTrack, ReplayPir, ReplayRfid
 from src.mqtt import MQTTClient, StatePublisher
 
 TAG_TIMEOUT = 30.0               # after 30 seconds, a detected tag is considered invalid
@@ -36,8 +38,32 @@ def _get_model_threads() -> int:
     return 1
 
 
+def _active_model_identity() -> tuple[str, str]:
+    """(model id, backend) of the configured model, as used by the auto-tuner."""
+    if CONFIG['TFLITE_MODEL_VERSION']:
+        return f"tflite::{CONFIG['TFLITE_MODEL_VERSION']}", "tflite"
+    device = str(CONFIG.get('INFERENCE_DEVICE', 'cpu') or 'cpu') if is_remote_mode() else 'cpu'
+    return str(CONFIG.get('YOLO_MODEL') or ''), yolo_backend_for_device(device)
+
+
+def _tuned_model_settings() -> dict | None:
+    """Threads and image size chosen by the auto-tuner for the configured model (None if not tuned)."""
+    if not CONFIG.get('AUTOTUNE_ENABLED', False):
+        return None
+    try:
+        model_id, backend = _active_model_identity()
+        return auto_tuner.get_choice(model_id, backend)
+    except Exception as e:
+        logging.warning(f"[BACKEND] Failed to read the auto-tuned model settings: {e}")
+        return None
+
+
 def _create_model_handler_from_config() -> ModelHandler:
     threads = _get_model_threads()
+    tuned = _tuned_model_settings()
+    if tuned:
+        threads = int(tuned['threads'])
+        logging.info(f"[BACKEND] Using auto-tuned model settings: {tuned['threads']} threads, image size {tuned['imgsz']}")
     if CONFIG['TFLITE_MODEL_VERSION']:
         logging.info(f"[BACKEND] Using TFLite model version {CONFIG['TFLITE_MODEL_VERSION']}")
         return ModelHandler(
@@ -51,6 +77,8 @@ def _create_model_handler_from_config() -> ModelHandler:
 
     yolo_model_path = YoloModel.get_model_path(CONFIG['YOLO_MODEL'])
     yolo_model_image_size = YoloModel.get_model_image_size(CONFIG['YOLO_MODEL'])
+    if tuned:
+        yolo_model_image_size = int(tuned['imgsz'])
     logging.info(f"[BACKEND] Using YOLO model {yolo_model_path}")
     return ModelHandler(
         model="yolo",
@@ -108,6 +136,18 @@ def reload_model_handler_runtime() -> tuple[bool, ModelHandler]:
             logging.error(f"[BACKEND] Failed to create new model handler: {e}")
             return False, model_handler
 
+        # Load and warm up the new model while the previous handler keeps processing frames,
+        # so the switch-over only costs the camera restart.
+        try:
+            next_handler.prepare()
+        except Exception as e:
+            logging.error(f"[BACKEND] Failed to load the new model, keeping the current one: {e}")
+            try:
+                next_handler.unload()
+            except Exception:
+                pass
+            return False, model_handler
+
         try:
             if previous_handler is not None:
                 previous_handler.stop()
@@ -128,6 +168,26 @@ def reload_model_handler_runtime() -> tuple[bool, ModelHandler]:
         logging.info("[BACKEND] Model handler reloaded successfully.")
         return True, model_handler
 
+
+def reload_model_handler_runtime_async(on_done=None) -> bool:
+    """Run reload_model_handler_runtime() in a background thread (e.g. from the backend loop).
+
+    Returns False if a reload is already in progress. on_done(ok) is called when it finished.
+    """
+    if _model_runtime_lock.locked():
+        return False
+
+    def _reload():
+        ok, __ = reload_model_handler_runtime()
+        if on_done is not None:
+            try:
+                on_done(ok)
+            except Exception as e:
+                logging.debug(f"[BACKEND] Model reload callback failed: {e}")
+
+    threading.Thread(target=_reload, name="model-reload", daemon=True).start()
+    return True
+
 # Global variable for manual door control
 manual_door_override = {'unlock_inside': False, 'unlock_outside': False, 'lock_inside': False, 'lock_outside': False}
 
@@ -365,6 +425,20 @@ def _set_per_cat_entry_verdict_flag(additional_verdict_infos, tag_id_valid):
     return new_flag
 
 
+def _load_replay_event_track() -> ReplayEventTrack | None:
+    """Return the PIR/RFID event track for a replay run, or None to use the regular sensors."""
+    if str(CONFIG.get('CAMERA_SOURCE') or '') != "replay":
+        return None
+    path = str(CONFIG.get('REPLAY_EVENTS_PATH') or '')
+    if not path:
+        return None
+    try:
+        return ReplayEventTrack.load(path)
+    except Exception as e:
+        logging.error(f"[BACKEND] Failed to load replay event track '{path}': {e}. Using the regular sensors.")
+        return None
+
+
 def backend_main(simulate_kittyflap = False):
 
     global manual_door_override
@@ -430,12 +504,19 @@ def backend_main(simulate_kittyflap = False):
     sigterm_monitor.register_task()
 
     # Initialize PIRs, Magnets and RFID
-    pir = Pir(simulate_kittyflap=simulate_kittyflap)
-    pir.init()
-    if DISABLE_RFID_READER_STARTUP:
-        rfid = Rfid(simulate_kittyflap=True)
+    replay_track = _load_replay_event_track()
+    if replay_track is not None:
+        # Replay with scripted inputs: PIR and RFID follow the event track instead of the hardware
+        pir = ReplayPir(replay_track)
+        pir.init()
+        rfid = ReplayRfid(replay_track, RfidRunState)
     else:
-        rfid = Rfid(simulate_kittyflap=simulate_kittyflap)
+        pir = Pir(simulate_kittyflap=simulate_kittyflap)
+        pir.init()
+        if DISABLE_RFID_READER_STARTUP:
+            rfid = Rfid(simulate_kittyflap=True)
+        else:
+            rfid = Rfid(simulate_kittyflap=simulate_kittyflap)
     magnets = Magnets(simulate_kittyflap=simulate_kittyflap)
     magnets.init()
 
@@ -565,6 +646,9 @@ def backend_main(simulate_kittyflap = False):
     low_fps_window_count = 0
     last_low_fps_check_mono = 0.0
     last_auto_model_recover_mono = 0.0
+    # Auto-tuning of threads and image size (AUTOTUNE_ENABLED)
+    last_autotune_check_mono = 0.0
+    autotune_skip_logged = False
         
     while not sigterm_monitor.stop_now:
         try:
@@ -576,7 +660,10 @@ def backend_main(simulate_kittyflap = False):
                     active_yolo_id = (CONFIG.get('YOLO_MODEL') or '').strip()
                     now_mono = monotonic_time()
                     now_wall = wall_time()
-                    if active_yolo_id and (now_mono - last_fps_metadata_write_mono) >= 60.0:
+                    # The idle rate of the FPS governor says nothing about the model's throughput
+                    governor_stats = model_handler.get_fps_governor_stats()
+                    governed = governor_stats is not None and governor_stats["state"] != "active"
+                    if active_yolo_id and not governed and (now_mono - last_fps_metadata_write_mono) >= 60.0:
                         effective_fps, fps_tm = model_handler.get_effective_fps_snapshot()
                         # Write only if we have a reasonably fresh measurement.
                         if effective_fps is not None and fps_tm and (now_wall - float(fps_tm)) <= 180.0:
@@ -618,6 +705,19 @@ def backend_main(simulate_kittyflap = False):
                             and (float(avg_inf_fps) < 1.0)
                         )
 
+                        if unhealthy:
+                            # Low inference throughput caused by the camera (stalled or low input FPS)
+                            # is handled by the camera health recovery; a model reload would not help.
+                            camera_health = model_handler.get_camera_health_snapshot() or {}
+                            camera_issues = set(camera_health.get("issues") or [])
+                            if camera_health.get("status") == "stalled" or "low_fps" in camera_issues:
+                                logging.info(
+                                    "[BACKEND] Low inference throughput, but the camera is the bottleneck "
+                                    f"(camera health: {camera_health.get('status')}, issues: {sorted(camera_issues)}). "
+                                    "Skipping model runtime reload."
+                                )
+                                unhealthy = False
+
                         if unhealthy:
                             low_fps_window_count += 1
                         else:
@@ -632,11 +732,16 @@ def backend_main(simulate_kittyflap = False):
                                 f"(effective={float(eff_fps):.2f} FPS, avg inference={float(avg_inf_fps):.2f} FPS). "
                                 "Reloading model runtime automatically."
                             )
-                            ok, __handler = reload_model_handler_runtime()
-                            if ok:
-                                logging.info("[BACKEND] Automatic model runtime reload completed.")
-                            else:
-                                logging.warning("[BACKEND] Automatic model runtime reload failed.")
+                            # The new model is loaded and warmed up in the background; the door
+                            # logic keeps running with the current handler meanwhile.
+                            def _on_auto_reload_done(ok):
+                                if ok:
+                                    logging.info("[BACKEND] Automatic model runtime reload completed.")
+                                else:
+                                    logging.warning("[BACKEND] Automatic model runtime reload failed.")
+
+                            if not reload_model_handler_runtime_async(_on_auto_reload_done):
+                                logging.info("[BACKEND] Model runtime reload already in progress.")
                             last_auto_model_recover_mono = now_mono
                             low_fps_window_count = 0
 
@@ -644,6 +749,34 @@ def backend_main(simulate_kittyflap = False):
             except Exception as e:
                 logging.debug(f"[BACKEND] Low-FPS auto-recovery check failed: {e}")
 
+            # Sweep/re-validate the inference settings of the active model in the background.
+            # Benchmark runs only start while there is no motion at the flap and the model loop is paused.
+            try:
+                now_mono = monotonic_time()
+                if CONFIG.get('AUTOTUNE_ENABLED', False) and (now_mono - last_autotune_check_mono) >= 60.0:
+                    last_autotune_check_mono = now_mono
+                    if CONFIG['USE_CAMERA_FOR_MOTION_DETECTION']:
+                        # The model loop is the motion detector here and never pauses
+                        if not autotune_skip_logged:
+                            logging.info("[BACKEND] Auto-tuning is not available with camera-based motion detection.")
+                            autotune_skip_logged = True
+                    else:
+                        autotune_skip_logged = False
+                        model_id, model_backend = _active_model_identity()
+
+                        def _on_autotune_choice(choice):
+                            logging.info("[BACKEND] Auto-tuned model settings changed. Reloading model runtime.")
+                            reload_model_handler_runtime_async()
+
+                        auto_tuner.periodic_check(
+                            model_id, model_backend,
+                            # Only while the live model loop is paused, so it does not compete with the benchmark
+                            is_idle=lambda: not image_buffer.is_motion_active() and not model_handler.get_run_state(),
+                            on_choice=_on_autotune_choice,
+                        )
+            except Exception as e:
+                logging.debug(f"[BACKEND] Auto-tuning check failed: {e}")
+
             # Decide if the camera or the PIR should be used for motion detection
             use_camera_for_motion = CONFIG['USE_CAMERA_FOR_MOTION_DETECTION']
 
@@ -681,6 +814,17 @@ def backend_main(simulate_kittyflap = False):
                 __, motion_inside, __, motion_inside_raw = pir.get_states()
             else:
                 motion_outside, motion_inside, motion_outside_raw, motion_inside_raw = pir.get_states()
+                # Optionally combine the outside PIR with the software motion signal of the camera:
+                # "or" catches motion the PIR misses, "and" suppresses PIR triggers without image motion.
+                software_motion_mode = str(CONFIG.get('SOFTWARE_MOTION_MODE', 'off') or 'off').strip().lower()
+                if software_motion_mode in ("or", "and"):
+                    software_motion = model_handler.get_software_motion()
+                    if software_motion is not None:
+                        sw = 1 if software_motion else 0
+                        if software_motion_mode == "or":
+                            motion_outside, motion_outside_raw = max(motion_outside, sw), max(motion_outside_raw, sw)
+                        else:
+                            motion_outside, motion_outside_raw = min(motion_outside, sw), min(motion_outside_raw, sw)
 
             # Update the motion timestamps
             if motion_outside == 1:
@@ -707,6 +851,16 @@ def backend_main(simulate_kittyflap = False):
                 motion_state["outside"] = motion_outside
                 motion_state["inside"] = motion_inside
 
+            # Frames of an active (or just ended) motion are retained; otherwise only the pre-roll is kept
+            image_buffer.set_motion_active(motion_outside == 1 or motion_inside == 1)
+
+            # Ramp up the capture framerate while the PIR sensors report motion
+            if motion_inside_raw == 1 or (not use_camera_for_motion and motion_outside_raw == 1):
+                try:
+                    model_handler.notify_capture_activity("pir")
+                except Exception:
+                    pass
+
             previous_tag_id = tag_id
             tag_id, tag_timestamp = rfid.get_tag()
 
@@ -787,47 +941,43 @@ def backend_main(simulate_kittyflap = False):
                         all_events += "," + str(info)
                 additional_verdict_infos = []
 
-                # Update the motion_block_id and the tag_id for for all elements between log_start_tm and last_motion_outside_tm
-                img_ids_for_motion_block = image_buffer.get_filtered_ids(log_start_tm, last_motion_outside_tm)
-                ids_exceeding_mouse_th = image_buffer.get_filtered_ids(log_start_tm, last_motion_outside_tm, min_mouse_probability=CONFIG['MIN_THRESHOLD'])
-                ids_exceeding_nomouse_th = image_buffer.get_filtered_ids(log_start_tm, last_motion_outside_tm, min_no_mouse_probability=CONFIG['MIN_THRESHOLD'])
-                ids_exceeding_own_cat_th = image_buffer.get_filtered_ids(log_start_tm, last_motion_outside_tm, min_own_cat_probability=CONFIG['MIN_THRESHOLD'])
+                # Assign the motion_block_id and the tag_id to all elements between log_start_tm and last_motion_outside_tm
+                # in one step. Prefer the tag_id from the RFID reader. If this is not available, fall back to the detected id from the video
+                motion_block = image_buffer.assign_block(
+                    motion_block_id, log_start_tm, last_motion_outside_tm,
+                    tag_id=tag_id if tag_id is not None else tag_id_from_video,
+                    threshold=CONFIG['MIN_THRESHOLD'],
+                )
+                count_exceeding_mouse_th = motion_block.count(image_buffer.FLAG_MOUSE)
+                count_exceeding_nomouse_th = motion_block.count(image_buffer.FLAG_NO_MOUSE)
+                count_exceeding_own_cat_th = motion_block.count(image_buffer.FLAG_OWN_CAT)
                 logging.info(f"""[BACKEND] {motion_source}-based motion detection: Detection summary:
-                                                            - {len(img_ids_for_motion_block)} elements in current motion block (between {first_motion_outside_tm} and {last_motion_outside_tm})
-                                                            - {len(ids_exceeding_mouse_th)} elements where "mouse" detection exceeded the min. logging threshold of {CONFIG['MIN_THRESHOLD']}
-                                                            - {len(ids_exceeding_nomouse_th)} elements where "no-mouse" detection exceeded the min. logging threshold of {CONFIG['MIN_THRESHOLD']}
-                                                            - {len(ids_exceeding_own_cat_th)} elements where "own cat" detection exceeded the min. logging threshold of {CONFIG['MIN_THRESHOLD']}
+                                                            - {len(motion_block)} elements in current motion block (between {first_motion_outside_tm} and {last_motion_outside_tm})
+                                                            - {count_exceeding_mouse_th} elements where "mouse" detection exceeded the min. logging threshold of {CONFIG['MIN_THRESHOLD']}
+                                                            - {count_exceeding_nomouse_th} elements where "no-mouse" detection exceeded the min. logging threshold of {CONFIG['MIN_THRESHOLD']}
+                                                            - {count_exceeding_own_cat_th} elements where "own cat" detection exceeded the min. logging threshold of {CONFIG['MIN_THRESHOLD']}
                                                             Event type: {all_events}
                                                             RFID tag: {tag_id or 'None'} 
                                                             Video tag: {tag_id_from_video or 'None'}""")
                 # Log all events to the database, where either the mouse threshold is exceeded, the no-mouse threshold is exceeded,
                 # or the own cat threshold is exceeded or a tag id was detected
                 # as well as all outgoing events
-                if ((len(ids_exceeding_mouse_th) + len(ids_exceeding_nomouse_th) +len(ids_exceeding_own_cat_th) > 0) or 
+                if ((count_exceeding_mouse_th + count_exceeding_nomouse_th + count_exceeding_own_cat_th > 0) or 
                     (event_type in [EventType.CAT_WENT_OUTSIDE]) or 
                     (tag_id is not None) or 
                     (tag_id_from_video is not None)):
-                    for element in img_ids_for_motion_block:
-                        image_buffer.update_block_id(element, motion_block_id)
-                        # Prefer the tag_id from the RFID reader. If this is not available, fall back to the detected id from the video
-                        if tag_id is not None:
-                            image_buffer.update_tag_id(element, tag_id)
-                        elif tag_id_from_video is not None:
-                            image_buffer.update_tag_id(element, tag_id_from_video)
-                    logging.info(f"[BACKEND] Minimal threshold exceeded or tag ID detected. Images will be written to the database. Updated block ID for {len(img_ids_for_motion_block)} elements to '{motion_block_id}' and tag ID to '{tag_id if tag_id is not None else ''}'")
+                    logging.info(f"[BACKEND] Minimal threshold exceeded or tag ID detected. Images will be written to the database. Updated block ID for {len(motion_block)} elements to '{motion_block_id}' and tag ID to '{tag_id if tag_id is not None else ''}'")
                     timeline_snapshot = list(motion_timeline_entries)
                     db_thread = threading.Thread(
                         target=write_motion_block_to_db,
                         args=(CONFIG['KITTYHACK_DATABASE_PATH'], motion_block_id, all_events),
-                        kwargs={"timeline_entries": timeline_snapshot},
+                        kwargs={"timeline_entries": timeline_snapshot, "block_snapshot": motion_block},
                         daemon=True,
                     )
                     db_thread.start()
                 else:
                     logging.info(f"[BACKEND] No elements found that exceed the minimal threshold '{CONFIG['MIN_THRESHOLD']}' and no tag ID was detected. No database entry will be created.")
-                    if len(img_ids_for_motion_block) > 0:
-                        for element in img_ids_for_motion_block:
-                            image_buffer.delete_by_id(element)
+                    image_buffer.delete_block(motion_block_id)
                 
                 # Reset the first motion timestamps
                 first_motion_outside_tm = 0.0
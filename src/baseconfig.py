@@ -250,6 +250,49 @@ DEFAULT_CONFIG = {
         "ip_camera_target_resolution": "640x360",
         "ip_camera_pipeline_fps_limit": 10,
         "ip_camera_hw_decode": "auto",
+        "adaptive_capture_framerate": False,
+        "capture_idle_framerate": 2,
+        "capture_active_hold_s": 10.0,
+        "inference_roi_enabled": False,
+        "inference_roi": "",
+        "motion_prefilter_enabled": False,
+        "motion_prefilter_static_interval_s": 2.0,
+        "software_motion_mode": "off",
+        "replay_path": "",
+        "replay_rate": "realtime",
+        "replay_loop": False,
+        "replay_events_path": "",
+        "image_buffer_preroll_s": 10.0,
+        "image_buffer_max_mb": 64,
+        "pipelined_inference": False,
+        "pipeline_input_queue_size": 2,
+        "pipeline_output_queue_size": 8,
+        "yolo_worker_ring_slots": 3,
+        "inference_workers": "1",
+        "inference_threads_per_worker": 0,
+        "inference_worker_dispatch": "least_loaded",
+        "inference_batch_max": 1,
+        "inference_batch_latency_ms": 300,
+        "detection_min_probability": 0.0,
+        "cascade_enabled": False,
+        "cascade_gate_imgsz": 160,
+        "cascade_gate_threshold": 30.0,
+        "cascade_hold_s": 3.0,
+        "cascade_trigger": "gate_or_motion",
+        "model_cache_enabled": True,
+        "model_cache_max_entries": 8,
+        "model_warmup_frames": 3,
+        "autotune_enabled": False,
+        "autotune_target_fps": 5.0,
+        "autotune_target_latency_ms": 250,
+        "autotune_seconds": 5.0,
+        "fps_governor_enabled": False,
+        "fps_governor_idle_fps": 3.0,
+        "fps_governor_hot_idle_fps": 1.0,
+        "fps_governor_idle_after_s": 10.0,
+        "fps_governor_temp_high_c": 70.0,
+        "fps_governor_temp_low_c": 65.0,
+        "fps_governor_latency_factor": 1.5,
         "mqtt_device_id": "",
         "mqtt_broker_address": "",
         "mqtt_broker_port": 1883,
@@ -528,6 +571,49 @@ def load_config():
             "IP_CAMERA_HW_DECODE",
             d.get('ip_camera_hw_decode', "auto"),
         ),
+        "ADAPTIVE_CAPTURE_FRAMERATE": safe_bool("ADAPTIVE_CAPTURE_FRAMERATE", d.get('adaptive_capture_framerate', False)),
+        "CAPTURE_IDLE_FRAMERATE": safe_int("CAPTURE_IDLE_FRAMERATE", int(d.get('capture_idle_framerate', 2))),
+        "CAPTURE_ACTIVE_HOLD_S": safe_float("CAPTURE_ACTIVE_HOLD_S", float(d.get('capture_active_hold_s', 10.0))),
+        "INFERENCE_ROI_ENABLED": safe_bool("INFERENCE_ROI_ENABLED", d.get('inference_roi_enabled', False)),
+        "INFERENCE_ROI": safe_str("INFERENCE_ROI", d.get('inference_roi', '')),
+        "MOTION_PREFILTER_ENABLED": safe_bool("MOTION_PREFILTER_ENABLED", d.get('motion_prefilter_enabled', False)),
+        "MOTION_PREFILTER_STATIC_INTERVAL_S": safe_float("MOTION_PREFILTER_STATIC_INTERVAL_S", float(d.get('motion_prefilter_static_interval_s', 2.0))),
+        "SOFTWARE_MOTION_MODE": safe_str("SOFTWARE_MOTION_MODE", d.get('software_motion_mode', 'off')),
+        "REPLAY_PATH": safe_str("REPLAY_PATH", d.get('replay_path', '')),
+        "REPLAY_RATE": safe_str("REPLAY_RATE", d.get('replay_rate', 'realtime')),
+        "REPLAY_LOOP": safe_bool("REPLAY_LOOP", d.get('replay_loop', False)),
+        "REPLAY_EVENTS_PATH": safe_str("REPLAY_EVENTS_PATH", d.get('replay_events_path', '')),
+        "IMAGE_BUFFER_PREROLL_S": safe_float("IMAGE_BUFFER_PREROLL_S", float(d.get('image_buffer_preroll_s', 10.0))),
+        "IMAGE_BUFFER_MAX_MB": safe_int("IMAGE_BUFFER_MAX_MB", int(d.get('image_buffer_max_mb', 64))),
+        "PIPELINED_INFERENCE": safe_bool("PIPELINED_INFERENCE", d.get('pipelined_inference', False)),
+        "PIPELINE_INPUT_QUEUE_SIZE": safe_int("PIPELINE_INPUT_QUEUE_SIZE", int(d.get('pipeline_input_queue_size', 2))),
+        "PIPELINE_OUTPUT_QUEUE_SIZE": safe_int("PIPELINE_OUTPUT_QUEUE_SIZE", int(d.get('pipeline_output_queue_size', 8))),
+        "YOLO_WORKER_RING_SLOTS": safe_int("YOLO_WORKER_RING_SLOTS", int(d.get('yolo_worker_ring_slots', 3))),
+        "INFERENCE_WORKERS": safe_str("INFERENCE_WORKERS", d.get('inference_workers', '1')),
+        "INFERENCE_THREADS_PER_WORKER": safe_int("INFERENCE_THREADS_PER_WORKER", int(d.get('inference_threads_per_worker', 0))),
+        "INFERENCE_WORKER_DISPATCH": safe_str("INFERENCE_WORKER_DISPATCH", d.get('inference_worker_dispatch', 'least_loaded')),
+        "INFERENCE_BATCH_MAX": safe_int("INFERENCE_BATCH_MAX", int(d.get('inference_batch_max', 1))),
+        "INFERENCE_BATCH_LATENCY_MS": safe_int("INFERENCE_BATCH_LATENCY_MS", int(d.get('inference_batch_latency_ms', 300))),
+        "DETECTION_MIN_PROBABILITY": safe_float("DETECTION_MIN_PROBABILITY", float(d.get('detection_min_probability', 0.0))),
+        "CASCADE_ENABLED": safe_bool("CASCADE_ENABLED", d.get('cascade_enabled', False)),
+        "CASCADE_GATE_IMGSZ": safe_int("CASCADE_GATE_IMGSZ", int(d.get('cascade_gate_imgsz', 160))),
+        "CASCADE_GATE_THRESHOLD": safe_float("CASCADE_GATE_THRESHOLD", float(d.get('cascade_gate_threshold', 30.0))),
+        "CASCADE_HOLD_S": safe_float("CASCADE_HOLD_S", float(d.get('cascade_hold_s', 3.0))),
+        "CASCADE_TRIGGER": safe_str("CASCADE_TRIGGER", d.get('cascade_trigger', 'gate_or_motion')),
+        "MODEL_CACHE_ENABLED": safe_bool("MODEL_CACHE_ENABLED", d.get('model_cache_enabled', True)),
+        "MODEL_CACHE_MAX_ENTRIES": safe_int("MODEL_CACHE_MAX_ENTRIES", int(d.get('model_cache_max_entries', 8))),
+        "MODEL_WARMUP_FRAMES": safe_int("MODEL_WARMUP_FRAMES", int(d.get('model_warmup_frames', 3))),
+        "AUTOTUNE_ENABLED": safe_bool("AUTOTUNE_ENABLED", d.get('autotune_enabled', False)),
+        "AUTOTUNE_TARGET_FPS": safe_float("AUTOTUNE_TARGET_FPS", float(d.get('autotune_target_fps', 5.0))),
+        "AUTOTUNE_TARGET_LATENCY_MS": safe_int("AUTOTUNE_TARGET_LATENCY_MS", int(d.get('autotune_target_latency_ms', 250))),
+        "AUTOTUNE_SECONDS": safe_float("AUTOTUNE_SECONDS", float(d.get('autotune_seconds', 5.0))),
+        "FPS_GOVERNOR_ENABLED": safe_bool("FPS_GOVERNOR_ENABLED", d.get('fps_governor_enabled', False)),
+        "FPS_GOVERNOR_IDLE_FPS": safe_float("FPS_GOVERNOR_IDLE_FPS", float(d.get('fps_governor_idle_fps', 3.0))),
+        "FPS_GOVERNOR_HOT_IDLE_FPS": safe_float("FPS_GOVERNOR_HOT_IDLE_FPS", float(d.get('fps_governor_hot_idle_fps', 1.0))),
+        "FPS_GOVERNOR_IDLE_AFTER_S": safe_float("FPS_GOVERNOR_IDLE_AFTER_S", float(d.get('fps_governor_idle_after_s', 10.0))),
+        "FPS_GOVERNOR_TEMP_HIGH_C": safe_float("FPS_GOVERNOR_TEMP_HIGH_C", float(d.get('fps_governor_temp_high_c', 70.0))),
+        "FPS_GOVERNOR_TEMP_LOW_C": safe_float("FPS_GOVERNOR_TEMP_LOW_C", float(d.get('fps_governor_temp_low_c', 65.0))),
+        "FPS_GOVERNOR_LATENCY_FACTOR": safe_float("FPS_GOVERNOR_LATENCY_FACTOR", float(d.get('fps_governor_latency_factor', 1.5))),
         "MQTT_DEVICE_ID": safe_str("MQTT_DEVICE_ID", d['mqtt_device_id']),
         "MQTT_BROKER_ADDRESS": safe_str("MQTT_BROKER_ADDRESS", d['mqtt_broker_address']),
         "MQTT_BROKER_PORT": safe_int("MQTT_BROKER_PORT", int(d['mqtt_broker_port'])),
@@ -696,6 +782,49 @@ def save_config():
     settings['ip_camera_target_resolution'] = CONFIG.get('IP_CAMERA_TARGET_RESOLUTION', '640x360')
     settings['ip_camera_pipeline_fps_limit'] = int(CONFIG.get('IP_CAMERA_PIPELINE_FPS_LIMIT', 10) or 10)
     settings['ip_camera_hw_decode'] = CONFIG.get('IP_CAMERA_HW_DECODE', 'auto')
+    settings['adaptive_capture_framerate'] = CONFIG.get('ADAPTIVE_CAPTURE_FRAMERATE', False)
+    settings['capture_idle_framerate'] = CONFIG.get('CAPTURE_IDLE_FRAMERATE', 2)
+    settings['capture_active_hold_s'] = CONFIG.get('CAPTURE_ACTIVE_HOLD_S', 10.0)
+    settings['inference_roi_enabled'] = CONFIG.get('INFERENCE_ROI_ENABLED', False)
+    settings['inference_roi'] = CONFIG.get('INFERENCE_ROI', '')
+    settings['motion_prefilter_enabled'] = CONFIG.get('MOTION_PREFILTER_ENABLED', False)
+    settings['motion_prefilter_static_interval_s'] = CONFIG.get('MOTION_PREFILTER_STATIC_INTERVAL_S', 2.0)
+    settings['software_motion_mode'] = CONFIG.get('SOFTWARE_MOTION_MODE', 'off')
+    settings['replay_path'] = CONFIG.get('REPLAY_PATH', '')
+    settings['replay_rate'] = CONFIG.get('REPLAY_RATE', 'realtime')
+    settings['replay_loop'] = CONFIG.get('REPLAY_LOOP', False)
+    settings['replay_events_path'] = CONFIG.get('REPLAY_EVENTS_PATH', '')
+    settings['image_buffer_preroll_s'] = CONFIG.get('IMAGE_BUFFER_PREROLL_S', 10.0)
+    settings['image_buffer_max_mb'] = CONFIG.get('IMAGE_BUFFER_MAX_MB', 64)
+    settings['pipelined_inference'] = CONFIG.get('PIPELINED_INFERENCE', False)
+    settings['pipeline_input_queue_size'] = CONFIG.get('PIPELINE_INPUT_QUEUE_SIZE', 2)
+    settings['pipeline_output_queue_size'] = CONFIG.get('PIPELINE_OUTPUT_QUEUE_SIZE', 8)
+    settings['yolo_worker_ring_slots'] = CONFIG.get('YOLO_WORKER_RING_SLOTS', 3)
+    settings['inference_workers'] = CONFIG.get('INFERENCE_WORKERS', '1')
+    settings['inference_threads_per_worker'] = CONFIG.get('INFERENCE_THREADS_PER_WORKER', 0)
+    settings['inference_worker_dispatch'] = CONFIG.get('INFERENCE_WORKER_DISPATCH', 'least_loaded')
+    settings['inference_batch_max'] = CONFIG.get('INFERENCE_BATCH_MAX', 1)
+    settings['inference_batch_latency_ms'] = CONFIG.get('INFERENCE_BATCH_LATENCY_MS', 300)
+    settings['detection_min_probability'] = CONFIG.get('DETECTION_MIN_PROBABILITY', 0.0)
+    settings['cascade_enabled'] = CONFIG.get('CASCADE_ENABLED', False)
+    settings['cascade_gate_imgsz'] = CONFIG.get('CASCADE_GATE_IMGSZ', 160)
+    settings['cascade_gate_threshold'] = CONFIG.get('CASCADE_GATE_THRESHOLD', 30.0)
+    settings['cascade_hold_s'] = CONFIG.get('CASCADE_HOLD_S', 3.0)
+    settings['cascade_trigger'] = CONFIG.get('CASCADE_TRIGGER', 'gate_or_motion')
+    settings['model_cache_enabled'] = CONFIG.get('MODEL_CACHE_ENABLED', True)
+    settings['model_cache_max_entries'] = CONFIG.get('MODEL_CACHE_MAX_ENTRIES', 8)
+    settings['model_warmup_frames'] = CONFIG.get('MODEL_WARMUP_FRAMES', 3)
+    settings['autotune_enabled'] = CONFIG.get('AUTOTUNE_ENABLED', False)
+    settings['autotune_target_fps'] = CONFIG.get('AUTOTUNE_TARGET_FPS', 5.0)
+    settings['autotune_target_latency_ms'] = CONFIG.get('AUTOTUNE_TARGET_LATENCY_MS', 250)
+    settings['autotune_seconds'] = CONFIG.get('AUTOTUNE_SECONDS', 5.0)
+    settings['fps_governor_enabled'] = CONFIG.get('FPS_GOVERNOR_ENABLED', False)
+    settings['fps_governor_idle_fps'] = CONFIG.get('FPS_GOVERNOR_IDLE_FPS', 3.0)
+    settings['fps_governor_hot_idle_fps'] = CONFIG.get('FPS_GOVERNOR_HOT_IDLE_FPS', 1.0)
+    settings['fps_governor_idle_after_s'] = CONFIG.get('FPS_GOVERNOR_IDLE_AFTER_S', 10.0)
+    settings['fps_governor_temp_high_c'] = CONFIG.get('FPS_GOVERNOR_TEMP_HIGH_C', 70.0)
+    settings['fps_governor_temp_low_c'] = CONFIG.get('FPS_GOVERNOR_TEMP_LOW_C', 65.0)
+    settings['fps_governor_latency_factor'] = CONFIG.get('FPS_GOVERNOR_LATENCY_FACTOR', 1.5)
     settings['mqtt_device_id'] = CONFIG['MQTT_DEVICE_ID']
     settings['mqtt_broker_address'] = CONFIG['MQTT_BROKER_ADDRESS']
     settings['mqtt_broker_port'] = CONFIG['MQTT_BROKER_PORT']
@@ -11,10 +11,14 @@ import re
 import shlex
 import threading
 import logging
+import copy
 import time as tm
+from collections import OrderedDict, deque
+from dataclasses import dataclass
 from typing import List, Optional
 from src.baseconfig import CONFIG
 from src.system import ensure_ffmpeg_installed
+from src.replay import REPLAY_RATE_FAST, REPLAY_RATE_REALTIME, iter_replay_frames, parse_replay_rate, replay_clock, replay_source_kind
 
 
 def encode_frame_jpg(frame: np.ndarray, jpeg_quality: int = 75) -> bytes:
@@ -26,6 +30,43 @@ def encode_frame_jpg(frame: np.ndarray, jpeg_quality: int = 75) -> bytes:
     return buffer.tobytes()
 
 
+def reduced_decode_factor(frame_w: int, frame_h: int, target_w: int, target_h: int, keep_aspect: bool = True) -> int:
+    """Return the largest JPEG DCT scale factor (1, 2, 4 or 8) that still covers the model input.
+
+    keep_aspect=True matches letterboxed inputs (YOLO), False matches stretched inputs (TFLite).
+    """
+    try:
+        if frame_w <= 0 or frame_h <= 0 or target_w <= 0 or target_h <= 0:
+            return 1
+        sx = float(target_w) / float(frame_w)
+        sy = float(target_h) / float(frame_h)
+        needed_scale = min(sx, sy) if keep_aspect else max(sx, sy)
+        for factor in (8, 4, 2):
+            if 1.0 / factor >= needed_scale:
+                return factor
+    except Exception:
+        pass
+    return 1
+
+
+def inference_frame_size(frame_w: int, frame_h: int, target_w: int, target_h: int, keep_aspect: bool = True) -> tuple[int, int]:
+    """Return the frame size the model actually consumes for a given model input size."""
+    if not keep_aspect:
+        return int(target_w), int(target_h)
+    scale = min(float(target_w) / float(frame_w), float(target_h) / float(frame_h), 1.0)
+    # Even dimensions keep FFmpeg scalers and chroma subsampling happy.
+    width = max(2, int(round(frame_w * scale / 2.0)) * 2)
+    height = max(2, int(round(frame_h * scale / 2.0)) * 2)
+    return width, height
+
+
+_REDUCED_DECODE_FLAGS = {
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
 def resolve_ip_camera_hw_decode(mode: str) -> str:
     """Resolve configured hw-decode mode to a concrete backend (or 'none')."""
     normalized = str(mode or "auto").strip().lower()
@@ -76,8 +117,14 @@ def build_ip_camera_ffmpeg_cmd(
     target_h: int,
     _fps_limit: int,
     hw_decode: str,
+    inference_size: tuple[int, int] | None = None,
+    inference_fd: int | None = None,
 ) -> tuple[list[str], str]:
-    """Build an FFmpeg decode+scale command for IP camera raw BGR output."""
+    """Build an FFmpeg decode+scale command for IP camera raw BGR output.
+
+    If inference_size and inference_fd are given, a second raw BGR output at the
+    model input size is written to that file descriptor (dual-output mode).
+    """
     hw = resolve_ip_camera_hw_decode(hw_decode)
 
     ffmpeg_cmd = [
@@ -120,6 +167,28 @@ def build_ip_camera_ffmpeg_cmd(
         vf_arg = f"scale={target_w}:{target_h}:flags=fast_bilinear"
         hw_label = "software"
 
+    if inference_size and inference_fd is not None:
+        inf_w, inf_h = inference_size
+        ffmpeg_cmd.extend([
+            "-i", ip_camera_url,
+            "-an",
+            "-sn",
+            "-dn",
+            "-filter_complex",
+            f"[0:v]{vf_arg},split=2[full][inf];[inf]scale={inf_w}:{inf_h}:flags=area,format=bgr24[small]",
+            "-map", "[full]",
+            "-pix_fmt", "bgr24",
+            "-f", "rawvideo",
+            "-flush_packets", "1",
+            "pipe:1",
+            "-map", "[small]",
+            "-pix_fmt", "bgr24",
+            "-f", "rawvideo",
+            "-flush_packets", "1",
+            f"pipe:{inference_fd}",
+        ])
+        return ffmpeg_cmd, hw_label
+
     ffmpeg_cmd.extend([
         "-i", ip_camera_url,
         "-an",
@@ -133,6 +202,755 @@ def build_ip_camera_ffmpeg_cmd(
     return ffmpeg_cmd, hw_label
 
 
+class CameraFrame:
+    """A captured frame holding the original JPEG bytes and/or a decoded BGR array.
+
+    Frames from MJPEG sources keep the camera-encoded JPEG and decode it only when
+    the array is actually requested. Frames from raw sources (e.g. the FFmpeg BGR
+    pipeline) carry only the array and are encoded on first JPEG request.
+
+    In dual-output mode a frame also provides a reduced-resolution array for
+    inference (inference_array()). Full and reduced images share frame_id and the
+    capture timestamps.
+
+    Frames distributed over a FrameBus are reference counted: once the last holder
+    releases a frame, its cached derivatives (decoded arrays, re-encoded JPEGs) are
+    dropped and only the original JPEG bytes are kept.
+    """
+
+    __slots__ = (
+        "frame_id", "timestamp", "timestamp_mono", "size", "motion_score", "motion",
+        "_jpeg", "_from_jpeg", "_array", "_jpeg_quality", "_small", "_reduce_factor", "_derivatives", "_refs", "_lock",
+    )
+
+    def __init__(
+        self,
+        jpeg: bytes | None = None,
+        array: np.ndarray | None = None,
+        jpeg_quality: int | None = None,
+        small_array: np.ndarray | None = None,
+        reduce_factor: int = 1,
+        size: tuple[int, int] | None = None,
+    ):
+        if jpeg is None and array is None:
+            raise ValueError("CameraFrame requires JPEG bytes or a decoded array")
+        self.frame_id = 0
+        self.timestamp = tm.time()
+        self.timestamp_mono = tm.monotonic()
+        # Set by the MotionDetector at capture time (None if motion detection is off).
+        self.motion_score: float | None = None
+        self.motion: bool | None = None
+        self._jpeg = jpeg
+        # Arrays of JPEG-sourced frames can always be re-decoded, so they may be dropped on release.
+        self._from_jpeg = jpeg is not None
+        self._array = array
+        self._jpeg_quality = jpeg_quality if jpeg is not None else None
+        self._small = small_array
+        self._reduce_factor = int(reduce_factor) if int(reduce_factor or 1) in (1, 2, 4, 8) else 1
+        # (width, height) of the full-resolution image; known upfront for raw frames.
+        self.size = (int(array.shape[1]), int(array.shape[0])) if array is not None else (tuple(size) if size else None)
+        self._derivatives: dict[tuple, bytes] = {}
+        self._refs = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> "CameraFrame":
+        """Take a reference on the frame (used by FrameBus deliveries)."""
+        with self._lock:
+            self._refs += 1
+        return self
+
+    def release(self) -> None:
+        """Drop a reference. The last release frees cached derivatives of a JPEG-backed frame."""
+        with self._lock:
+            self._refs = max(0, self._refs - 1)
+            if self._refs == 0:
+                self._derivatives.clear()
+                if self._from_jpeg:
+                    self._array = None
+                    self._small = None
+
+    @property
+    def has_jpeg(self) -> bool:
+        """True if the frame carries JPEG bytes (original or previously encoded)."""
+        return self._jpeg is not None
+
+    def array(self) -> Optional[np.ndarray]:
+        """Return the decoded BGR array, decoding the JPEG on first access."""
+        decoded = self._array
+        if decoded is not None:
+            return decoded
+        with self._lock:
+            if self._array is None and self._jpeg is not None:
+                decoded = cv2.imdecode(np.frombuffer(self._jpeg, np.uint8), cv2.IMREAD_COLOR)
+                if decoded is None:
+                    logging.error("[CAMERA] Failed to decode frame")
+                    return None
+                self._array = decoded
+            return self._array
+
+    def inference_array(self) -> Optional[np.ndarray]:
+        """Return the reduced-resolution BGR array intended for model inference.
+
+        JPEG frames are decoded directly at 1/2, 1/4 or 1/8 scale (DCT scaling), which
+        is much cheaper than a full decode followed by a resize. Falls back to the
+        full-resolution array if no reduction is configured.
+        """
+        small = self._small
+        if small is not None:
+            return small
+        if self._reduce_factor <= 1:
+            return self.array()
+        with self._lock:
+            if self._small is None:
+                if self._array is None and self._jpeg is not None:
+                    self._small = cv2.imdecode(
+                        np.frombuffer(self._jpeg, np.uint8),
+                        _REDUCED_DECODE_FLAGS[self._reduce_factor],
+                    )
+                elif self._array is not None:
+                    h, w = self._array.shape[:2]
+                    self._small = cv2.resize(
+                        self._array,
+                        (max(1, w // self._reduce_factor), max(1, h // self._reduce_factor)),
+                        interpolation=cv2.INTER_AREA,
+                    )
+            small = self._small
+        return small if small is not None else self.array()
+
+    def region_array(
+        self,
+        box: tuple[float, float, float, float],
+        target_size: tuple[int, int] | None = None,
+        keep_aspect: bool = True,
+    ) -> Optional[np.ndarray]:
+        """Return the BGR crop of a region given as fractions (x0, y0, x1, y1) of the full frame.
+
+        The source resolution is chosen so that the crop still covers target_size: the
+        reduced inference array or a reduced JPEG decode when the region is large
+        enough, otherwise the full-resolution array. The crop is not cached.
+        """
+        x0, y0, x1, y1 = (min(1.0, max(0.0, float(v))) for v in box)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        size = self.size
+        factor = 1
+        if size is not None and target_size:
+            crop_w = max(1, int(size[0] * (x1 - x0)))
+            crop_h = max(1, int(size[1] * (y1 - y0)))
+            factor = reduced_decode_factor(crop_w, crop_h, int(target_size[0]), int(target_size[1]), keep_aspect)
+        source = None
+        if factor > 1:
+            if factor == self._reduce_factor:
+                source = self.inference_array()
+            elif self._array is None and self._jpeg is not None:
+                source = cv2.imdecode(np.frombuffer(self._jpeg, np.uint8), _REDUCED_DECODE_FLAGS[factor])
+        if source is None:
+            source = self.array()
+        if source is None:
+            return None
+        h, w = source.shape[:2]
+        left, top = int(round(x0 * w)), int(round(y0 * h))
+        right, bottom = max(left + 1, int(round(x1 * w))), max(top + 1, int(round(y1 * h)))
+        return source[top:bottom, left:right]
+
+    def encoded(self, max_size: int | None = None, jpeg_quality: int | None = None) -> bytes:
+        """Return a JPEG derivative whose longer side is at most max_size pixels.
+
+        Derivatives are computed once per (max_size, quality) and shared by all
+        consumers of this frame. Without a size limit (or if the frame is already
+        small enough) this is the same as jpeg().
+        """
+        size = self.size
+        if size is None:
+            decoded = self.array()
+            if decoded is None:
+                raise RuntimeError("No decodable image data in frame")
+            size = (int(decoded.shape[1]), int(decoded.shape[0]))
+            self.size = size
+        if not max_size or max(size) <= int(max_size):
+            return self.jpeg(jpeg_quality)
+
+        quality = max(1, min(100, int(jpeg_quality if jpeg_quality is not None else (self._jpeg_quality or 75))))
+        key = (int(max_size), quality)
+        cached = self._derivatives.get(key)
+        if cached is not None:
+            return cached
+
+        ratio = max(size) / float(max_size)
+        target = (max(1, int(size[0] / ratio)), max(1, int(size[1] / ratio)))
+        source = None
+        if self._array is None and self._jpeg is not None:
+            # Decode at reduced scale when that still covers the requested size.
+            factor = reduced_decode_factor(size[0], size[1], target[0], target[1], keep_aspect=False)
+            if factor > 1:
+                source = cv2.imdecode(np.frombuffer(self._jpeg, np.uint8), _REDUCED_DECODE_FLAGS[factor])
+        if source is None:
+            source = self.array()
+        if source is None:
+            raise RuntimeError("No decodable image data in frame")
+        if (source.shape[1], source.shape[0]) != target:
+            source = cv2.resize(source, target, interpolation=cv2.INTER_AREA)
+        encoded = encode_frame_jpg(source, jpeg_quality=quality)
+        with self._lock:
+            self._derivatives[key] = encoded
+        return encoded
+
+    def jpeg(self, jpeg_quality: int | None = None) -> bytes:
+        """Return JPEG bytes for this frame.
+
+        The original camera JPEG is returned as-is unless a different quality is
+        explicitly requested. Raw frames are encoded once and the result is cached.
+        """
+        if self._jpeg is not None and (jpeg_quality is None or self._jpeg_quality is None or int(jpeg_quality) == self._jpeg_quality):
+            return self._jpeg
+        frame = self.array()
+        if frame is None:
+            raise RuntimeError("No decodable image data in frame")
+        quality = max(1, min(100, 75 if jpeg_quality is None else int(jpeg_quality)))
+        key = (None, quality)
+        cached = self._derivatives.get(key)
+        if cached is not None:
+            return cached
+        encoded = encode_frame_jpg(frame, jpeg_quality=quality)
+        with self._lock:
+            if self._jpeg is None:
+                self._jpeg = encoded
+                self._jpeg_quality = quality
+            else:
+                self._derivatives[key] = encoded
+        return encoded
+
+
+class FrameSubscription:
+    """A subscriber queue on a FrameBus.
+
+    Holds at most max_pending frames. When the consumer falls behind, the oldest
+    pending frame is dropped (and counted), so a slow subscriber never stalls capture.
+    Frames returned by get() carry a reference that the caller must release().
+    """
+
+    def __init__(self, bus: "FrameBus", name: str, max_pending: int = 1):
+        self.bus = bus
+        self.name = name
+        self.max_pending = max(1, int(max_pending))
+        self.delivered = 0
+        self.dropped = 0
+        self.closed = False
+        self._pending: deque = deque()
+        self._cond = threading.Condition()
+
+    def _offer(self, frame: CameraFrame) -> None:
+        with self._cond:
+            if self.closed:
+                return
+            self._pending.append(frame.acquire())
+            while len(self._pending) > self.max_pending:
+                self._pending.popleft().release()
+                self.dropped += 1
+            self._cond.notify()
+
+    def get(self, timeout: float | None = None) -> Optional[CameraFrame]:
+        """Wait for the next frame. Returns None on timeout or when closed."""
+        with self._cond:
+            if not self._pending and not self.closed:
+                self._cond.wait(timeout)
+            if not self._pending:
+                return None
+            self.delivered += 1
+            return self._pending.popleft()
+
+    def close(self) -> None:
+        """Unsubscribe and release all pending frames."""
+        self.bus.unsubscribe(self)
+        with self._cond:
+            self.closed = True
+            while self._pending:
+                self._pending.popleft().release()
+            self._cond.notify_all()
+
+
+class FrameBus:
+    """Publish/subscribe distribution of captured camera frames.
+
+    The capture thread publishes each CameraFrame once. Consumers either subscribe
+    (live streams) or poll latest() (periodic snapshots). All of them share the
+    same frame object, so decoded arrays and encoded derivatives are computed once.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: list[FrameSubscription] = []
+        self._latest: CameraFrame | None = None
+        self.published = 0
+
+    def publish(self, frame: CameraFrame) -> None:
+        """Distribute a frame to all subscribers (never blocks on slow consumers)."""
+        with self._lock:
+            previous = self._latest
+            self._latest = frame.acquire()
+            self.published += 1
+            subscribers = list(self._subscribers)
+        if previous is not None:
+            previous.release()
+        for subscription in subscribers:
+            subscription._offer(frame)
+
+    def latest(self) -> Optional[CameraFrame]:
+        """Return the most recently published frame (no reference is taken)."""
+        with self._lock:
+            return self._latest
+
+    def subscribe(self, name: str, max_pending: int = 1) -> FrameSubscription:
+        subscription = FrameSubscription(self, name, max_pending=max_pending)
+        with self._lock:
+            self._subscribers.append(subscription)
+        logging.debug(f"[CAMERA] Frame bus subscriber added: {name}")
+        return subscription
+
+    def unsubscribe(self, subscription: FrameSubscription) -> None:
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+                logging.debug(f"[CAMERA] Frame bus subscriber removed: {subscription.name}")
+
+    def get_stats(self) -> dict:
+        """Return published count and per-subscriber delivered/dropped/pending counters."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+            published = self.published
+        return {
+            "published": published,
+            "subscribers": {
+                sub.name: {"delivered": sub.delivered, "dropped": sub.dropped, "pending": len(sub._pending)}
+                for sub in subscribers
+            },
+        }
+
+
+class _RawFrameReader:
+    """Read fixed-size raw BGR frames from a pipe on a background thread.
+
+    Frames are numbered in arrival order so they can be paired with the frames
+    of another FFmpeg output of the same process (same frame, different size).
+    """
+
+    def __init__(self, fileobj, width: int, height: int, max_pending: int = 8):
+        self.width = int(width)
+        self.height = int(height)
+        self._fileobj = fileobj
+        self._frames: deque = deque(maxlen=max_pending)
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        frame_bytes = self.width * self.height * 3
+        try:
+            while True:
+                raw = self._fileobj.read(frame_bytes)
+                if not raw or len(raw) != frame_bytes:
+                    break
+                frame = np.frombuffer(raw, dtype=np.uint8).reshape((self.height, self.width, 3))
+                with self._cond:
+                    self._seq += 1
+                    self._frames.append((self._seq, frame))
+                    self._cond.notify_all()
+        except Exception as e:
+            logging.debug(f"[CAMERA] Inference output reader stopped: {e}")
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+
+    def take(self, seq: int, timeout: float = 0.2) -> Optional[np.ndarray]:
+        """Return frame number seq, dropping older ones. None if it is unavailable."""
+        deadline = tm.monotonic() + timeout
+        with self._cond:
+            while True:
+                while self._frames and self._frames[0][0] < seq:
+                    self._frames.popleft()
+                if self._frames and self._frames[0][0] == seq:
+                    return self._frames.popleft()[1]
+                if self._closed or (self._frames and self._frames[0][0] > seq):
+                    return None
+                remaining = deadline - tm.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def close(self) -> None:
+        try:
+            self._fileobj.close()
+        except Exception:
+            pass
+
+
+class FFmpegStderrMonitor:
+    """Read an FFmpeg child's stderr on a background thread and classify its messages.
+
+    Errors are kept as (monotonic time, category) events so that callers can apply
+    policies on rolling error rates instead of on raw log lines. Totals are added
+    to a shared counter dict, which outlives the process (reconnects).
+    """
+
+    CATEGORY_CORRUPT_MB = "corrupt_macroblock"
+    CATEGORY_MISSING_REF = "missing_reference"
+    CATEGORY_TIMEOUT = "timeout"
+    CATEGORY_EOF = "eof"
+    CATEGORY_OTHER = "other"
+    CATEGORIES = (CATEGORY_CORRUPT_MB, CATEGORY_MISSING_REF, CATEGORY_TIMEOUT, CATEGORY_EOF, CATEGORY_OTHER)
+    # Categories that indicate a broken/damaged bitstream (used for reconnect and hw-decode fallback).
+    DECODE_ERROR_CATEGORIES = (CATEGORY_CORRUPT_MB, CATEGORY_MISSING_REF)
+
+    _PATTERNS = [
+        (re.compile(r"error while decoding MB|concealing \d+ (DC|AC|MV) errors|corrupt(ed)? (macroblock|frame)|invalid (mb|macroblock)", re.IGNORECASE), CATEGORY_CORRUPT_MB),
+        (re.compile(r"missing reference|reference picture missing|co located POCs unavailable|no frame!|non-existing PPS|non-existing SPS|decode_slice_header error", re.IGNORECASE), CATEGORY_MISSING_REF),
+        (re.compile(r"timed? ?out|timeout", re.IGNORECASE), CATEGORY_TIMEOUT),
+        (re.compile(r"end of file|connection reset|broken pipe|connection refused|\beof\b", re.IGNORECASE), CATEGORY_EOF),
+    ]
+
+    def __init__(self, process: subprocess.Popen, label: str, totals: dict | None = None, history_s: float = 120.0):
+        self.label = label
+        self.history_s = float(history_s)
+        self.totals = totals if totals is not None else {category: 0 for category in self.CATEGORIES}
+        self._events: deque = deque()
+        self._tail: deque = deque(maxlen=20)
+        self._lock = threading.Lock()
+        self._process = process
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def classify(cls, line: str) -> str:
+        for pattern, category in cls._PATTERNS:
+            if pattern.search(line):
+                return category
+        return cls.CATEGORY_OTHER
+
+    def _run(self) -> None:
+        stream = self._process.stderr if self._process is not None else None
+        if stream is None:
+            return
+        try:
+            for raw_line in iter(stream.readline, b""):
+                line = raw_line.decode("utf-8", errors="replace").strip()
+                if not line:
+                    continue
+                category = self.classify(line)
+                now = tm.monotonic()
+                with self._lock:
+                    self._tail.append(line)
+                    self._events.append((now, category))
+                    self.totals[category] = self.totals.get(category, 0) + 1
+                    while self._events and (now - self._events[0][0]) > self.history_s:
+                        self._events.popleft()
+                if category == self.CATEGORY_OTHER:
+                    logging.debug(f"[CAMERA] {self.label}: {line}")
+                else:
+                    logging.debug(f"[CAMERA] {self.label} ({category}): {line}")
+        except Exception as e:
+            logging.debug(f"[CAMERA] Stderr reader for {self.label} stopped: {e}")
+
+    def count(self, categories=None, window_s: float = 20.0) -> int:
+        """Number of classified messages of the given categories within the last window_s seconds."""
+        cutoff = tm.monotonic() - float(window_s)
+        wanted = set(categories) if categories else None
+        with self._lock:
+            return sum(1 for ts, category in self._events if ts >= cutoff and (wanted is None or category in wanted))
+
+    def rate(self, categories=None, window_s: float = 20.0) -> float:
+        """Messages per second of the given categories within the last window_s seconds."""
+        return self.count(categories, window_s) / max(1.0, float(window_s))
+
+    def tail(self) -> str:
+        """Return the last stderr lines (for log messages)."""
+        with self._lock:
+            return "\n".join(self._tail)
+
+    def get_stats(self, window_s: float = 20.0) -> dict:
+        with self._lock:
+            totals = dict(self.totals)
+        return {
+            "source": self.label,
+            "totals": totals,
+            "window_s": float(window_s),
+            "recent": {category: self.count((category,), window_s) for category in self.CATEGORIES},
+        }
+
+
+class CameraHealth:
+    """Health telemetry of a camera stream and the thresholds that drive its recovery.
+
+    The capture thread records frames, drops, decode failures and reconnects. snapshot()
+    turns these into a status ("starting", "ok", "degraded", "stalled", "stopped"), a list
+    of issues and a recommended recovery action, so the UI, MQTT, the REST API and the
+    recovery watchdogs all work from the same numbers.
+    """
+
+    STATUS_STARTING = "starting"
+    STATUS_OK = "ok"
+    STATUS_DEGRADED = "degraded"
+    STATUS_STALLED = "stalled"
+    STATUS_STOPPED = "stopped"
+
+    ACTION_REINIT_STREAM = "reinit_stream"
+
+    # Thresholds
+    STALE_WARN_AFTER_S = 3.0          # no new frame for this long -> "No frame received" warning
+    STALL_AFTER_S = 8.0               # no new frame for this long -> stalled, reinit the stream
+    REINIT_COOLDOWN_S = 10.0          # minimum time between two stream reinits
+    MIN_FPS_RATIO = 0.5               # input FPS below this share of the expected FPS -> degraded
+    MAX_DECODE_FAILURES_PER_MIN = 10  # decode failures (incl. FFmpeg stderr) per minute -> degraded
+    MAX_INTERVAL_P95_RATIO = 3.0      # p95 frame interval above this multiple of the expected interval -> degraded
+
+    FPS_WINDOW_S = 10.0
+    EVENT_WINDOW_S = 60.0
+
+    def __init__(self, max_intervals: int = 300):
+        self._lock = threading.Lock()
+        self.started_mono = tm.monotonic()
+        self.backend: str | None = None
+        self.frames_total = 0
+        self.dropped_total = 0
+        self.reconnects = 0
+        self.decode_failures: dict[str, int] = {}
+        self._last_frame_mono: float | None = None
+        self._frame_times: deque = deque()
+        self._intervals: deque = deque(maxlen=max(10, int(max_intervals)))
+        self._decode_failure_times: deque = deque()
+        self._drop_times: deque = deque()
+
+    @staticmethod
+    def _trim(events: deque, cutoff: float) -> None:
+        while events and events[0] < cutoff:
+            events.popleft()
+
+    @staticmethod
+    def _percentile(sorted_values: list, pct: float) -> float:
+        if not sorted_values:
+            return 0.0
+        index = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * (len(sorted_values) - 1)))))
+        return float(sorted_values[index])
+
+    def set_backend(self, backend: str | None) -> None:
+        """Set the capture/decode backend in use (e.g. "libcamera-mjpeg", "ffmpeg-vaapi", "opencv")."""
+        with self._lock:
+            self.backend = backend
+
+    def record_frame(self, timestamp_mono: float | None = None) -> None:
+        now = float(timestamp_mono) if timestamp_mono is not None else tm.monotonic()
+        with self._lock:
+            if self._last_frame_mono is not None and now >= self._last_frame_mono:
+                self._intervals.append(now - self._last_frame_mono)
+            self._last_frame_mono = now
+            self.frames_total += 1
+            self._frame_times.append(now)
+            self._trim(self._frame_times, now - self.FPS_WINDOW_S)
+
+    def record_drop(self, count: int = 1) -> None:
+        """Frames that were captured but discarded before a consumer read them."""
+        now = tm.monotonic()
+        with self._lock:
+            self.dropped_total += int(count)
+            self._drop_times.extend([now] * int(count))
+            self._trim(self._drop_times, now - self.EVENT_WINDOW_S)
+
+    def record_decode_failure(self, kind: str = "decode", count: int = 1) -> None:
+        now = tm.monotonic()
+        with self._lock:
+            self.decode_failures[kind] = self.decode_failures.get(kind, 0) + int(count)
+            self._decode_failure_times.extend([now] * int(count))
+            self._trim(self._decode_failure_times, now - self.EVENT_WINDOW_S)
+
+    def record_reconnect(self) -> None:
+        with self._lock:
+            self.reconnects += 1
+            # A fresh connection should not inherit the interval of the outage.
+            self._last_frame_mono = None
+
+    def time_since_last_frame(self) -> float:
+        """Seconds since the last frame (or since the stream was started if none arrived yet)."""
+        with self._lock:
+            reference = self._last_frame_mono if self._last_frame_mono is not None else self.started_mono
+        return max(0.0, tm.monotonic() - reference)
+
+    def snapshot(self, camera_state: str | None = None, expected_fps: float | None = None, stderr_decode_errors: int = 0) -> dict:
+        """Return the current health figures, status and recommended recovery action.
+
+        Args:
+            camera_state: VideoStream state, "stopped" overrides the status.
+            expected_fps: Target capture rate, or None if the source is not rate-limited.
+            stderr_decode_errors: Decode errors classified from FFmpeg stderr within the last minute.
+        """
+        now = tm.monotonic()
+        with self._lock:
+            self._trim(self._frame_times, now - self.FPS_WINDOW_S)
+            self._trim(self._decode_failure_times, now - self.EVENT_WINDOW_S)
+            self._trim(self._drop_times, now - self.EVENT_WINDOW_S)
+            has_frames = self._last_frame_mono is not None
+            since_last = now - (self._last_frame_mono if has_frames else self.started_mono)
+            fps_window = min(self.FPS_WINDOW_S, max(1e-3, now - self.started_mono))
+            input_fps = len(self._frame_times) / fps_window
+            intervals = sorted(self._intervals)
+            decode_failures_recent = len(self._decode_failure_times) + max(0, int(stderr_decode_errors))
+            drops_recent = len(self._drop_times)
+            snapshot = {
+                "backend": self.backend,
+                "camera_state": camera_state,
+                "uptime_s": round(now - self.started_mono, 1),
+                "frames_total": self.frames_total,
+                "input_fps": round(input_fps, 2),
+                "expected_fps": round(float(expected_fps), 2) if expected_fps else None,
+                "time_since_last_frame_s": round(since_last, 2),
+                "dropped_total": self.dropped_total,
+                "dropped_last_min": drops_recent,
+                "decode_failures": dict(self.decode_failures),
+                "decode_failures_last_min": decode_failures_recent,
+                "reconnects": self.reconnects,
+            }
+
+        if intervals:
+            mean = sum(intervals) / len(intervals)
+            jitter = (sum((x - mean) ** 2 for x in intervals) / len(intervals)) ** 0.5
+            snapshot["frame_interval_ms"] = {
+                "p50": round(self._percentile(intervals, 50) * 1000.0, 1),
+                "p95": round(self._percentile(intervals, 95) * 1000.0, 1),
+                "p99": round(self._percentile(intervals, 99) * 1000.0, 1),
+                "max": round(intervals[-1] * 1000.0, 1),
+            }
+            snapshot["jitter_ms"] = round(jitter * 1000.0, 1)
+        else:
+            snapshot["frame_interval_ms"] = None
+            snapshot["jitter_ms"] = None
+
+        issues = []
+        action = None
+        if camera_state == "stopped":
+            status = self.STATUS_STOPPED
+        elif since_last >= self.STALL_AFTER_S:
+            status = self.STATUS_STALLED
+            issues.append("no_frames")
+            action = self.ACTION_REINIT_STREAM
+        elif not has_frames:
+            status = self.STATUS_STARTING
+        else:
+            if since_last >= self.STALE_WARN_AFTER_S:
+                issues.append("stale_frames")
+            # FPS and jitter checks only make sense once the FPS window is filled.
+            if expected_fps and (now - self.started_mono) >= self.FPS_WINDOW_S:
+                if snapshot["input_fps"] < self.MIN_FPS_RATIO * float(expected_fps):
+                    issues.append("low_fps")
+                if intervals and self._percentile(intervals, 95) > self.MAX_INTERVAL_P95_RATIO / float(expected_fps):
+                    issues.append("high_jitter")
+            if decode_failures_recent >= self.MAX_DECODE_FAILURES_PER_MIN:
+                issues.append("decode_errors")
+            status = self.STATUS_DEGRADED if issues else self.STATUS_OK
+
+        snapshot["status"] = status
+        snapshot["issues"] = issues
+        snapshot["recommended_action"] = action
+        return snapshot
+
+
+class MotionDetector:
+    """Cheap software motion detector on a tiny grayscale downscale of each frame.
+
+    Each thumbnail is compared against a running-average background model; the
+    share of pixels that differ by more than pixel_threshold is the motion score.
+    Motion stays active for hold_s seconds after the last moving frame, so that
+    short pauses (a cat stopping in front of the flap) do not drop the signal.
+    """
+
+    THUMB_WIDTH = 96
+
+    def __init__(
+        self,
+        pixel_threshold: int = 25,
+        ratio_threshold: float = 0.02,
+        learning_rate: float = 0.05,
+        hold_s: float = 3.0,
+    ):
+        self.pixel_threshold = int(pixel_threshold)
+        self.ratio_threshold = float(ratio_threshold)
+        self.learning_rate = float(learning_rate)
+        self.hold_s = float(hold_s)
+        self._background: np.ndarray | None = None
+        self._last_motion_mono = 0.0
+        self._last_score = 0.0
+        self._frames = 0
+        self._motion_frames = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def thumbnail(cls, frame: CameraFrame) -> Optional[np.ndarray]:
+        """Tiny grayscale thumbnail of a frame (1/8 JPEG decode or a strided view of the inference array)."""
+        try:
+            if frame._jpeg is not None and frame._from_jpeg:
+                thumb = cv2.imdecode(np.frombuffer(frame._jpeg, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+            else:
+                source = frame.inference_array()
+                if source is None:
+                    return None
+                step = max(1, source.shape[1] // cls.THUMB_WIDTH)
+                thumb = cv2.cvtColor(np.ascontiguousarray(source[::step, ::step]), cv2.COLOR_BGR2GRAY)
+            if thumb is None:
+                return None
+            if thumb.shape[1] > cls.THUMB_WIDTH:
+                height = max(1, int(thumb.shape[0] * cls.THUMB_WIDTH / thumb.shape[1]))
+                thumb = cv2.resize(thumb, (cls.THUMB_WIDTH, height), interpolation=cv2.INTER_AREA)
+            return cv2.GaussianBlur(thumb, (3, 3), 0)
+        except Exception:
+            return None
+
+    def update(self, frame: CameraFrame) -> Optional[float]:
+        """Score a frame, update the background model and tag the frame (motion_score, motion)."""
+        thumb = self.thumbnail(frame)
+        if thumb is None:
+            return None
+        now = frame.timestamp_mono
+        with self._lock:
+            background = self._background
+            if background is None or background.shape != thumb.shape:
+                # (Re)initialize; the first frame never counts as motion.
+                self._background = thumb.astype(np.float32)
+                score = 0.0
+            else:
+                diff = cv2.absdiff(thumb, cv2.convertScaleAbs(background))
+                score = float(np.count_nonzero(diff > self.pixel_threshold)) / float(thumb.size)
+                cv2.accumulateWeighted(thumb, background, self.learning_rate)
+            self._frames += 1
+            self._last_score = score
+            if score >= self.ratio_threshold:
+                self._motion_frames += 1
+                self._last_motion_mono = now
+            active = self._last_motion_mono > 0.0 and (now - self._last_motion_mono) <= self.hold_s
+        frame.motion_score = score
+        frame.motion = active
+        return score
+
+    def reset(self) -> None:
+        with self._lock:
+            self._background = None
+            self._last_motion_mono = 0.0
+
+    def is_motion(self) -> bool:
+        """True while the last moving frame is at most hold_s seconds old."""
+        with self._lock:
+            return self._last_motion_mono > 0.0 and (tm.monotonic() - self._last_motion_mono) <= self.hold_s
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "motion": self._last_motion_mono > 0.0 and (tm.monotonic() - self._last_motion_mono) <= self.hold_s,
+                "last_score": round(self._last_score, 4),
+                "frames": self._frames,
+                "motion_frames": self._motion_frames,
+                "ratio_threshold": self.ratio_threshold,
+            }
+
+
 class VideoStream:
     """Camera object that controls video streaming from the Picamera or an IP camera"""
 
@@ -144,18 +962,37 @@ class VideoStream:
     STATE_INTERNAL = "internal_camera"
     STATE_IP_CAMERA = "ip_camera"
 
+    # FFmpeg stderr error policy (rolling window over classified messages)
+    DECODE_ERROR_WINDOW_S = 20.0
+    DECODE_ERROR_RECONNECT_THRESHOLD = 5     # decode errors within the window -> reconnect
+    DECODE_ERROR_HW_FALLBACK_THRESHOLD = 15  # decode errors within the window on hw decode -> use software decode
+
+    # Framerate governor states
+    GOVERNOR_IDLE = "idle"
+    GOVERNOR_ACTIVE = "active"
+
     def __init__(
         self,
         resolution=(800, 600),
         framerate=10,
         jpeg_quality=75,
         tuning_file="/usr/share/libcamera/ipa/rpi/vc4/ov5647_noir.json",
-        source="internal",  # "internal" or "ip_camera"
+        source="internal",  # "internal", "ip_camera" or "replay"
         ip_camera_url: str = None,
         use_ip_camera_decode_scale_pipeline: bool = False,
         ip_camera_target_resolution: str = "640x360",
         ip_camera_pipeline_fps_limit: int = 10,
         ip_camera_hw_decode: str = "auto",
+        inference_size: tuple[int, int] | None = None,
+        inference_keep_aspect: bool = True,
+        bus: "FrameBus | None" = None,
+        adaptive_framerate: bool = False,
+        idle_framerate: int = 2,
+        active_hold_s: float = 10.0,
+        motion_detection: bool = False,
+        replay_path: str | None = None,
+        replay_rate: str = "realtime",
+        replay_loop: bool = False,
     ):
         self.resolution = resolution
         self.framerate = framerate
@@ -173,38 +1010,279 @@ class VideoStream:
         self.ip_camera_target_resolution = ip_camera_target_resolution
         self.ip_camera_pipeline_fps_limit = ip_camera_pipeline_fps_limit
         self.ip_camera_hw_decode = ip_camera_hw_decode
+        # Recorded-stream replay (source="replay", see src/replay.py)
+        self.replay_path = replay_path
+        self.replay_rate = parse_replay_rate(replay_rate)
+        self.replay_loop = bool(replay_loop)
+        self._last_consumer_read_mono = 0.0
         self.cap = None  # For IP camera
         self.thread = None
-        self._stderr_drain_thread = None
         self._next_frame_id = 1
         self._last_read_oldest_frame_id = 0
+        # Dual-output mode: model input size (w, h) for the reduced inference array.
+        self.inference_size = tuple(inference_size) if inference_size else None
+        self.inference_keep_aspect = bool(inference_keep_aspect)
+        # Every captured frame is published here (defaults to the process-wide frame_bus).
+        self.frame_bus = bus if bus is not None else frame_bus
+        # Adaptive framerate governor: idle at a low rate, ramp up on PIR / pixel-diff activity.
+        self.adaptive_framerate = bool(adaptive_framerate)
+        self.idle_framerate = max(1, int(idle_framerate))
+        self.active_hold_s = max(1.0, float(active_hold_s))
+        self._governor_lock = threading.Lock()
+        self._governor_state = self.GOVERNOR_ACTIVE
+        self._governor_state_since = tm.monotonic()
+        self._last_activity_mono = tm.monotonic()
+        self._consumer_fps_cap: float | None = None
+        self._governor_seconds = {self.GOVERNOR_IDLE: 0.0, self.GOVERNOR_ACTIVE: 0.0}
+        self._governor_frames = {self.GOVERNOR_IDLE: 0, self.GOVERNOR_ACTIVE: 0}
+        # Software motion detection; also the pixel-diff trigger of the governor.
+        self.motion_detection = bool(motion_detection)
+        self.motion_detector = MotionDetector()
+        # FFmpeg stderr classification (pipeline mode); totals survive reconnects.
+        self._stderr_monitor: FFmpegStderrMonitor | None = None
+        self._stderr_totals = {category: 0 for category in FFmpegStderrMonitor.CATEGORIES}
+        self._hw_decode_disabled = False
+        # Stream health telemetry (FPS, jitter, drops, decode failures, reconnects).
+        self.health = CameraHealth()
         self.camera_state = self.STATE_INITIALIZING  # <-- Add this line
 
-    def _append_frame_locked(self, frame: np.ndarray) -> None:
+    def set_inference_size(self, inference_size: tuple[int, int] | None, keep_aspect: bool = True) -> None:
+        """Set the model input size used to derive the reduced inference array (None disables it)."""
+        self.inference_size = tuple(inference_size) if inference_size else None
+        self.inference_keep_aspect = bool(keep_aspect)
+        logging.info(f"[CAMERA] Inference frame size set to {self.inference_size} (keep_aspect={self.inference_keep_aspect})")
+
+    def notify_activity(self, source: str = "pir") -> None:
+        """Signal activity at the flap (PIR, pixel diff, ...). Ramps the capture rate up if idle."""
+        if not self.adaptive_framerate:
+            return
+        with self._governor_lock:
+            self._last_activity_mono = tm.monotonic()
+            if self._governor_state == self.GOVERNOR_ACTIVE:
+                return
+            self._set_governor_state_locked(self.GOVERNOR_ACTIVE)
+        logging.info(f"[CAMERA] Capture framerate governor: activity ({source}), ramping up to {self._governor_capture_fps()} FPS")
+
+    def set_consumer_fps_cap(self, fps: float | None) -> None:
+        """Cap the active capture rate at what the consumer (model) can process. None removes the cap."""
+        cap = None
+        try:
+            if fps is not None and float(fps) > 0:
+                cap = float(fps)
+        except Exception:
+            cap = None
+        with self._governor_lock:
+            self._consumer_fps_cap = cap
+
+    def _set_governor_state_locked(self, state: str) -> None:
+        now = tm.monotonic()
+        self._governor_seconds[self._governor_state] += max(0.0, now - self._governor_state_since)
+        self._governor_state = state
+        self._governor_state_since = now
+
+    def _governor_capture_fps_locked(self) -> int:
+        if not self.adaptive_framerate:
+            return int(self.framerate)
+        if self._governor_state == self.GOVERNOR_IDLE:
+            return min(int(self.framerate), self.idle_framerate)
+        fps = float(self.framerate)
+        if self._consumer_fps_cap is not None:
+            fps = min(fps, max(float(self.idle_framerate), self._consumer_fps_cap))
+        return max(1, int(round(fps)))
+
+    def _governor_capture_fps(self) -> int:
+        """Return the capture framerate for the current governor state."""
+        with self._governor_lock:
+            return self._governor_capture_fps_locked()
+
+    def _governor_frame_interval(self, fps_limit: int) -> float:
+        """Return the minimum interval between forwarded frames for rate-limited (IP camera) sources."""
+        fps = float(fps_limit) if fps_limit > 0 else 0.0
+        if self.adaptive_framerate:
+            governed = float(self._governor_capture_fps())
+            fps = min(fps, governed) if fps > 0 else governed
+        return (1.0 / fps) if fps > 0 else 0.0
+
+    def _internal_frame_interval(self) -> float:
+        """Minimum interval between forwarded libcamera frames (0.0 while governed at the camera framerate)."""
+        if not self.adaptive_framerate:
+            return 0.0
+        governed = float(self._governor_capture_fps())
+        if governed <= 0 or governed >= float(self.framerate or 10):
+            return 0.0
+        return 1.0 / governed
+
+    def set_motion_detection(self, enabled: bool) -> None:
+        """Enable or disable the software motion detector (it always runs while the governor idles)."""
+        enabled = bool(enabled)
+        if enabled != self.motion_detection:
+            self.motion_detection = enabled
+            self.motion_detector.reset()
+            logging.info(f"[CAMERA] Software motion detection {'enabled' if enabled else 'disabled'}")
+
+    def _on_captured_frame(self, frame: CameraFrame) -> None:
+        """Per-frame analysis on the capture thread: software motion detection and the framerate governor."""
+        if self.motion_detection or (self.adaptive_framerate and self._governor_state == self.GOVERNOR_IDLE):
+            self.motion_detector.update(frame)
+        self._governor_on_frame(frame)
+
+    def _governor_on_frame(self, frame: CameraFrame) -> None:
+        """Per-frame governor bookkeeping: frame counters, pixel-diff trigger and idle timeout."""
+        if not self.adaptive_framerate:
+            return
+        now = tm.monotonic()
+        with self._governor_lock:
+            state = self._governor_state
+            self._governor_frames[state] += 1
+            if state == self.GOVERNOR_ACTIVE and (now - self._last_activity_mono) >= self.active_hold_s:
+                self._set_governor_state_locked(self.GOVERNOR_IDLE)
+                went_idle = True
+            else:
+                went_idle = False
+        if went_idle:
+            logging.info(f"[CAMERA] Capture framerate governor: no activity for {self.active_hold_s:.0f}s, idling at {self._governor_capture_fps()} FPS")
+            if not self.motion_detection:
+                # The detector only ran while active if enabled; start idling with a fresh background.
+                self.motion_detector.reset()
+            return
+        # Pixel-diff trigger: ramps up when idle and keeps the active state alive while the scene moves.
+        if frame.motion_score is not None and frame.motion_score >= self.motion_detector.ratio_threshold:
+            self.notify_activity("pixel diff")
+
+    def get_governor_stats(self) -> dict:
+        """Return the governor state, capture FPS and effective FPS per state."""
+        with self._governor_lock:
+            now = tm.monotonic()
+            seconds = dict(self._governor_seconds)
+            seconds[self._governor_state] += max(0.0, now - self._governor_state_since)
+            frames = dict(self._governor_frames)
+            return {
+                "enabled": self.adaptive_framerate,
+                "state": self._governor_state,
+                "capture_fps": self._governor_capture_fps_locked(),
+                "consumer_fps_cap": self._consumer_fps_cap,
+                "states": {
+                    state: {
+                        "seconds": round(seconds[state], 1),
+                        "frames": frames[state],
+                        "effective_fps": round(frames[state] / seconds[state], 2) if seconds[state] > 0 else 0.0,
+                    }
+                    for state in (self.GOVERNOR_IDLE, self.GOVERNOR_ACTIVE)
+                },
+            }
+
+    def _terminate_process(self) -> None:
+        """Terminate the capture subprocess (if any)."""
+        if self.process:
+            try:
+                self.process.terminate()
+                try:
+                    self.process.wait(timeout=2)
+                except Exception:
+                    try:
+                        self.process.kill()
+                    except Exception:
+                        pass
+            except Exception:
+                pass
+            finally:
+                self.process = None
+
+    def _inference_reduce_factor(self, frame_w: int, frame_h: int) -> int:
+        """Return the decode/downscale factor for the inference array of a frame of the given size."""
+        if not self.inference_size:
+            return 1
+        return reduced_decode_factor(frame_w, frame_h, self.inference_size[0], self.inference_size[1], self.inference_keep_aspect)
+
+    def _raw_camera_frame(self, frame: np.ndarray, small: np.ndarray | None = None) -> CameraFrame:
+        """Wrap a raw BGR frame, attaching the FFmpeg inference output if it was paired."""
+        return CameraFrame(
+            array=frame,
+            small_array=small,
+            reduce_factor=self._inference_reduce_factor(frame.shape[1], frame.shape[0]),
+        )
+
+    def _append_frame_locked(self, frame: "CameraFrame | np.ndarray") -> None:
         """Append a frame and trim the FIFO while preserving frame identity."""
+        if not isinstance(frame, CameraFrame):
+            frame = CameraFrame(array=frame, reduce_factor=self._inference_reduce_factor(frame.shape[1], frame.shape[0]))
+        frame.frame_id = self._next_frame_id
+        self.health.record_frame(frame.timestamp_mono)
+        self.frame_bus.publish(frame)
         self.frames.append(frame)
         self.frame_ids.append(self._next_frame_id)
         self._next_frame_id += 1
         if len(self.frames) > self.buffer_size:
             self.frames.pop(0)
-            self.frame_ids.pop(0)
-
-    def _start_process_stderr_drain(self, process: subprocess.Popen, label: str) -> None:
-        """Continuously drain process stderr to avoid pipe backpressure stalls."""
-        if process is None or process.stderr is None:
-            return
+            trimmed_id = self.frame_ids.pop(0)
+            if trimmed_id > self._last_read_oldest_frame_id:
+                # Trimmed before read_oldest_frame() got to it.
+                self.health.record_drop()
+
+    def _should_reconnect_on_decode_errors(self, hw_label: str) -> bool:
+        """Apply the decode error policy to the FFmpeg stderr monitor. True means reconnect now."""
+        monitor = self._stderr_monitor
+        if monitor is None:
+            return False
+        errors = monitor.count(FFmpegStderrMonitor.DECODE_ERROR_CATEGORIES, self.DECODE_ERROR_WINDOW_S)
+        if hw_label != "software" and errors >= self.DECODE_ERROR_HW_FALLBACK_THRESHOLD:
+            logging.error(
+                f"[CAMERA] {errors} decode errors in {self.DECODE_ERROR_WINDOW_S:.0f}s with hardware decode ({hw_label}). "
+                f"Falling back to software decode."
+            )
+            self._hw_decode_disabled = True
+            return True
+        if errors >= self.DECODE_ERROR_RECONNECT_THRESHOLD:
+            if CONFIG['RESTART_IP_CAMERA_STREAM_ON_FAILURE']:
+                logging.error(
+                    f"[CAMERA] {errors} decode errors in {self.DECODE_ERROR_WINDOW_S:.0f}s from FFmpeg, reconnecting IP camera stream..."
+                )
+                return True
+            if not getattr(self, "_decode_error_reconnect_warned", False):
+                logging.warning("[CAMERA] Too many decode errors, but automatic IP camera reconnect is disabled by configuration.")
+                self._decode_error_reconnect_warned = True
+        return False
 
-        def _drain() -> None:
-            try:
-                while not self.stopped and process.poll() is None:
-                    chunk = process.stderr.read(4096)
-                    if not chunk:
-                        break
-            except Exception as e:
-                logging.debug(f"[CAMERA] Stderr drain for {label} stopped: {e}")
+    def get_decode_error_stats(self) -> dict:
+        """Return classified FFmpeg stderr counters (totals and rolling window) plus reconnects."""
+        monitor = self._stderr_monitor
+        if monitor is not None:
+            stats = monitor.get_stats(self.DECODE_ERROR_WINDOW_S)
+        else:
+            stats = {
+                "source": None,
+                "totals": dict(self._stderr_totals),
+                "window_s": self.DECODE_ERROR_WINDOW_S,
+                "recent": {category: 0 for category in FFmpegStderrMonitor.CATEGORIES},
+            }
+        stats["hw_decode_disabled"] = self._hw_decode_disabled
+        stats["reconnects"] = self.health.reconnects
+        return stats
 
-        self._stderr_drain_thread = threading.Thread(target=_drain, daemon=True)
-        self._stderr_drain_thread.start()
+    def _expected_fps(self) -> float | None:
+        """Capture rate the stream should deliver right now, or None if it is not rate-limited."""
+        if self.source == "internal":
+            return float(self._governor_capture_fps())
+        if self.source == "replay":
+            return float(self.replay_rate) if isinstance(self.replay_rate, float) else None
+        interval = self._governor_frame_interval(self._normalized_pipeline_fps_limit())
+        return (1.0 / interval) if interval > 0 else None
+
+    def get_health_snapshot(self) -> dict:
+        """Return the CameraHealth snapshot of this stream (see CameraHealth.snapshot())."""
+        monitor = self._stderr_monitor
+        stderr_errors = 0
+        if monitor is not None:
+            stderr_errors = monitor.count(FFmpegStderrMonitor.DECODE_ERROR_CATEGORIES, CameraHealth.EVENT_WINDOW_S)
+        snapshot = self.health.snapshot(
+            camera_state=self.camera_state,
+            expected_fps=self._expected_fps(),
+            stderr_decode_errors=stderr_errors,
+        )
+        snapshot["source"] = self.source
+        snapshot["resolution"] = list(self.resolution) if self.resolution else None
+        snapshot["software_motion"] = self.motion_detector.get_stats() if self.motion_detection else None
+        return snapshot
 
     def _parse_target_resolution(self) -> tuple[int, int]:
         """Parse WxH target resolution string with a safe fallback."""
@@ -257,7 +1335,9 @@ class VideoStream:
         self.stopped = False
         self.thread = threading.Thread(target=self.update, args=(), daemon=True)
         self.thread.start()
-        if self.source == "ip_camera":
+        if self.source == "ip_camera" and not self.use_ip_camera_decode_scale_pipeline:
+            # OpenCV decodes in-process, so its H.264 errors only show up in the journal.
+            # The FFmpeg pipeline parses its child's stderr directly (FFmpegStderrMonitor).
             self._start_journal_monitor()
         return self
     
@@ -291,6 +1371,7 @@ class VideoStream:
                 continue
             if pattern.search(line):
                 error_count += 1
+                self.health.record_decode_failure("h264_journal")
                 logging.warning(f"[CAMERA] Journal detected H264 decode error (count={error_count})")
                 if error_count >= threshold:
                     if CONFIG['RESTART_IP_CAMERA_STREAM_ON_FAILURE']:
@@ -307,6 +1388,7 @@ class VideoStream:
 
     def _trigger_ip_camera_reconnect(self):
         # Set stopped to True to break the update loop and reconnect
+        self.health.record_reconnect()
         self.stopped = True
         # Wait a moment before restarting
         tm.sleep(2)
@@ -314,14 +1396,116 @@ class VideoStream:
         self.thread = threading.Thread(target=self.update, args=(), daemon=True)
         self.thread.start()
 
+    def _wait_for_replay_consumer(self) -> None:
+        """In "fast" replay, hold the next frame until the previous one was read.
+
+        Only applies while a consumer is actively reading; a paused model handler
+        must not stall the replay (and with it the replayed PIR events).
+        """
+        while not self.stopped:
+            with self.lock:
+                pending = (self._next_frame_id - 1) - self._last_read_oldest_frame_id
+            consumer_active = (tm.monotonic() - self._last_consumer_read_mono) < 1.0
+            if pending <= 0 or not consumer_active:
+                return
+            tm.sleep(0.001)
+
+    def _run_replay(self) -> None:
+        """Play a recording (JPEG directory, MJPEG file or video file) as the camera stream."""
+        try:
+            kind = replay_source_kind(self.replay_path)
+        except Exception as e:
+            logging.error(f"[CAMERA] Replay source unavailable: {e}")
+            self.camera_state = self.STATE_ERROR
+            return
+        self.health.set_backend(f"replay-{kind}")
+        rate = self.replay_rate
+        # Recordings without timestamps are spaced at the fixed rate or the stream framerate
+        source_fps = rate if isinstance(rate, float) else float(self.framerate)
+        logging.info(
+            f"[CAMERA] Replaying '{self.replay_path}' ({kind}) at rate {rate}{' (looped)' if self.replay_loop else ''}"
+        )
+        jpeg_size = None
+        while not self.stopped:
+            replay_clock.restart()
+            start_mono = tm.monotonic()
+            frame_count = 0
+            try:
+                self.camera_state = self.STATE_RUNNING
+                for position_s, jpeg_data, array in iter_replay_frames(self.replay_path, source_fps):
+                    if self.stopped:
+                        break
+                    if rate == REPLAY_RATE_REALTIME:
+                        delay = start_mono + position_s - tm.monotonic()
+                    elif rate == REPLAY_RATE_FAST:
+                        delay = 0.0
+                        self._wait_for_replay_consumer()
+                    else:
+                        delay = start_mono + frame_count / rate - tm.monotonic()
+                    if delay > 0:
+                        tm.sleep(delay)
+
+                    if jpeg_data is not None:
+                        if jpeg_size is None:
+                            # Recordings are expected to have a constant resolution; decode the first frame once.
+                            decoded = cv2.imdecode(np.frombuffer(jpeg_data, np.uint8), cv2.IMREAD_GRAYSCALE)
+                            if decoded is None:
+                                self.health.record_decode_failure("replay_jpeg")
+                                continue
+                            jpeg_size = (decoded.shape[1], decoded.shape[0])
+                            self.resolution = jpeg_size
+                        frame = CameraFrame(
+                            jpeg=jpeg_data,
+                            jpeg_quality=self.jpeg_quality,
+                            reduce_factor=self._inference_reduce_factor(jpeg_size[0], jpeg_size[1]),
+                            size=jpeg_size,
+                        )
+                    else:
+                        if frame_count == 0:
+                            self.resolution = (array.shape[1], array.shape[0])
+                        frame = self._raw_camera_frame(array)
+
+                    replay_clock.set(position_s)
+                    self._on_captured_frame(frame)
+                    with self.lock:
+                        self._append_frame_locked(frame)
+                    frame_count += 1
+            except Exception as e:
+                logging.error(f"[CAMERA] Replay error: {e}")
+                self.camera_state = self.STATE_ERROR
+                return
+
+            elapsed = tm.monotonic() - start_mono
+            logging.info(
+                f"[CAMERA] Replay pass finished: {frame_count} frames in {elapsed:.1f}s "
+                f"({(frame_count / elapsed) if elapsed > 0 else 0.0:.1f} fps)"
+            )
+            if frame_count == 0:
+                logging.error(f"[CAMERA] Replay source '{self.replay_path}' contains no frames")
+                self.camera_state = self.STATE_ERROR
+                return
+            if not self.replay_loop:
+                break
+
+        if not self.stopped:
+            # Keep the last frame buffered; "stopped" also keeps the no-frame watchdog from reinitializing.
+            self.camera_state = self.STATE_STOPPED
+
     def update(self):
         if self.source == "internal":
             self.camera_state = self.STATE_INTERNAL
             # Internal Raspberry Pi camera via libcamera-vid
             tuning_option = f"--tuning-file {self.tuning_file}" if self.tuning_file else ""
+            self.health.set_backend("libcamera-mjpeg")
+            # libcamera-vid always runs at the configured framerate; the framerate governor drops
+            # frames here instead of restarting the camera (a restart leaves a capture gap and
+            # makes the auto exposure / white balance settle again, e.g. right when a cat arrives).
+            # The camera is mounted upside down. Let libcamera flip the sensor readout
+            # (--rotation 180) so the MJPEG frames are already upright and can be stored
+            # and served as-is without a decode/rotate/re-encode round trip.
             command = (
                 f"/usr/bin/libcamera-vid -t 0 --inline --width {self.resolution[0]} "
-                f"--height {self.resolution[1]} --framerate {self.framerate} "
+                f"--height {self.resolution[1]} --framerate {self.framerate} --rotation 180 "
                 f"--codec mjpeg --quality {self.jpeg_quality} {tuning_option} -o -"
             )
             logging.info(f"[CAMERA] Running command: {command}")
@@ -331,6 +1515,9 @@ class VideoStream:
             )
             logging.info(f"[CAMERA] Subprocess started: {self.process.pid}")
             buffer = b""
+            next_capture_deadline_mono = 0.0
+            # Frames arriving up to half a camera frame early still count as on time
+            arrival_tolerance_s = 0.5 / float(self.framerate or 10)
             try:
                 self.camera_state = self.STATE_RUNNING
                 while not self.stopped:
@@ -347,14 +1534,28 @@ class VideoStream:
                         jpeg_data = buffer[start:end]
                         buffer = buffer[end:]
 
-                    # Decode the JPEG frame
-                        frame = cv2.imdecode(np.frombuffer(jpeg_data, np.uint8), cv2.IMREAD_COLOR)
-                        if frame is not None:
-                            frame = cv2.rotate(frame, cv2.ROTATE_180)
+                        # Governed below the camera framerate: forward only every n-th frame.
+                        capture_frame_interval = self._internal_frame_interval()
+                        if capture_frame_interval > 0.0:
+                            now_mono = tm.monotonic()
+                            if now_mono + arrival_tolerance_s < next_capture_deadline_mono:
+                                continue
+                            next_capture_deadline_mono = max(next_capture_deadline_mono + capture_frame_interval, now_mono)
+
+                        # Keep the original JPEG; decoding is deferred until a consumer needs pixels.
+                        if len(jpeg_data) > 4 and jpeg_data.startswith(b'\xff\xd8'):
+                            frame = CameraFrame(
+                                jpeg=jpeg_data,
+                                jpeg_quality=self.jpeg_quality,
+                                reduce_factor=self._inference_reduce_factor(self.resolution[0], self.resolution[1]),
+                                size=self.resolution,
+                            )
+                            self._on_captured_frame(frame)
                             with self.lock:
                                 self._append_frame_locked(frame)
                         else:
-                            logging.error("[CAMERA] Failed to decode frame")
+                            self.health.record_decode_failure("mjpeg_extract")
+                            logging.error("[CAMERA] Failed to extract JPEG frame")
             except Exception as e:
                 logging.error(f"[CAMERA] Internal camera error: {e}")
                 self.camera_state = self.STATE_ERROR
@@ -404,22 +1605,40 @@ class VideoStream:
                     target_w, target_h = self._parse_target_resolution()
                     fps_limit = self._normalized_pipeline_fps_limit()
                     hw_modes_to_try: list[str] = []
-                    resolved_hw = resolve_ip_camera_hw_decode(self.ip_camera_hw_decode)
+                    resolved_hw = "none" if self._hw_decode_disabled else resolve_ip_camera_hw_decode(self.ip_camera_hw_decode)
                     if resolved_hw != "none":
                         hw_modes_to_try.append(self.ip_camera_hw_decode)
-                    if str(self.ip_camera_hw_decode or "").strip().lower() == "auto":
+                    if str(self.ip_camera_hw_decode or "").strip().lower() == "auto" and not self._hw_decode_disabled:
                         if resolved_hw != "vaapi":
                             hw_modes_to_try.append("vaapi")
                     hw_modes_to_try.append("none")
 
+                    # Dual-output mode: let FFmpeg also emit the model-sized frame so
+                    # inference does not need to resize the full-resolution frame.
+                    inference_out_size = None
+                    if self.inference_size and self._inference_reduce_factor(target_w, target_h) > 1:
+                        inference_out_size = inference_frame_size(
+                            target_w, target_h, self.inference_size[0], self.inference_size[1], self.inference_keep_aspect
+                        )
+
                     pipeline_started = False
+                    inference_reader = None
                     for hw_mode in hw_modes_to_try:
+                        inference_read_fd = inference_write_fd = None
+                        if inference_out_size:
+                            try:
+                                inference_read_fd, inference_write_fd = os.pipe()
+                            except Exception as e:
+                                logging.warning(f"[CAMERA] Failed to create inference output pipe, using single output: {e}")
+                                inference_read_fd = inference_write_fd = None
                         ffmpeg_cmd, hw_label = build_ip_camera_ffmpeg_cmd(
                             self.ip_camera_url,
                             target_w,
                             target_h,
                             fps_limit,
                             hw_mode,
+                            inference_size=inference_out_size if inference_write_fd is not None else None,
+                            inference_fd=inference_write_fd,
                         )
                         logging.info(
                             f"[CAMERA] Starting FFmpeg pipeline for IP camera at "
@@ -433,13 +1652,37 @@ class VideoStream:
                                 stdout=subprocess.PIPE,
                                 stderr=subprocess.PIPE,
                                 bufsize=target_w * target_h * 3 * 2,
+                                pass_fds=(inference_write_fd,) if inference_write_fd is not None else (),
                             )
                         except Exception as e:
                             logging.error(f"[CAMERA] Failed to start FFmpeg IP pipeline ({hw_label}): {e}")
                             self.process = None
+                            for fd in (inference_read_fd, inference_write_fd):
+                                if fd is not None:
+                                    try:
+                                        os.close(fd)
+                                    except Exception:
+                                        pass
                             continue
 
+                        self._stderr_monitor = FFmpegStderrMonitor(self.process, f"ffmpeg-{hw_label}", totals=self._stderr_totals)
+                        self.health.set_backend(f"ffmpeg-{hw_label}")
+
+                        if inference_write_fd is not None:
+                            # Only FFmpeg writes to the pipe; closing our copy makes EOF visible to the reader.
+                            os.close(inference_write_fd)
+                            inference_reader = _RawFrameReader(
+                                os.fdopen(inference_read_fd, "rb", buffering=inference_out_size[0] * inference_out_size[1] * 3),
+                                inference_out_size[0],
+                                inference_out_size[1],
+                            )
+                            logging.info(
+                                f"[CAMERA] FFmpeg dual-output mode: inference frames at "
+                                f"{inference_out_size[0]}x{inference_out_size[1]}"
+                            )
+
                         self.resolution = (target_w, target_h)
+                        full_frame_seq = 0
                         frame_bytes = target_w * target_h * 3
                         startup_deadline = tm.monotonic() + 5.0
                         first_frame_ok = False
@@ -449,10 +1692,12 @@ class VideoStream:
                             except Exception:
                                 raw = b""
                             if len(raw) == frame_bytes:
+                                full_frame_seq += 1
                                 try:
                                     frame = np.frombuffer(raw, dtype=np.uint8).reshape((target_h, target_w, 3))
+                                    small = inference_reader.take(full_frame_seq, timeout=1.0) if inference_reader else None
                                     with self.lock:
-                                        self._append_frame_locked(frame)
+                                        self._append_frame_locked(self._raw_camera_frame(frame, small))
                                     first_frame_ok = True
                                     break
                                 except Exception:
@@ -462,16 +1707,9 @@ class VideoStream:
                             tm.sleep(0.05)
 
                         if first_frame_ok:
-                            self._start_process_stderr_drain(self.process, f"ffmpeg-{hw_label}")
                             pipeline_started = True
                             break
 
-                        stderr_tail = b""
-                        try:
-                            if self.process.stderr is not None:
-                                stderr_tail = self.process.stderr.read() or b""
-                        except Exception:
-                            pass
                         try:
                             if self.process:
                                 self.process.terminate()
@@ -484,11 +1722,14 @@ class VideoStream:
                                 pass
                         finally:
                             self.process = None
+                        if inference_reader is not None:
+                            inference_reader.close()
+                            inference_reader = None
                         if hw_mode != "none":
                             logging.warning(
                                 f"[CAMERA] FFmpeg hardware decode ({hw_label}) failed to produce frames; "
                                 f"falling back to software decode. "
-                                f"{stderr_tail.decode('utf-8', errors='replace')[-1200:]}"
+                                f"{self._stderr_monitor.tail()[-1200:]}"
                             )
 
                     if not pipeline_started:
@@ -501,7 +1742,6 @@ class VideoStream:
 
                     self.camera_state = self.STATE_RUNNING
                     capture_fps_limit = self._normalized_pipeline_fps_limit()
-                    capture_frame_interval = (1.0 / float(capture_fps_limit)) if capture_fps_limit > 0 else 0.0
                     next_capture_deadline_mono = tm.monotonic()
 
                     if capture_fps_limit > 0:
@@ -514,8 +1754,11 @@ class VideoStream:
                             logging.error(f"[CAMERA] FFmpeg pipeline read error: {e}")
                             raw = b""
 
-                        if len(raw) != frame_bytes:
+                        if len(raw) == frame_bytes:
+                            full_frame_seq += 1
+                        else:
                             corrupt_frame_count += 1
+                            self.health.record_decode_failure("incomplete_frame")
                             logging.warning(
                                 f"[CAMERA] Incomplete frame from FFmpeg pipeline (count={corrupt_frame_count}, got={len(raw)}/{frame_bytes})"
                             )
@@ -529,6 +1772,7 @@ class VideoStream:
                             frame = np.frombuffer(raw, dtype=np.uint8).reshape((target_h, target_w, 3))
                         except Exception as e:
                             corrupt_frame_count += 1
+                            self.health.record_decode_failure("corrupt_frame")
                             logging.warning(f"[CAMERA] Corrupt FFmpeg frame reshape error (count={corrupt_frame_count}): {e}")
                             if corrupt_frame_count >= max_corrupt_frames:
                                 logging.error("[CAMERA] Too many corrupt FFmpeg frames, reconnecting...")
@@ -536,6 +1780,8 @@ class VideoStream:
                                 break
                             continue
 
+                        # The interval follows the framerate governor (idle/active) if enabled.
+                        capture_frame_interval = self._governor_frame_interval(capture_fps_limit)
                         if capture_frame_interval > 0.0:
                             now_mono = tm.monotonic()
                             if now_mono < next_capture_deadline_mono:
@@ -544,8 +1790,16 @@ class VideoStream:
                             next_capture_deadline_mono = max(next_capture_deadline_mono + capture_frame_interval, now_mono)
 
                         corrupt_frame_count = 0
+                        small = inference_reader.take(full_frame_seq) if inference_reader else None
+                        camera_frame = self._raw_camera_frame(frame, small)
+                        self._on_captured_frame(camera_frame)
                         with self.lock:
-                            self._append_frame_locked(frame)
+                            self._append_frame_locked(camera_frame)
+
+                        # Reconnect / hw-decode fallback policy based on the rolling decode error rate.
+                        if full_frame_seq % 10 == 0 and self._should_reconnect_on_decode_errors(hw_label):
+                            self.camera_state = self.STATE_ERROR
+                            break
 
                     try:
                         if self.process:
@@ -561,15 +1815,20 @@ class VideoStream:
                         pass
                     finally:
                         self.process = None
+                        if inference_reader is not None:
+                            inference_reader.close()
+                            inference_reader = None
 
                     if self.stopped:
                         break
+                    self.health.record_reconnect()
                     logging.info(f"[CAMERA] Reconnecting FFmpeg IP camera pipeline in {retry_delay}s...")
                     self.camera_state = self.STATE_INITIALIZING
                     tm.sleep(retry_delay)
                     continue
 
                 self.cap = cv2.VideoCapture(self.ip_camera_url)
+                self.health.set_backend("opencv")
                 if not self.cap.isOpened():
                     logging.error(f"[CAMERA] Failed to open IP camera stream: {self.ip_camera_url}. Retrying in {retry_delay}s...")
                     self.camera_state = self.STATE_ERROR
@@ -601,7 +1860,6 @@ class VideoStream:
                 self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, max_h)
 
                 capture_fps_limit = self._normalized_pipeline_fps_limit()
-                capture_frame_interval = (1.0 / float(capture_fps_limit)) if capture_fps_limit > 0 else 0.0
                 next_capture_deadline_mono = tm.monotonic()
                 sample_corruption_check_every = 15
                 sample_stride = 16
@@ -621,6 +1879,7 @@ class VideoStream:
                         # Keep draining the decoder continuously and only forward frames
                         # at the configured cadence. This avoids H264 decode instability
                         # on some streams when reads are artificially delayed.
+                        capture_frame_interval = self._governor_frame_interval(capture_fps_limit)
                         if capture_frame_interval > 0.0:
                             now_mono = tm.monotonic()
                             if now_mono < next_capture_deadline_mono:
@@ -640,6 +1899,7 @@ class VideoStream:
 
                     if frame_invalid:
                         corrupt_frame_count += 1
+                        self.health.record_decode_failure("invalid_frame")
                         logging.warning(f"[CAMERA] Corrupt frame detected from IP camera (count={corrupt_frame_count})")
                         if corrupt_frame_count >= max_corrupt_frames:
                             logging.error("[CAMERA] Too many corrupt frames, reconnecting IP camera stream...")
@@ -649,14 +1909,19 @@ class VideoStream:
 
                     corrupt_frame_count = 0  # Reset on good frame
 
+                    camera_frame = self._raw_camera_frame(frame)
+                    self._on_captured_frame(camera_frame)
                     with self.lock:
-                        self._append_frame_locked(frame)
+                        self._append_frame_locked(camera_frame)
                 self.cap.release()
                 if self.stopped:
                     break
+                self.health.record_reconnect()
                 logging.info(f"[CAMERA] Reconnecting to IP camera in {retry_delay}s...")
                 self.camera_state = self.STATE_INITIALIZING
                 tm.sleep(retry_delay)
+        elif self.source == "replay" and self.replay_path:
+            self._run_replay()
         else:
             logging.error("[CAMERA] Invalid source or missing IP camera URL")
             self.camera_state = self.STATE_ERROR
@@ -683,7 +1948,9 @@ class VideoStream:
             cv2.putText(final_frame, text, (text_x, text_y), font, font_scale, (255, 255, 255), thickness, cv2.LINE_AA)
 
             with self.lock:
-                self.frames = [final_frame]
+                self.frames = [CameraFrame(array=final_frame)]
+                self.frames[0].frame_id = self._next_frame_id
+                self.frame_bus.publish(self.frames[0])
                 self.frame_ids = [self._next_frame_id]
                 self._next_frame_id += 1
                 self._last_read_oldest_frame_id = 0
@@ -692,6 +1959,12 @@ class VideoStream:
 
     def read(self):
         # Return the most recent frame
+        with self.lock:
+            latest = self.frames[-1] if self.frames else None
+        return latest.array() if latest is not None else None
+
+    def read_frame(self) -> Optional[CameraFrame]:
+        """Return the most recent CameraFrame (JPEG bytes + lazily decoded array)."""
         with self.lock:
             return self.frames[-1] if self.frames else None
 
@@ -700,7 +1973,39 @@ class VideoStream:
         with self.lock:
             return int(self.frame_ids[-1]) if self.frame_ids else 0
 
-    def read_oldest(self):
+    def pending_frame_count(self) -> int:
+        """Return the number of buffered frames that read_oldest_frame() has not returned yet."""
+        with self.lock:
+            return sum(1 for frame_id in self.frame_ids if frame_id > self._last_read_oldest_frame_id)
+
+    def read_oldest(self, with_capture_time: bool = False):
+        """Return the decoded array of the oldest unread frame (see read_oldest_frame()).
+
+        With with_capture_time=True, return (frame, frame_id, timestamp, timestamp_mono)
+        where the timestamps are the wall-clock and monotonic capture times.
+        """
+        captured = self.read_oldest_frame()
+        frame = captured.array() if captured is not None else None
+        if not with_capture_time:
+            return frame
+        if captured is None:
+            return None, 0, None, None
+        return frame, captured.frame_id, captured.timestamp, captured.timestamp_mono
+
+    def skip_to_latest_frame(self) -> int:
+        """Mark all but the newest unread frame as read, so read_oldest_frame() returns the newest one.
+
+        Returns the number of skipped frames.
+        """
+        with self.lock:
+            if not self.frame_ids:
+                return 0
+            newest_id = self.frame_ids[-1]
+            skipped = sum(1 for frame_id in self.frame_ids[:-1] if frame_id > self._last_read_oldest_frame_id)
+            self._last_read_oldest_frame_id = max(self._last_read_oldest_frame_id, newest_id - 1)
+            return skipped
+
+    def read_oldest_frame(self) -> Optional[CameraFrame]:
         # Return and remove the oldest unread frame from the list, but keep the latest frame buffered.
         with self.lock:
             if not self.frames:
@@ -719,6 +2024,7 @@ class VideoStream:
                 return None
 
             self._last_read_oldest_frame_id = frame_id
+            self._last_consumer_read_mono = tm.monotonic()
             if len(self.frames) > 1:
                 self.frame_ids.pop(0)
                 return self.frames.pop(0)
@@ -752,9 +2058,21 @@ class VideoStream:
         elif self.source == "ip_camera" and self.cap:
             self.cap.release()
             logging.info("[CAMERA] IP camera stream stopped.")
+        elif self.source == "replay":
+            logging.info("[CAMERA] Replay stream stopped.")
         else:
             logging.error("[CAMERA] Video stream not yet started. Nothing to stop.")
 
+# Compact detection rows of the model decoders: box in percent of the image, probability in percent, class index
+DETECTION_DTYPE = np.dtype([
+    ("x", np.float64),
+    ("y", np.float64),
+    ("w", np.float64),
+    ("h", np.float64),
+    ("probability", np.float64),
+    ("cls", np.int32),
+])
+
 class DetectedObject:
     def __init__(self, x: float, y: float, width: float, height: float, object_name: str, probability: float):
         self.x = x  # x as percentage of image width
@@ -764,16 +2082,28 @@ class DetectedObject:
         self.object_name = object_name
         self.probability = probability
 
+    @classmethod
+    def from_detections(cls, detections: np.ndarray, labels: list[str]) -> List["DetectedObject"]:
+        """Create DetectedObject instances from DETECTION_DTYPE rows (class index -> label name)."""
+        objects = []
+        for x, y, w, h, probability, cls_idx in detections.tolist():
+            object_name = labels[cls_idx] if 0 <= cls_idx < len(labels) else str(cls_idx)
+            objects.append(cls(x, y, w, h, object_name, probability))
+        return objects
+
 class ImageBufferElement:
     def __init__(self, id: int, block_id: int, timestamp: float, original_image: bytes | None, modified_image: bytes | None, 
                  mouse_probability: float, no_mouse_probability: float, own_cat_probability: float, tag_id: str = "", detected_objects: List[DetectedObject] = None,
-                 timestamp_mono: float | None = None):
+                 timestamp_mono: float | None = None, frame_id: int = 0, decision_timestamp_mono: float | None = None):
         self.id = id
         self.block_id = block_id
         # Wall-clock timestamp (epoch seconds). Used for persistence / DB correlation.
         self.timestamp = timestamp
         # Monotonic timestamp (seconds since boot). Used for all duration/timeout logic.
         self.timestamp_mono = float(timestamp_mono) if timestamp_mono is not None else float(tm.monotonic())
+        # Camera frame id and monotonic time the model result became available.
+        self.frame_id = frame_id
+        self.decision_timestamp_mono = float(decision_timestamp_mono) if decision_timestamp_mono is not None else None
         self.original_image = original_image
         self.modified_image = modified_image
         self.mouse_probability = mouse_probability
@@ -782,92 +2112,286 @@ class ImageBufferElement:
         self.tag_id = tag_id
         self.detected_objects = detected_objects
 
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the image payloads of this element."""
+        return len(self.original_image or b"") + len(self.modified_image or b"")
+
+    @property
+    def capture_latency(self) -> float | None:
+        """Seconds between frame capture and the model decision, if known."""
+        if self.decision_timestamp_mono is None:
+            return None
+        return max(0.0, self.decision_timestamp_mono - self.timestamp_mono)
+
     def __repr__(self):
-        return (f"ImageBufferElement(id={self.id}, block_id={self.block_id}, timestamp={self.timestamp}, timestamp_mono={self.timestamp_mono}, mouse_probability={self.mouse_probability}, "
+        return (f"ImageBufferElement(id={self.id}, block_id={self.block_id}, frame_id={self.frame_id}, timestamp={self.timestamp}, timestamp_mono={self.timestamp_mono}, mouse_probability={self.mouse_probability}, "
                 f"no_mouse_probability={self.no_mouse_probability}, own_cat_probability={self.own_cat_probability}, tag_id={self.tag_id}, detected_objects={self.detected_objects})")
 
 class ImageBuffer:
+    """Recent model results with their JPEG images, collected into motion blocks by the backend.
+
+    Elements are kept in an ordered dict keyed by element id (insertion order),
+    with a block id index. The metadata the backend filters on (timestamps, block
+    id, probabilities, flags) is mirrored into preallocated numpy columns, one slot
+    per element, so the filter queries are vectorized mask operations. All access
+    is serialized by a lock, since the model thread appends while the backend and
+    database threads query, assign and delete elements.
+
+    Retention: while there is no active or recent motion, only the last
+    IMAGE_BUFFER_PREROLL_S seconds are kept (the pre-roll of the next motion
+    block). During motion and for MOTION_RETENTION_GRACE_S afterwards (until the
+    backend has assigned the block), frames are kept. IMAGE_BUFFER_MAX_MB bounds
+    the image payload at all times; unassigned frames are evicted first.
+    """
     MAX_IMAGE_BUFFER_SIZE = 1000
+    # Keep frames this long after the motion ended, so the motion block can still be assigned
+    MOTION_RETENTION_GRACE_S = 30.0
+    # The camera-based motion detection looks 5s back for cat frames
+    MIN_PREROLL_S = 5.0
+    PRUNE_INTERVAL_S = 1.0
+
+    # Bits of the flags column. The threshold bits are set by assign_block().
+    FLAG_TAG = 1
+    FLAG_MOUSE = 2
+    FLAG_NO_MOUSE = 4
+    FLAG_OWN_CAT = 8
 
     def __init__(self):
         """Initialize an empty buffer."""
-        self._buffer: List[ImageBufferElement] = []
+        self._lock = threading.RLock()
+        self._elements: "OrderedDict[int, ImageBufferElement]" = OrderedDict()
+        # block_id -> ids of the elements in that block (block 0 = not assigned)
+        self._by_block: dict[int, set[int]] = {}
+        # Columnar metadata: element id -> slot; id -1 marks a free slot
+        capacity = self.MAX_IMAGE_BUFFER_SIZE
+        self._slot_of: dict[int, int] = {}
+        self._free_slots: List[int] = list(range(capacity - 1, -1, -1))
+        self._col_id = np.full(capacity, -1, dtype=np.int64)
+        self._col_timestamp = np.zeros(capacity, dtype=np.float64)
+        self._col_timestamp_mono = np.zeros(capacity, dtype=np.float64)
+        self._col_block_id = np.zeros(capacity, dtype=np.int64)
+        self._col_mouse = np.zeros(capacity, dtype=np.float64)
+        self._col_no_mouse = np.zeros(capacity, dtype=np.float64)
+        self._col_own_cat = np.zeros(capacity, dtype=np.float64)
+        self._col_flags = np.zeros(capacity, dtype=np.uint8)
         self._next_id = 0
+        self._bytes = 0
+        self._motion_active = False
+        self._last_motion_mono = 0.0
+        self._last_prune_mono = 0.0
+        self._evicted = {"count": 0, "time": 0, "memory": 0}
+
+    # --- Index maintenance (call with the lock held) ---
+
+    def _insert_locked(self, element: ImageBufferElement) -> None:
+        slot = self._free_slots.pop()
+        self._slot_of[element.id] = slot
+        self._col_id[slot] = element.id
+        self._col_timestamp[slot] = float(element.timestamp)
+        self._col_timestamp_mono[slot] = float(element.timestamp_mono)
+        self._col_block_id[slot] = element.block_id
+        self._col_mouse[slot] = element.mouse_probability
+        self._col_no_mouse[slot] = element.no_mouse_probability
+        self._col_own_cat[slot] = element.own_cat_probability
+        self._col_flags[slot] = self.FLAG_TAG if element.tag_id else 0
+        self._elements[element.id] = element
+        self._by_block.setdefault(element.block_id, set()).add(element.id)
+        self._bytes += element.nbytes
+
+    def _remove_locked(self, id: int) -> Optional[ImageBufferElement]:
+        element = self._elements.pop(id, None)
+        if element is None:
+            return None
+        self._unindex_block_locked(element)
+        slot = self._slot_of.pop(id)
+        self._col_id[slot] = -1
+        self._free_slots.append(slot)
+        self._bytes = max(0, self._bytes - element.nbytes)
+        return element
+
+    def _unindex_block_locked(self, element: ImageBufferElement) -> None:
+        ids = self._by_block.get(element.block_id)
+        if ids is not None:
+            ids.discard(element.id)
+            if not ids:
+                del self._by_block[element.block_id]
+
+    def _filter_ids_locked(self, timestamps: np.ndarray, min_ts, max_ts,
+                           min_mouse_probability, max_mouse_probability,
+                           min_no_mouse_probability, max_no_mouse_probability,
+                           min_own_cat_probability, max_own_cat_probability) -> List[int]:
+        """Vectorized filter over the metadata columns; returns the matching ids in id order."""
+        mask = (self._col_id >= 0) & (timestamps >= min_ts) & (timestamps <= max_ts)
+        if min_mouse_probability > 0.0 or max_mouse_probability < 100.0:
+            mask &= (self._col_mouse >= min_mouse_probability) & (self._col_mouse <= max_mouse_probability)
+        if min_no_mouse_probability > 0.0 or max_no_mouse_probability < 100.0:
+            mask &= (self._col_no_mouse >= min_no_mouse_probability) & (self._col_no_mouse <= max_no_mouse_probability)
+        if min_own_cat_probability > 0.0 or max_own_cat_probability < 100.0:
+            mask &= (self._col_own_cat >= min_own_cat_probability) & (self._col_own_cat <= max_own_cat_probability)
+        return np.sort(self._col_id[mask]).tolist()
+
+    # --- Retention ---
+
+    @classmethod
+    def _retention_limits(cls) -> tuple[float, int]:
+        """Return (pre-roll seconds, byte budget) from CONFIG."""
+        try:
+            preroll_s = max(cls.MIN_PREROLL_S, float(CONFIG.get('IMAGE_BUFFER_PREROLL_S', 10.0) or 10.0))
+        except (TypeError, ValueError):
+            preroll_s = 10.0
+        try:
+            max_bytes = max(1, int(CONFIG.get('IMAGE_BUFFER_MAX_MB', 64) or 64)) * 1024 * 1024
+        except (TypeError, ValueError):
+            max_bytes = 64 * 1024 * 1024
+        return preroll_s, max_bytes
+
+    def set_motion_active(self, active: bool) -> None:
+        """Report the current motion state (called by the backend loop); also applies the time-based retention."""
+        now = tm.monotonic()
+        with self._lock:
+            if active or self._motion_active:
+                self._last_motion_mono = now
+            self._motion_active = bool(active)
+            if now - self._last_prune_mono >= self.PRUNE_INTERVAL_S:
+                self._prune_expired_locked(now)
+
+    def is_motion_active(self) -> bool:
+        """True while the backend reports motion at the flap."""
+        with self._lock:
+            return self._motion_active
+
+    def _prune_expired_locked(self, now: float) -> None:
+        """Drop unassigned frames older than the pre-roll window while there is no (recent) motion."""
+        self._last_prune_mono = now
+        if self._motion_active or (now - self._last_motion_mono) < self.MOTION_RETENTION_GRACE_S:
+            return
+        preroll_s, __ = self._retention_limits()
+        mask = (self._col_id >= 0) & (self._col_block_id == 0) & (self._col_timestamp_mono < now - preroll_s)
+        expired = self._col_id[mask].tolist()
+        for id in expired:
+            self._remove_locked(id)
+        self._evicted["count"] += len(expired)
+        self._evicted["time"] += len(expired)
+
+    def _enforce_memory_budget_locked(self) -> None:
+        """Evict the oldest frames (unassigned ones first) until the byte budget is met."""
+        __, max_bytes = self._retention_limits()
+        while self._bytes > max_bytes and len(self._elements) > 1:
+            id = next((id for id, e in self._elements.items() if e.block_id == 0), next(iter(self._elements)))
+            self._remove_locked(id)
+            self._discarded_count += 1
+            self._evicted["count"] += 1
+            self._evicted["memory"] += 1
+
+    def get_stats(self) -> dict:
+        """Return buffer occupancy, memory use and retention counters."""
+        preroll_s, max_bytes = self._retention_limits()
+        now = tm.monotonic()
+        with self._lock:
+            valid = self._col_id >= 0
+            oldest = float(self._col_timestamp_mono[valid].min()) if valid.any() else None
+            return {
+                "elements": len(self._elements),
+                "max_elements": self.MAX_IMAGE_BUFFER_SIZE,
+                "blocks": len([b for b in self._by_block if b != 0]),
+                "bytes": self._bytes,
+                "max_bytes": max_bytes,
+                "preroll_s": preroll_s,
+                "motion_active": self._motion_active,
+                "oldest_age_s": round(now - oldest, 1) if oldest is not None else None,
+                "evicted": dict(self._evicted),
+            }
 
     def append(self, timestamp: float, original_image: bytes | None, modified_image: bytes | None, 
                mouse_probability: float, no_mouse_probability: float, own_cat_probability: float, detected_objects: List[DetectedObject] = None,
-               timestamp_mono: float | None = None):
+               timestamp_mono: float | None = None, frame_id: int = 0, decision_timestamp_mono: float | None = None):
         """
         Append a new element to the buffer.
+
+        timestamp/timestamp_mono are the capture times of the camera frame.
         """
-        # --- Periodic logging for discarded elements ---
-        if not hasattr(self, '_last_log_time'):
-            self._last_log_time = timestamp
-            self._appended_count = 0
-            self._max_mouse_prob = 0.0
-            self._max_no_mouse_prob = 0.0
-            self._max_own_cat_prob = 0.0
-            self._discarded_count = 0
-            self._last_discard_log_time = timestamp
-
-        if len(self._buffer) >= self.MAX_IMAGE_BUFFER_SIZE:
-            self._buffer.pop(0)
-            self._discarded_count += 1
+        with self._lock:
+            # --- Periodic logging for discarded elements ---
+            if not hasattr(self, '_last_log_time'):
+                self._last_log_time = timestamp
+                self._appended_count = 0
+                self._max_mouse_prob = 0.0
+                self._max_no_mouse_prob = 0.0
+                self._max_own_cat_prob = 0.0
+                self._discarded_count = 0
+                self._last_discard_log_time = timestamp
 
-        element = ImageBufferElement(
-            self._next_id,
-            0,
-            timestamp,
-            original_image,
-            modified_image,
-            mouse_probability,
-            no_mouse_probability,
-            own_cat_probability,
-            detected_objects=detected_objects,
-            timestamp_mono=timestamp_mono,
-        )
-        self._buffer.append(element)
-
-        self._appended_count += 1
-        self._max_mouse_prob = max(self._max_mouse_prob, mouse_probability)
-        self._max_no_mouse_prob = max(self._max_no_mouse_prob, no_mouse_probability)
-        self._max_own_cat_prob = max(self._max_own_cat_prob, own_cat_probability)
-
-        # Periodic combined log for appended images, max probabilities and discarded elements
-        if (timestamp - self._last_log_time >= 60) or (timestamp - self._last_discard_log_time >= 60):
-            parts = []
-
-            if timestamp - self._last_log_time >= 60:
-                parts.append(
-                    f"{self._appended_count} images appended in last 60s. "
-                    f"Max Mouse prob: {self._max_mouse_prob}, "
-                    f"Max No-mouse prob: {self._max_no_mouse_prob}, "
-                    f"Max Own-cat prob: {self._max_own_cat_prob}."
-                )
+            if len(self._elements) >= self.MAX_IMAGE_BUFFER_SIZE:
+                self._remove_locked(next(iter(self._elements)))
+                self._discarded_count += 1
+                self._evicted["count"] += 1
+
+            element = ImageBufferElement(
+                self._next_id,
+                0,
+                timestamp,
+                original_image,
+                modified_image,
+                mouse_probability,
+                no_mouse_probability,
+                own_cat_probability,
+                detected_objects=detected_objects,
+                timestamp_mono=timestamp_mono,
+                frame_id=frame_id,
+                decision_timestamp_mono=decision_timestamp_mono,
+            )
+            self._insert_locked(element)
+            self._enforce_memory_budget_locked()
+            now_mono = tm.monotonic()
+            if now_mono - self._last_prune_mono >= self.PRUNE_INTERVAL_S:
+                self._prune_expired_locked(now_mono)
+
+            self._appended_count += 1
+            self._max_mouse_prob = max(self._max_mouse_prob, mouse_probability)
+            self._max_no_mouse_prob = max(self._max_no_mouse_prob, no_mouse_probability)
+            self._max_own_cat_prob = max(self._max_own_cat_prob, own_cat_probability)
+
+            # Periodic combined log for appended images, max probabilities and discarded elements
+            if (timestamp - self._last_log_time >= 60) or (timestamp - self._last_discard_log_time >= 60):
+                parts = []
+
+                if timestamp - self._last_log_time >= 60:
+                    parts.append(
+                        f"{self._appended_count} images appended in last 60s. "
+                        f"Max Mouse prob: {self._max_mouse_prob}, "
+                        f"Max No-mouse prob: {self._max_no_mouse_prob}, "
+                        f"Max Own-cat prob: {self._max_own_cat_prob}."
+                    )
 
-            if timestamp - self._last_discard_log_time >= 60:
-                if self._discarded_count > 0:
+                if timestamp - self._last_log_time >= 60:
                     parts.append(
-                        f"{self._discarded_count} oldest elements discarded from buffer in last 60s."
+                        f"Buffer holds {len(self._elements)} images ({self._bytes / (1024 * 1024):.1f} MB)."
                     )
-                else:
-                    parts.append("No discarded elements in last 60s.")
 
-            logging.info("[IMAGEBUFFER] " + " ".join(parts))
+                if timestamp - self._last_discard_log_time >= 60:
+                    if self._discarded_count > 0:
+                        parts.append(
+                            f"{self._discarded_count} oldest elements discarded from buffer in last 60s."
+                        )
+                    else:
+                        parts.append("No discarded elements in last 60s.")
 
-            # Reset counters/timestamps only for the sections we just logged
-            if timestamp - self._last_log_time >= 60:
-                self._last_log_time = timestamp
-                self._appended_count = 0
-                self._max_mouse_prob = 0.0
-                self._max_no_mouse_prob = 0.0
-                self._max_own_cat_prob = 0.0
+                logging.info("[IMAGEBUFFER] " + " ".join(parts))
 
-            if timestamp - self._last_discard_log_time >= 60:
-                self._last_discard_log_time = timestamp
-                self._discarded_count = 0
+                # Reset counters/timestamps only for the sections we just logged
+                if timestamp - self._last_log_time >= 60:
+                    self._last_log_time = timestamp
+                    self._appended_count = 0
+                    self._max_mouse_prob = 0.0
+                    self._max_no_mouse_prob = 0.0
+                    self._max_own_cat_prob = 0.0
 
-        self._next_id += 1
+                if timestamp - self._last_discard_log_time >= 60:
+                    self._last_discard_log_time = timestamp
+                    self._discarded_count = 0
+
+            self._next_id += 1
 
 
     def pop(self) -> Optional[ImageBufferElement]:
@@ -877,14 +2401,22 @@ class ImageBuffer:
         Returns:
             Optional[ImageBufferElement]: The last element if the buffer is not empty, else None.
         """
-        if self._buffer:
-            logging.info(f"[IMAGEBUFFER] Popped element with ID {self._buffer[-1].id} from the buffer.")
-            return self._buffer.pop()
+        with self._lock:
+            if self._elements:
+                last_id = next(reversed(self._elements))
+                logging.info(f"[IMAGEBUFFER] Popped element with ID {last_id} from the buffer.")
+                return self._remove_locked(last_id)
         return None
 
     def clear(self):
         """Clear all elements in the buffer."""
-        self._buffer.clear()
+        with self._lock:
+            self._elements.clear()
+            self._by_block.clear()
+            self._slot_of.clear()
+            self._free_slots = list(range(self.MAX_IMAGE_BUFFER_SIZE - 1, -1, -1))
+            self._col_id.fill(-1)
+            self._bytes = 0
 
     def size(self) -> int:
         """
@@ -893,7 +2425,8 @@ class ImageBuffer:
         Returns:
             int: The number of elements in the buffer.
         """
-        return len(self._buffer)
+        with self._lock:
+            return len(self._elements)
 
     def get_all(self) -> List[ImageBufferElement]:
         """
@@ -902,7 +2435,8 @@ class ImageBuffer:
         Returns:
             List[ImageBufferElement]: A list of all elements in the buffer.
         """
-        return self._buffer[:]
+        with self._lock:
+            return list(self._elements.values())
     
     def get_by_id(self, id: int) -> Optional[ImageBufferElement]:
         """
@@ -914,10 +2448,8 @@ class ImageBuffer:
         Returns:
             Optional[ImageBufferElement]: The element with the given ID if found, else None.
         """
-        for element in self._buffer:
-            if element.id == id:
-                return element
-        return None
+        with self._lock:
+            return self._elements.get(id)
     
     def delete_by_id(self, id: int) -> bool:
         """
@@ -929,14 +2461,14 @@ class ImageBuffer:
         Returns:
             bool: True if the element was deleted, else False.
         """
-        for i, element in enumerate(self._buffer):
-            if element.id == id:
-                self._buffer.pop(i)
-                logging.debug(f"[IMAGEBUFFER] Deleted element with ID {id} from the buffer.")
-                return True
+        with self._lock:
+            deleted = self._remove_locked(id) is not None
+        if deleted:
+            logging.debug(f"[IMAGEBUFFER] Deleted element with ID {id} from the buffer.")
+            return True
         logging.warning(f"[IMAGEBUFFER] Element with ID {id} not found in the buffer. Nothing was deleted.")
         return False
-    
+
     def get_filtered_ids(self, min_timestamp=0.0, 
                          max_timestamp=float('inf'), 
                          min_mouse_probability=0.0, 
@@ -961,11 +2493,13 @@ class ImageBuffer:
         Returns:
             List[int]: A list of IDs that match the filter criteria.
         """
-        return [element.id for element in self._buffer if 
-                (min_timestamp <= element.timestamp <= max_timestamp) and 
-                (min_mouse_probability <= element.mouse_probability <= max_mouse_probability) and 
-                (min_no_mouse_probability <= element.no_mouse_probability <= max_no_mouse_probability) and
-                (min_own_cat_probability <= element.own_cat_probability <= max_own_cat_probability)]
+        with self._lock:
+            return self._filter_ids_locked(
+                self._col_timestamp, min_timestamp, max_timestamp,
+                min_mouse_probability, max_mouse_probability,
+                min_no_mouse_probability, max_no_mouse_probability,
+                min_own_cat_probability, max_own_cat_probability,
+            )
 
     def get_filtered_ids_mono(self, min_timestamp_mono=0.0,
                               max_timestamp_mono=float('inf'),
@@ -979,14 +2513,13 @@ class ImageBuffer:
 
         This is the preferred API for backend motion/timeout logic.
         """
-        return [
-            element.id
-            for element in self._buffer
-            if (min_timestamp_mono <= float(getattr(element, "timestamp_mono", 0.0) or 0.0) <= max_timestamp_mono)
-            and (min_mouse_probability <= element.mouse_probability <= max_mouse_probability)
-            and (min_no_mouse_probability <= element.no_mouse_probability <= max_no_mouse_probability)
-            and (min_own_cat_probability <= element.own_cat_probability <= max_own_cat_probability)
-        ]
+        with self._lock:
+            return self._filter_ids_locked(
+                self._col_timestamp_mono, min_timestamp_mono, max_timestamp_mono,
+                min_mouse_probability, max_mouse_probability,
+                min_no_mouse_probability, max_no_mouse_probability,
+                min_own_cat_probability, max_own_cat_probability,
+            )
 
     def get_filtered_ids_recent(self, seconds: float,
                                 min_mouse_probability=0.0,
@@ -1023,11 +2556,27 @@ class ImageBuffer:
         Returns:
             bool: True if the element was updated, else False.
         """
-        for element in self._buffer:
-            if element.id == id:
-                element.block_id = block_id
-                return True
-        return False
+        with self._lock:
+            element = self._elements.get(id)
+            if element is None:
+                return False
+            self._set_block_locked(element, block_id)
+            return True
+
+    def _set_block_locked(self, element: ImageBufferElement, block_id: int) -> None:
+        if element.block_id != block_id:
+            self._unindex_block_locked(element)
+            element.block_id = block_id
+            self._by_block.setdefault(block_id, set()).add(element.id)
+            self._col_block_id[self._slot_of[element.id]] = block_id
+
+    def _set_tag_locked(self, element: ImageBufferElement, tag_id: str) -> None:
+        element.tag_id = tag_id
+        slot = self._slot_of[element.id]
+        if tag_id:
+            self._col_flags[slot] |= self.FLAG_TAG
+        else:
+            self._col_flags[slot] &= ~np.uint8(self.FLAG_TAG)
     
     def update_tag_id(self, id: int, tag_id: str) -> bool:
         """
@@ -1040,11 +2589,12 @@ class ImageBuffer:
         Returns:
             bool: True if the element was updated, else False.
         """
-        for element in self._buffer:
-            if element.id == id:
-                element.tag_id = tag_id
-                return True
-        return False
+        with self._lock:
+            element = self._elements.get(id)
+            if element is None:
+                return False
+            self._set_tag_locked(element, tag_id)
+            return True
     
     def get_by_block_id(self, block_id: int) -> List[ImageBufferElement]:
         """
@@ -1056,8 +2606,111 @@ class ImageBuffer:
         Returns:
             List[ImageBufferElement]: A list of elements with the given block ID.
         """
-        return [element for element in self._buffer if element.block_id == block_id]
+        with self._lock:
+            return [self._elements[id] for id in sorted(self._by_block.get(block_id, ()))]
+
+    def assign_block(self, block_id: int,
+                     min_timestamp: float = 0.0,
+                     max_timestamp: float = float('inf'),
+                     tag_id: str | None = None,
+                     threshold: float | None = None,
+                     predicate=None) -> "ImageBufferBlock":
+        """
+        Atomically assign a motion block and return it as an immutable snapshot.
+
+        Selects all elements captured between min_timestamp and max_timestamp (wall
+        clock) that also pass the optional predicate(element), then sets their block
+        ID, the tag ID (unless None) and the threshold flags (FLAG_MOUSE, FLAG_NO_MOUSE,
+        FLAG_OWN_CAT for probabilities >= threshold). Selection, assignment and the
+        snapshot happen under one lock, so frames appended meanwhile by the model
+        thread cannot end up in only part of the block.
+
+        Args:
+            block_id (int): The block ID to assign.
+            min_timestamp (float): The minimum capture timestamp.
+            max_timestamp (float): The maximum capture timestamp.
+            tag_id (str | None): The tag ID to assign, or None to keep the current tag IDs.
+            threshold (float | None): Probability threshold for the selection flags.
+            predicate (callable | None): Additional per-element filter.
+
+        Returns:
+            ImageBufferBlock: The selected elements (copies) with their flags.
+        """
+        with self._lock:
+            ids = self._filter_ids_locked(
+                self._col_timestamp, min_timestamp, max_timestamp,
+                0.0, 100.0, 0.0, 100.0, 0.0, 100.0,
+            )
+            elements = []
+            flags = []
+            for id in ids:
+                element = self._elements[id]
+                if predicate is not None and not predicate(element):
+                    continue
+                self._set_block_locked(element, block_id)
+                if tag_id is not None:
+                    self._set_tag_locked(element, tag_id)
+                slot = self._slot_of[id]
+                frame_flags = int(self._col_flags[slot]) & self.FLAG_TAG
+                if threshold is not None:
+                    if element.mouse_probability >= threshold:
+                        frame_flags |= self.FLAG_MOUSE
+                    if element.no_mouse_probability >= threshold:
+                        frame_flags |= self.FLAG_NO_MOUSE
+                    if element.own_cat_probability >= threshold:
+                        frame_flags |= self.FLAG_OWN_CAT
+                self._col_flags[slot] = frame_flags
+                snapshot_element = copy.copy(element)
+                if element.detected_objects is not None:
+                    snapshot_element.detected_objects = list(element.detected_objects)
+                elements.append(snapshot_element)
+                flags.append(frame_flags)
+            return ImageBufferBlock(
+                block_id=block_id,
+                tag_id=tag_id,
+                elements=tuple(elements),
+                flags=tuple(flags),
+            )
+
+    def delete_block(self, block_id: int) -> int:
+        """
+        Delete all elements of a block.
+
+        Returns:
+            int: The number of deleted elements.
+        """
+        with self._lock:
+            ids = list(self._by_block.get(block_id, ())) if block_id != 0 else []
+            for id in ids:
+                self._remove_locked(id)
+        logging.debug(f"[IMAGEBUFFER] Deleted {len(ids)} elements of block {block_id} from the buffer.")
+        return len(ids)
+
+
+@dataclass(frozen=True)
+class ImageBufferBlock:
+    """Immutable snapshot of a motion block, as taken by ImageBuffer.assign_block().
+
+    elements are copies of the buffer elements at assignment time (in buffer order),
+    flags holds the ImageBuffer.FLAG_* bits of each element.
+    """
+    block_id: int
+    tag_id: str | None
+    elements: tuple
+    flags: tuple
+
+    @property
+    def ids(self) -> List[int]:
+        return [element.id for element in self.elements]
+
+    def count(self, flag: int) -> int:
+        """Number of elements with the given flag bit set."""
+        return sum(1 for f in self.flags if f & flag)
+
+    def __len__(self) -> int:
+        return len(self.elements)
 
 # Global variable declarations
 image_buffer = ImageBuffer()
+frame_bus = FrameBus()
 videostream = None
\ No newline at end of file
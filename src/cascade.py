@@ -0,0 +1,120 @@
+"""Two-tier model cascade: a cheap cat-presence gate before the full prey detector.
+
+Most processed frames show an empty flap. With the cascade enabled (CASCADE_ENABLED),
+the YOLO model first runs at a small input size (CASCADE_GATE_IMGSZ). The full-size
+detector only runs while the second stage is "open":
+  - for CASCADE_HOLD_S seconds after a gate frame had a detection of at least
+    CASCADE_GATE_THRESHOLD percent,
+  - and, with CASCADE_TRIGGER = "gate_or_motion", also while the backend reports
+    motion at the flap (the decision window of the image buffer).
+While the second stage is open, frames go straight to the full detector without
+running the gate.
+
+CascadeGate only holds the trigger state and the telemetry; the model runs are done
+by ModelHandler. The CPU time is measured in the calling process, so for a YOLO
+worker pool it only covers the main-process share (the wall time covers both).
+"""
+
+import threading
+import time as tm
+
+import numpy as np
+
+from src.baseconfig import CONFIG
+
+TRIGGER_GATE = "gate"
+TRIGGER_GATE_OR_MOTION = "gate_or_motion"
+
+STAGE_GATE = "gate"
+STAGE_FULL = "full"
+
+
+class CascadeGate:
+    """Trigger state and per-stage counters of the model cascade."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._open_until_mono = 0.0
+        self._gate_hits = 0
+        self._gate_rejects = 0
+        self._stage_runs = {STAGE_GATE: 0, STAGE_FULL: 0}
+        self._stage_wall_s = {STAGE_GATE: 0.0, STAGE_FULL: 0.0}
+        self._stage_cpu_s = {STAGE_GATE: 0.0, STAGE_FULL: 0.0}
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(CONFIG.get('CASCADE_ENABLED', False))
+
+    @staticmethod
+    def gate_imgsz() -> int:
+        try:
+            return max(32, int(CONFIG.get('CASCADE_GATE_IMGSZ', 160) or 160))
+        except (TypeError, ValueError):
+            return 160
+
+    @staticmethod
+    def _threshold() -> float:
+        try:
+            return float(CONFIG.get('CASCADE_GATE_THRESHOLD', 30.0))
+        except (TypeError, ValueError):
+            return 30.0
+
+    @staticmethod
+    def _hold_s() -> float:
+        try:
+            return max(0.0, float(CONFIG.get('CASCADE_HOLD_S', 3.0)))
+        except (TypeError, ValueError):
+            return 3.0
+
+    @staticmethod
+    def _trigger() -> str:
+        trigger = str(CONFIG.get('CASCADE_TRIGGER') or TRIGGER_GATE_OR_MOTION).strip().lower()
+        return trigger if trigger in (TRIGGER_GATE, TRIGGER_GATE_OR_MOTION) else TRIGGER_GATE_OR_MOTION
+
+    def full_stage_open(self, decision_window: bool = False) -> bool:
+        """True if the next frame should go straight to the full detector."""
+        if decision_window and self._trigger() == TRIGGER_GATE_OR_MOTION:
+            return True
+        with self._lock:
+            return tm.monotonic() < self._open_until_mono
+
+    def evaluate_gate(self, detections: np.ndarray | None) -> bool:
+        """Check the gate detections; opens the second stage for CASCADE_HOLD_S on a hit."""
+        hit = detections is not None and len(detections) > 0 and bool(
+            np.any(detections["probability"] >= self._threshold())
+        )
+        with self._lock:
+            if hit:
+                self._gate_hits += 1
+                self._open_until_mono = max(self._open_until_mono, tm.monotonic() + self._hold_s())
+            else:
+                self._gate_rejects += 1
+        return hit
+
+    def record(self, stage: str, wall_s: float, cpu_s: float) -> None:
+        with self._lock:
+            self._stage_runs[stage] += 1
+            self._stage_wall_s[stage] += max(0.0, wall_s)
+            self._stage_cpu_s[stage] += max(0.0, cpu_s)
+
+    def get_stats(self) -> dict:
+        """Return how often each stage ran and its average wall and CPU time per frame."""
+        with self._lock:
+            stages = {}
+            for stage, runs in self._stage_runs.items():
+                stages[stage] = {
+                    "runs": runs,
+                    "avg_ms": round(self._stage_wall_s[stage] / runs * 1000.0, 1) if runs else 0.0,
+                    "avg_cpu_ms": round(self._stage_cpu_s[stage] / runs * 1000.0, 1) if runs else 0.0,
+                }
+            gated = self._gate_hits + self._gate_rejects
+            return {
+                "enabled": self.enabled(),
+                "gate_imgsz": self.gate_imgsz(),
+                "trigger": self._trigger(),
+                "gate_hits": self._gate_hits,
+                "gate_rejects": self._gate_rejects,
+                "full_skipped_ratio": round(self._gate_rejects / gated, 3) if gated else 0.0,
+                "open": tm.monotonic() < self._open_until_mono,
+                "stages": stages,
+            }
@@ -1184,9 +1184,13 @@ def write_motion_block_to_db(
     delete_from_buffer: bool = True,
     generate_thumbnails: bool = True,
     timeline_entries: list | None = None,
+    block_snapshot=None,
 ):
     """
     This function writes an image block from the image buffer to the database.
+
+    If block_snapshot (an ImageBufferBlock from image_buffer.assign_block()) is given,
+    exactly its frames are written; otherwise the block is read from the buffer.
     """
     result = lock_database()
     if not result.success:
@@ -1204,7 +1208,10 @@ def write_motion_block_to_db(
         else:
             db_block_id += 1
 
-        elements = image_buffer.get_by_block_id(buffer_block_id)
+        if block_snapshot is not None:
+            elements = list(block_snapshot.elements)
+        else:
+            elements = image_buffer.get_by_block_id(buffer_block_id)
         logging.info(f"[DATABASE] Writing {len(elements)} images from buffer image block '{buffer_block_id}' as database block '{db_block_id}' to '{database}'.")
 
         # Determine whether optional columns exist (avoid nested lock acquisition).
@@ -0,0 +1,190 @@
+"""Thermal- and latency-aware processing rate governor for the model loop.
+
+Without the governor (FPS_GOVERNOR_ENABLED), the model loop processes frames at the
+camera framerate all the time. On passively cooled devices this heats the SoC until
+the firmware throttles it, and then the rate collapses exactly when a cat comes by.
+
+The governor lowers the rate while nothing happens at the flap and keeps the full
+rate for motion:
+  - "active": the backend reports motion (or did so within FPS_GOVERNOR_IDLE_AFTER_S):
+    full rate, regardless of the thermal state.
+  - "idle": no motion: at most FPS_GOVERNOR_IDLE_FPS.
+  - "hot": no motion and thermal pressure: at most FPS_GOVERNOR_HOT_IDLE_FPS.
+
+Thermal pressure starts ahead of the firmware limits, when one of these holds:
+  - the SoC temperature reaches FPS_GOVERNOR_TEMP_HIGH_C,
+  - vcgencmd reports active throttling, frequency capping or the soft temperature limit,
+  - the smoothed inference latency per frame is FPS_GOVERNOR_LATENCY_FACTOR times its
+    baseline (the lowest smoothed latency seen so far; it also rises with CPU contention).
+It ends (hysteresis) only when the temperature is back at FPS_GOVERNOR_TEMP_LOW_C, no
+throttle flag is active and the latency is back in the lower half of the band.
+
+The latency is tracked per cascade stage (see src/cascade.py), so the much cheaper gate
+runs do not lower the baseline of the full detector.
+"""
+
+import logging
+import threading
+import time as tm
+
+from src.baseconfig import CONFIG
+from src.helper import get_cpu_temperature, get_throttle_state
+
+STATE_ACTIVE = "active"
+STATE_IDLE = "idle"
+STATE_HOT = "hot"
+
+TEMPERATURE_SAMPLE_INTERVAL_S = 5.0
+THROTTLE_SAMPLE_INTERVAL_S = 30.0
+LATENCY_EWMA_ALPHA = 0.1
+# Latency samples per stage before the smoothed latency is used as a baseline
+LATENCY_WARMUP_SAMPLES = 20
+
+
+def _config_float(key: str, default: float) -> float:
+    try:
+        return float(CONFIG.get(key, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class ProcessingRateGovernor:
+    """Decides the processing rate of the model loop from motion, temperature and latency."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = STATE_ACTIVE
+        self._state_since_mono = tm.monotonic()
+        self._state_seconds = {STATE_ACTIVE: 0.0, STATE_IDLE: 0.0, STATE_HOT: 0.0}
+        self._last_motion_mono = tm.monotonic()
+        self._thermal_pressure = False
+        self._pressure_reasons: list[str] = []
+        self._temperature_c: float | None = None
+        self._temperature_sampled_mono = 0.0
+        self._throttle: dict | None = None
+        self._throttle_sampled_mono = 0.0
+        self._latency_ewma_s: dict[str, float] = {}
+        self._latency_samples: dict[str, int] = {}
+        self._latency_baseline_s: dict[str, float] = {}
+        self._last_fps: float | None = None
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(CONFIG.get('FPS_GOVERNOR_ENABLED', False))
+
+    def record_latency(self, stage: str, seconds_per_frame: float) -> None:
+        """Add an inference latency sample (seconds per frame) of a cascade stage."""
+        if seconds_per_frame <= 0:
+            return
+        with self._lock:
+            ewma = self._latency_ewma_s.get(stage)
+            ewma = seconds_per_frame if ewma is None else ewma + LATENCY_EWMA_ALPHA * (seconds_per_frame - ewma)
+            self._latency_ewma_s[stage] = ewma
+            samples = self._latency_samples.get(stage, 0) + 1
+            self._latency_samples[stage] = samples
+            if samples >= LATENCY_WARMUP_SAMPLES:
+                self._latency_baseline_s[stage] = min(self._latency_baseline_s.get(stage, ewma), ewma)
+
+    def _sample_sensors(self, now: float) -> None:
+        if now - self._temperature_sampled_mono >= TEMPERATURE_SAMPLE_INTERVAL_S:
+            self._temperature_sampled_mono = now
+            self._temperature_c = get_cpu_temperature()
+        if now - self._throttle_sampled_mono >= THROTTLE_SAMPLE_INTERVAL_S:
+            self._throttle_sampled_mono = now
+            self._throttle = get_throttle_state()
+
+    def _latency_ratio_locked(self) -> float:
+        """Highest ratio of smoothed latency to baseline over all stages (1.0 without a baseline)."""
+        ratios = [
+            self._latency_ewma_s[stage] / baseline
+            for stage, baseline in self._latency_baseline_s.items()
+            if baseline > 0 and stage in self._latency_ewma_s
+        ]
+        return max(ratios, default=1.0)
+
+    def _update_thermal_pressure_locked(self) -> None:
+        temp_high = _config_float('FPS_GOVERNOR_TEMP_HIGH_C', 70.0)
+        temp_low = min(temp_high, _config_float('FPS_GOVERNOR_TEMP_LOW_C', 65.0))
+        latency_factor = max(1.0, _config_float('FPS_GOVERNOR_LATENCY_FACTOR', 1.5))
+        latency_release = 1.0 + (latency_factor - 1.0) / 2.0
+        temperature = self._temperature_c
+        throttle = self._throttle or {}
+        throttled = bool(
+            throttle.get("throttled_now") or throttle.get("freq_capped_now") or throttle.get("soft_temp_limit_now")
+        )
+        latency_ratio = self._latency_ratio_locked()
+
+        if not self._thermal_pressure:
+            reasons = []
+            if temperature is not None and temperature >= temp_high:
+                reasons.append(f"temperature {temperature:.1f}°C")
+            if throttled:
+                reasons.append(f"throttle flags 0x{int(throttle.get('raw', 0)):x}")
+            if latency_ratio >= latency_factor:
+                reasons.append(f"inference latency x{latency_ratio:.1f}")
+            if reasons:
+                self._thermal_pressure = True
+                self._pressure_reasons = reasons
+                logging.info(f"[MODEL] FPS governor: thermal pressure ({', '.join(reasons)}), limiting the idle rate")
+        elif (
+            (temperature is None or temperature <= temp_low)
+            and not throttled
+            and latency_ratio <= latency_release
+        ):
+            self._thermal_pressure = False
+            self._pressure_reasons = []
+            logging.info("[MODEL] FPS governor: thermal pressure cleared")
+
+    def _set_state_locked(self, state: str, now: float) -> None:
+        if state == self._state:
+            return
+        self._state_seconds[self._state] += max(0.0, now - self._state_since_mono)
+        self._state = state
+        self._state_since_mono = now
+        logging.debug(f"[MODEL] FPS governor: state {state}")
+
+    def target_fps(self, max_fps: float, motion_active: bool) -> float:
+        """Return the processing rate for the next frame (at most max_fps)."""
+        now = tm.monotonic()
+        self._sample_sensors(now)
+        with self._lock:
+            self._update_thermal_pressure_locked()
+            if motion_active:
+                self._last_motion_mono = now
+            idle_after_s = max(0.0, _config_float('FPS_GOVERNOR_IDLE_AFTER_S', 10.0))
+            if motion_active or (now - self._last_motion_mono) < idle_after_s:
+                state, fps = STATE_ACTIVE, max_fps
+            elif self._thermal_pressure:
+                state, fps = STATE_HOT, min(max_fps, _config_float('FPS_GOVERNOR_HOT_IDLE_FPS', 1.0))
+            else:
+                state, fps = STATE_IDLE, min(max_fps, _config_float('FPS_GOVERNOR_IDLE_FPS', 3.0))
+            self._set_state_locked(state, now)
+            self._last_fps = max(0.5, fps)
+            return self._last_fps
+
+    def get_stats(self) -> dict:
+        """Return the governor state, its inputs and the time spent per state."""
+        with self._lock:
+            now = tm.monotonic()
+            seconds = dict(self._state_seconds)
+            seconds[self._state] += max(0.0, now - self._state_since_mono)
+            return {
+                "enabled": self.enabled(),
+                "state": self._state,
+                "target_fps": self._last_fps,
+                "thermal_pressure": self._thermal_pressure,
+                "pressure_reasons": list(self._pressure_reasons),
+                "temperature_c": None if self._temperature_c is None else round(self._temperature_c, 1),
+                "throttle_raw": None if self._throttle is None else int(self._throttle.get("raw", 0)),
+                "latency_ms": {
+                    stage: {
+                        "avg_ms": round(ewma * 1000.0, 1),
+                        "baseline_ms": (
+                            round(self._latency_baseline_s[stage] * 1000.0, 1)
+                            if stage in self._latency_baseline_s else None
+                        ),
+                    }
+                    for stage, ewma in self._latency_ewma_s.items()
+                },
+                "seconds_per_state": {state: round(value, 1) for state, value in seconds.items()},
+            }
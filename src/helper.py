@@ -944,6 +944,157 @@ def wait_for_network(timeout: int = 120) -> bool:
     logging.error(f"Failed to establish network connectivity after {timeout} seconds")
     return False
 
+def get_device_fingerprint() -> dict:
+    """
+    Returns a description of the hardware that inference performance depends on
+    (board/CPU model, core count, RAM, architecture) and a short id derived from it.
+    """
+    import hashlib
+    import platform
+
+    cpu_model = ""
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            for line in f:
+                key, __, value = line.partition(":")
+                key = key.strip().lower()
+                # "Model" is the board name on the Raspberry Pi, "model name" the CPU on x86
+                if key in ("model", "model name") and value.strip():
+                    cpu_model = value.strip()
+                    if key == "model":
+                        break
+    except Exception:
+        pass
+    if not cpu_model:
+        try:
+            with open("/proc/device-tree/model", "r", encoding="utf-8") as f:
+                cpu_model = f.read().strip("\x00 \n")
+        except Exception:
+            cpu_model = platform.processor() or ""
+
+    ram_mb = 0
+    try:
+        with open("/proc/meminfo", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("MemTotal:"):
+                    # Rounded to 256 MB, so kernel reservations do not change the fingerprint
+                    ram_mb = int(round(int(line.split()[1]) / 1024 / 256) * 256)
+                    break
+    except Exception:
+        pass
+
+    fingerprint = {
+        "model": cpu_model,
+        "cores": os.cpu_count() or 1,
+        "ram_mb": ram_mb,
+        "machine": platform.machine(),
+    }
+    fingerprint["id"] = hashlib.sha256(
+        f"{fingerprint['model']}|{fingerprint['cores']}|{fingerprint['ram_mb']}|{fingerprint['machine']}".encode("utf-8")
+    ).hexdigest()[:12]
+    return fingerprint
+
+def get_throttle_state() -> dict | None:
+    """
+    Returns the Raspberry Pi throttle flags (vcgencmd get_throttled) or None if not available.
+    The "*_now" flags are currently active, the "*_occurred" flags were set since boot.
+    """
+    try:
+        if not shutil.which("vcgencmd"):
+            return None
+        output = subprocess.check_output(["vcgencmd", "get_throttled"], text=True, timeout=2).strip()
+        raw = int(output.split("=", 1)[1], 16)
+    except Exception:
+        return None
+    return {
+        "raw": raw,
+        "under_voltage_now": bool(raw & 0x1),
+        "freq_capped_now": bool(raw & 0x2),
+        "throttled_now": bool(raw & 0x4),
+        "soft_temp_limit_now": bool(raw & 0x8),
+        "under_voltage_occurred": bool(raw & 0x10000),
+        "freq_capped_occurred": bool(raw & 0x20000),
+        "throttled_occurred": bool(raw & 0x40000),
+        "soft_temp_limit_occurred": bool(raw & 0x80000),
+    }
+
+def read_thermal_zone_temperature() -> tuple[float, str] | None:
+    """
+    Returns (temperature in °C, zone type) of the most CPU-related thermal zone
+    (/sys/class/thermal/thermal_zone*/temp) or None if not available.
+    """
+    try:
+        base = "/sys/class/thermal"
+        if not os.path.isdir(base):
+            return None
+
+        candidates: list[tuple[int, str, float]] = []
+        for name in sorted(os.listdir(base)):
+            if not name.startswith("thermal_zone"):
+                continue
+
+            zone_dir = os.path.join(base, name)
+            temp_path = os.path.join(zone_dir, "temp")
+            type_path = os.path.join(zone_dir, "type")
+            if not os.path.isfile(temp_path):
+                continue
+
+            try:
+                raw = open(temp_path, "r", encoding="utf-8").read().strip()
+                if not raw:
+                    continue
+                temp_val = float(raw)
+                # Most kernels expose millidegrees C.
+                if temp_val > 200:
+                    temp_val = temp_val / 1000.0
+                if temp_val < -40 or temp_val > 130:
+                    continue
+
+                zone_type = ""
+                try:
+                    if os.path.isfile(type_path):
+                        zone_type = open(type_path, "r", encoding="utf-8").read().strip()
+                except Exception:
+                    zone_type = ""
+
+                zone_type_l = (zone_type or "").lower()
+                # Prefer obvious CPU-related zones.
+                if any(k in zone_type_l for k in ("cpu", "x86_pkg_temp", "package", "soc")):
+                    priority = 0
+                else:
+                    priority = 1
+
+                candidates.append((priority, zone_type or name, temp_val))
+            except Exception:
+                continue
+
+        if not candidates:
+            return None
+
+        candidates.sort(key=lambda t: (t[0], -t[2]))
+        priority, zone_type, temp_c = candidates[0]
+        return temp_c, (zone_type if zone_type else "thermal")
+    except Exception:
+        return None
+
+def get_cpu_temperature() -> float | None:
+    """
+    Returns the SoC/CPU temperature in °C or None if not available.
+    The thermal zones are read first (cheap), vcgencmd is the fallback.
+    """
+    zone = read_thermal_zone_temperature()
+    if zone is not None:
+        return zone[0]
+    try:
+        if shutil.which("vcgencmd"):
+            output = subprocess.check_output(["vcgencmd", "measure_temp"], text=True, timeout=2).strip()
+            match = re.search(r"([-\d.]+)", output)
+            if match:
+                return float(match.group(1))
+    except Exception:
+        pass
+    return None
+
 def log_relevant_deb_packages():
     """
     Logs the currently installed deb packages that are relevant based on the package name.
@@ -973,60 +1124,11 @@ def log_system_information():
             pass
 
         # Generic Linux: /sys/class/thermal/thermal_zone*/temp
-        try:
-            base = "/sys/class/thermal"
-            if not os.path.isdir(base):
-                return None
-
-            candidates: list[tuple[int, str, float]] = []
-            for name in sorted(os.listdir(base)):
-                if not name.startswith("thermal_zone"):
-                    continue
-
-                zone_dir = os.path.join(base, name)
-                temp_path = os.path.join(zone_dir, "temp")
-                type_path = os.path.join(zone_dir, "type")
-                if not os.path.isfile(temp_path):
-                    continue
-
-                try:
-                    raw = open(temp_path, "r", encoding="utf-8").read().strip()
-                    if not raw:
-                        continue
-                    temp_val = float(raw)
-                    # Most kernels expose millidegrees C.
-                    if temp_val > 200:
-                        temp_val = temp_val / 1000.0
-                    if temp_val < -40 or temp_val > 130:
-                        continue
-
-                    zone_type = ""
-                    try:
-                        if os.path.isfile(type_path):
-                            zone_type = open(type_path, "r", encoding="utf-8").read().strip()
-                    except Exception:
-                        zone_type = ""
-
-                    zone_type_l = (zone_type or "").lower()
-                    # Prefer obvious CPU-related zones.
-                    if any(k in zone_type_l for k in ("cpu", "x86_pkg_temp", "package", "soc")):
-                        priority = 0
-                    else:
-                        priority = 1
-
-                    candidates.append((priority, zone_type or name, temp_val))
-                except Exception:
-                    continue
-
-            if not candidates:
-                return None
-
-            candidates.sort(key=lambda t: (t[0], -t[2]))
-            priority, zone_type, temp_c = candidates[0]
-            label = zone_type if zone_type else "thermal"
-            return f"{temp_c:.1f}°C ({label})"
-        except Exception:
+        zone = read_thermal_zone_temperature()
+        if zone is None:
             return None
+        temp_c, label = zone
+        return f"{temp_c:.1f}°C ({label})"
 
     def _get_default_route_linux() -> str | None:
         try:
@@ -30,7 +30,7 @@ from src.system import (
 from src.paths import install_base, kittyhack_root, pictures_root, models_yolo_root
 from src.mode import is_remote_mode
 
-from src.camera import VideoStream
+from src.camera import VideoStream, frame_bus
 
 
 # Prepare gettext for translations based on the configured language (mainly for consistent logs)
@@ -713,48 +713,44 @@ async def _http_info_handler(reader: asyncio.StreamReader, writer: asyncio.Strea
             await writer.drain()
 
             # Stream forever (until the client disconnects or process exits).
-            # Keep encoding work local to this handler so multiple clients can connect.
-            import cv2  # local import to keep startup lightweight
-
+            # Each client subscribes to the frame bus with a single-slot queue: a slow
+            # client drops frames instead of stalling capture, and all clients share the
+            # same JPEG (camera bytes passed through, raw IP camera frames encoded once).
             last_sent_at = 0.0
             min_interval_s = 0.09  # ~11 fps cap for safety
-            while not sigterm_monitor.stop_now:
-                try:
-                    now = time.time()
-                    if now - last_sent_at < min_interval_s:
-                        await asyncio.sleep(0.02)
-                        continue
-
-                    frame = _internal_camera_latest_frame()
-                    if frame is None:
-                        await asyncio.sleep(0.05)
-                        continue
-
-                    # Offload encoding so we don't block the info-page HTTP server.
-                    ok_enc, buf = await asyncio.to_thread(
-                        cv2.imencode,
-                        ".jpg",
-                        frame,
-                        [cv2.IMWRITE_JPEG_QUALITY, 75],
-                    )
-                    if not ok_enc:
-                        await asyncio.sleep(0.05)
-                        continue
-
-                    jpg = buf.tobytes()
-                    part = (
-                        f"--{boundary}\r\n"
-                        "Content-Type: image/jpeg\r\n"
-                        f"Content-Length: {len(jpg)}\r\n"
-                        "\r\n"
-                    ).encode("utf-8") + jpg + b"\r\n"
-
-                    writer.write(part)
-                    await writer.drain()
-                    last_sent_at = now
-                except Exception:
-                    # Client likely disconnected.
-                    break
+            peer = writer.get_extra_info("peername")
+            subscription = frame_bus.subscribe(f"video-relay-{peer}", max_pending=1)
+            try:
+                while not sigterm_monitor.stop_now:
+                    try:
+                        frame = await asyncio.to_thread(subscription.get, 1.0)
+                        if frame is None:
+                            continue
+                        try:
+                            now = time.time()
+                            if now - last_sent_at < min_interval_s:
+                                continue
+                            jpg = await asyncio.to_thread(frame.jpeg, 75)
+                        finally:
+                            frame.release()
+                        if not jpg:
+                            continue
+
+                        part = (
+                            f"--{boundary}\r\n"
+                            "Content-Type: image/jpeg\r\n"
+                            f"Content-Length: {len(jpg)}\r\n"
+                            "\r\n"
+                        ).encode("utf-8") + jpg + b"\r\n"
+
+                        writer.write(part)
+                        await writer.drain()
+                        last_sent_at = now
+                    except Exception:
+                        # Client likely disconnected.
+                        break
+            finally:
+                subscription.close()
             return
 
         # Simple API for boot-wait UI
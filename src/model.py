@@ -18,10 +18,18 @@ import multiprocessing
 import threading
 from src.baseconfig import CONFIG, set_language, update_single_config_parameter, UserNotifications
 from src.mode import is_remote_mode
-from src.camera import videostream, image_buffer, VideoStream, DetectedObject, encode_frame_jpg
+from src.camera import (
+    videostream, image_buffer, frame_bus, VideoStream, CameraHealth, DetectedObject, DETECTION_DTYPE, encode_frame_jpg
+)
 from src.helper import sigterm_monitor, get_timezone, is_valid_uuid4
 from src.database import get_cat_names_list
 from src.paths import models_yolo_root
+from src.cascade import CascadeGate, STAGE_FULL, STAGE_GATE
+from src.fps_governor import ProcessingRateGovernor
+from src.model_cache import ModelArtifactCache
+from src.pipeline import PipelineStage, StageQueue
+from src.tflite_runner import TFLiteRunner
+from src.worker_ring import FrameRing, WorkerPool, WorkerRingClient
 
 from typing import TYPE_CHECKING
 
@@ -33,53 +41,297 @@ _ = set_language(CONFIG['LANGUAGE'])
 _MODEL_DL_STATE_PATH = "/tmp/kittyhack_model_download_state.json"
 
 
+def yolo_backend_for_device(inference_device: str) -> str:
+    """Backend of a YOLO model for an INFERENCE_DEVICE value: "ncnn", "openvino" or "pytorch"."""
+    device = str(inference_device or "").strip().lower()
+    if device in {"gpu", "intel:gpu", "intel:cpu", "intel:npu"}:
+        return "openvino"
+    if device in ("", "cpu"):
+        return "ncnn"
+    return "pytorch"
+
+
+def _decode_yolo_boxes(results) -> np.ndarray:
+    """Pull all boxes of Ultralytics results into one DETECTION_DTYPE array (percent coords).
+
+    Each result's boxes are converted to numpy once (xyxy, conf, cls in a single array)
+    instead of per box and per attribute. The float32 arithmetic matches Ultralytics'
+    xyxyn, so the values are the same as reading box.xyxyn / box.conf one by one.
+    """
+    parts = []
+    for r in results:
+        boxes = getattr(r, "boxes", None)
+        if boxes is None or len(boxes) == 0:
+            continue
+        data = boxes.data
+        data = data.cpu().numpy() if hasattr(data, "cpu") else np.asarray(data)
+        data = data.astype(np.float32, copy=False)
+        orig_h, orig_w = boxes.orig_shape[:2]
+        xyxyn = (data[:, :4] / np.array([orig_w, orig_h, orig_w, orig_h], dtype=np.float32)).astype(np.float64)
+        rows = np.empty(len(data), dtype=DETECTION_DTYPE)
+        rows["x"] = xyxyn[:, 0] * 100.0
+        rows["y"] = xyxyn[:, 1] * 100.0
+        rows["w"] = (xyxyn[:, 2] - xyxyn[:, 0]) * 100.0
+        rows["h"] = (xyxyn[:, 3] - xyxyn[:, 1]) * 100.0
+        rows["probability"] = data[:, 4] * np.float32(100)
+        rows["cls"] = data[:, -1].astype(np.int32)
+        parts.append(rows)
+    if not parts:
+        return np.empty(0, dtype=DETECTION_DTYPE)
+    return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+
 def _parse_yolo_detection_results(
     results,
     labels: list[str],
     cat_names: list[str],
     min_threshold: float,
-) -> tuple[int, int, list[dict]]:
-    """Convert Ultralytics detection results to kittyhack object dicts (percent coords)."""
+) -> tuple[int, int, np.ndarray]:
+    """Convert Ultralytics detection results to (mouse_probability, own_cat_probability, detections).
+
+    detections is a DETECTION_DTYPE array (see DetectedObject.from_detections); the prey and
+    own-cat probabilities are taken from the last matching box, like before.
+    """
+    detections = _decode_yolo_boxes(results)
+    if len(detections) == 0:
+        return 0, 0, detections
+
+    classes = detections["cls"]
+    probabilities = detections["probability"]
+
+    # Class mapping is done once per class present, not once per box
+    prey_classes = []
+    cat_classes = []
+    for cls_idx in np.unique(classes).tolist():
+        object_name = (labels[cls_idx] if 0 <= cls_idx < len(labels) else str(cls_idx)).lower()
+        if object_name in ["prey", "beute"]:
+            prey_classes.append(cls_idx)
+        elif object_name in cat_names:
+            cat_classes.append(cls_idx)
+
     mouse_probability = 0
     own_cat_probability = 0
-    detected_objects: list[dict] = []
-    detected_info: list[str] = []
-    probability_threshold_exceeded = False
-
-    for r in results:
-        boxes = getattr(r, "boxes", None)
-        if boxes is None or len(boxes) == 0:
-            continue
-        for box_xyxyn, conf, cls in zip(boxes.xyxyn, boxes.conf, boxes.cls):
-            x1, y1, x2, y2 = (float(v) for v in box_xyxyn.tolist())
-            cls_idx = int(cls)
-            object_name = labels[cls_idx] if 0 <= cls_idx < len(labels) else str(cls_idx)
-            probability = float(conf * 100)
-            detected_info.append(f"{object_name} ({probability:.1f}%)")
-            if probability >= min_threshold:
-                probability_threshold_exceeded = True
-
-            detected_objects.append({
-                'x': x1 * 100.0,
-                'y': y1 * 100.0,
-                'w': (x2 - x1) * 100.0,
-                'h': (y2 - y1) * 100.0,
-                'name': object_name,
-                'probability': probability,
-            })
-
-            if object_name.lower() in ["prey", "beute"]:
-                mouse_probability = int(probability)
-            elif object_name.lower() in cat_names:
-                own_cat_probability = int(probability)
-
-    if detected_info and probability_threshold_exceeded:
+    if prey_classes:
+        prey_idx = np.flatnonzero(np.isin(classes, prey_classes))
+        if prey_idx.size:
+            mouse_probability = int(probabilities[prey_idx[-1]])
+    if cat_classes:
+        cat_idx = np.flatnonzero(np.isin(classes, cat_classes))
+        if cat_idx.size:
+            own_cat_probability = int(probabilities[cat_idx[-1]])
+
+    if bool(np.any(probabilities >= min_threshold)):
+        detected_info = [
+            f"{labels[c] if 0 <= c < len(labels) else str(c)} ({p:.1f}%)"
+            for c, p in zip(classes.tolist(), probabilities.tolist())
+        ]
         logging.info(
             f"[MODEL] Detected {len(detected_info)} objects in image: "
             f"{', '.join(detected_info)} (MIN_THRESHOLD={min_threshold})"
         )
 
-    return mouse_probability, own_cat_probability, detected_objects
+    return mouse_probability, own_cat_probability, detections
+
+
+def yolo_worker_process(model_path, input_queue, output_queue, ring_names, ring_slots, ring_max_side,
+                        num_threads=1, inference_device='cpu', first_core=0):
+    """YOLO worker process: runs the model on the frames of a shared-memory ring (see src/worker_ring.py).
+
+    The worker is pinned to num_threads cores starting at first_core, so the workers of a
+    pool run on separate cores.
+    """
+    from ultralytics import YOLO
+    from src.baseconfig import configure_logging
+
+    ring = None
+    try:
+        # Frames and results are exchanged through the shared-memory ring of the main process
+        ring = FrameRing(ring_slots, ring_max_side, names=ring_names)
+
+        # Set CPU affinity for this process based on num_threads
+        import psutil
+        process = psutil.Process()
+
+        # Calculate which cores to use (first_core..first_core+num_threads-1) but respect cpuset/container limits.
+        all_cores = multiprocessing.cpu_count()
+        requested = sorted({(int(first_core) + i) % all_cores for i in range(int(num_threads) if num_threads else 1)})
+        try:
+            allowed = process.cpu_affinity()  # type: ignore[call-arg]
+        except Exception:
+            allowed = []
+
+        cores_to_use = requested
+        if allowed:
+            cores_to_use = [c for c in requested if c in allowed]
+            if not cores_to_use:
+                # Fallback: use whatever the OS allows.
+                cores_to_use = list(allowed)
+
+        # Best-effort pinning: may fail on some kernels/containers (e.g. Errno 22).
+        try:
+            if cores_to_use:
+                process.cpu_affinity(cores_to_use)
+                logging.info(f"[MODEL] Worker process running on CPU cores {cores_to_use}")
+            else:
+                logging.info("[MODEL] Worker process running without CPU affinity (no cores resolved)")
+        except OSError as e:
+            logging.warning(f"[MODEL] CPU affinity not supported/allowed here; continuing without pinning: {e}")
+        except Exception as e:
+            logging.warning(f"[MODEL] Failed to set CPU affinity; continuing without pinning: {e}")
+
+        # Load the YOLO model in this process
+        logging.getLogger("ultralytics").setLevel(logging.WARNING)
+        logging.getLogger("ultralytics.yolo.engine.model").setLevel(logging.WARNING)
+        model = YOLO(model_path, task="detect", verbose=False)
+        # Re-Configure logging to silence the model's output
+        configure_logging(CONFIG['LOGLEVEL'])
+        output_queue.put(("ready", os.getpid()))
+
+        labels, cat_names, min_threshold = [], [], 0
+        while True:
+            # Get the next control message from the queue
+            job = input_queue.get()
+            if job is None:  # None is our signal to exit
+                break
+            if job[0] == "params":
+                __, labels, cat_names, min_threshold = job
+                continue
+
+            job_id, slot, shape, input_size = job
+            frame = ring.read_frame(slot, shape)
+
+            _worker_kwargs: dict = dict(stream=True, imgsz=input_size)
+            if inference_device != 'cpu':
+                _worker_kwargs['device'] = inference_device
+            results = model(frame, **_worker_kwargs)
+
+            mouse_probability, own_cat_probability, detections = _parse_yolo_detection_results(
+                results,
+                labels,
+                cat_names,
+                min_threshold,
+            )
+
+            ring.write_result(slot, job_id, mouse_probability, own_cat_probability, detections)
+            output_queue.put((job_id, slot))
+
+    except Exception as e:
+        logging.error(f"[MODEL] Worker process error: {e}")
+        import traceback
+        logging.error(traceback.format_exc())
+    finally:
+        if ring is not None:
+            ring.close()
+        logging.info("[MODEL] Worker process exiting")
+
+
+class InferenceROI:
+    """Region of interest that is cropped out of the camera frame before inference.
+
+    The ROI is given in percent of the full frame, either as a rectangle
+    ``"x,y,w,h"`` or as a polygon ``"x1,y1 x2,y2 x3,y3 ..."`` (at least three
+    points, separated by spaces or semicolons). A polygon is cropped to its bounding
+    box and everything outside the polygon is filled with neutral gray, so the model
+    only sees the flap opening. Detections are mapped back to full-frame percent
+    coordinates with map_objects().
+    """
+
+    MIN_SIZE_PCT = 5.0
+    MASK_FILL_VALUE = 114  # Same gray as the YOLO letterbox padding
+
+    def __init__(self, rect: tuple[float, float, float, float], polygon: list[tuple[float, float]] | None = None):
+        # rect: (x, y, w, h) in percent of the full frame
+        self.rect = rect
+        self.polygon = polygon
+        self._mask_cache: tuple[tuple[int, int], np.ndarray] | None = None
+
+    @classmethod
+    def parse(cls, text: str) -> "InferenceROI":
+        """Parse a ROI string. Raises ValueError for malformed or degenerate regions."""
+        text = str(text or "").strip()
+        if not text:
+            raise ValueError("empty ROI")
+        points = [p for p in re.split(r"[;\s]+", text) if p]
+        if len(points) == 1:
+            values = [float(v) for v in points[0].split(",")]
+            if len(values) != 4:
+                raise ValueError("rectangle ROI needs 4 values: x,y,w,h")
+            x, y, w, h = values
+            x0, y0 = max(0.0, x), max(0.0, y)
+            x1, y1 = min(100.0, x + w), min(100.0, y + h)
+            polygon = None
+        else:
+            polygon = []
+            for point in points:
+                values = [float(v) for v in point.split(",")]
+                if len(values) != 2:
+                    raise ValueError(f"invalid polygon point: {point}")
+                polygon.append((min(100.0, max(0.0, values[0])), min(100.0, max(0.0, values[1]))))
+            if len(polygon) < 3:
+                raise ValueError("polygon ROI needs at least 3 points")
+            x0, y0 = min(p[0] for p in polygon), min(p[1] for p in polygon)
+            x1, y1 = max(p[0] for p in polygon), max(p[1] for p in polygon)
+        if (x1 - x0) < cls.MIN_SIZE_PCT or (y1 - y0) < cls.MIN_SIZE_PCT:
+            raise ValueError(f"ROI must be at least {cls.MIN_SIZE_PCT:.0f}% wide and high")
+        return cls((x0, y0, x1 - x0, y1 - y0), polygon)
+
+    @property
+    def box(self) -> tuple[float, float, float, float]:
+        """Bounding box as fractions (x0, y0, x1, y1) of the full frame."""
+        x, y, w, h = self.rect
+        return (x / 100.0, y / 100.0, (x + w) / 100.0, (y + h) / 100.0)
+
+    def _polygon_mask(self, width: int, height: int) -> np.ndarray:
+        if self._mask_cache is not None and self._mask_cache[0] == (width, height):
+            return self._mask_cache[1]
+        x, y, w, h = self.rect
+        points = np.array(
+            [[(px - x) / w * width, (py - y) / h * height] for px, py in self.polygon],
+            dtype=np.int32,
+        )
+        mask = np.zeros((height, width), dtype=np.uint8)
+        cv2.fillPoly(mask, [points], 255)
+        self._mask_cache = ((width, height), mask)
+        return mask
+
+    def crop(self, captured_frame, target_size: tuple[int, int] | None = None, keep_aspect: bool = True) -> np.ndarray | None:
+        """Return the ROI of a CameraFrame at a resolution that still covers the model input size."""
+        region = captured_frame.region_array(self.box, target_size, keep_aspect)
+        if region is None:
+            return None
+        if self.polygon:
+            mask = self._polygon_mask(region.shape[1], region.shape[0])
+            region = region.copy()
+            region[mask == 0] = self.MASK_FILL_VALUE
+        return region
+
+    def map_objects(self, detected_objects: list[DetectedObject]) -> list[DetectedObject]:
+        """Convert detections from ROI percent coordinates to full-frame percent coordinates (in place)."""
+        x, y, w, h = self.rect
+        for obj in detected_objects:
+            obj.x = x + obj.x * w / 100.0
+            obj.y = y + obj.y * h / 100.0
+            obj.width = obj.width * w / 100.0
+            obj.height = obj.height * h / 100.0
+        return detected_objects
+
+    def draw(self, frame: np.ndarray) -> np.ndarray:
+        """Return a copy of the full frame with the ROI outlined and the outside darkened (UI preview)."""
+        preview = frame.copy()
+        fh, fw = preview.shape[:2]
+        if self.polygon:
+            points = np.array([[px / 100.0 * fw, py / 100.0 * fh] for px, py in self.polygon], dtype=np.int32)
+        else:
+            x, y, w, h = self.rect
+            points = np.array(
+                [[x, y], [x + w, y], [x + w, y + h], [x, y + h]], dtype=np.float64
+            ) / 100.0 * np.array([fw, fh])
+            points = points.astype(np.int32)
+        mask = np.zeros((fh, fw), dtype=np.uint8)
+        cv2.fillPoly(mask, [points], 255)
+        preview[mask == 0] = (preview[mask == 0] * 0.35).astype(np.uint8)
+        cv2.polylines(preview, [points], True, (0, 200, 255), max(1, fw // 320), cv2.LINE_AA)
+        return preview
 
 
 def _remote_internal_proxy_url() -> str | None:
@@ -142,6 +394,9 @@ def _effective_camera_stream_config() -> tuple[str, str]:
     else:
         source = str(CONFIG.get("CAMERA_SOURCE") or "internal")
         ip_url = str(CONFIG.get("IP_CAMERA_URL") or "")
+        if source == "replay":
+            # The recording path takes the place of the URL (change detection in the run loop).
+            ip_url = str(CONFIG.get("REPLAY_PATH") or "")
 
     # In remote-mode: when the control link is disconnected, close any IP camera
     # stream (including implicit remote /video relay) until reconnected.
@@ -1108,9 +1363,6 @@ class ModelHandler:
         self.framerate = framerate
         self.jpeg_quality = jpeg_quality
         self.paused = False
-        self._live_frame_lock = threading.Lock()
-        self._live_frame_jpg: bytes | None = None
-        self._live_frame_jpg_ts: float = 0.0
         self.last_log_time = 0
         self._videostream_not_ready_last_log: dict[str, float] = {}
         self.input_size = int(model_image_size)
@@ -1122,6 +1374,42 @@ class ModelHandler:
         self._last_effective_fps: float | None = None
         self._last_avg_inference_fps: float | None = None
         self._last_fps_update_tm: float = 0.0
+        # Capture-to-decision latency (seconds) of frames processed in the last stats interval.
+        self._latency_samples_since_log: list[float] = []
+        self._last_capture_latency: dict | None = None
+        # Motion pre-filter: last real detection result, reused for static frames.
+        self._last_detection: tuple | None = None
+        self._static_skips_since_log = 0
+        # Pipelined mode (PIPELINED_INFERENCE): stage threads and the queues between them.
+        self._pipeline_stages: dict[str, PipelineStage] = {}
+        self._pipeline_input: StageQueue | None = None
+        self._pipeline_output: StageQueue | None = None
+        self._pipeline_frame_interval = 1.0 / float(framerate or 10)
+        self._pipeline_next_read_mono = 0.0
+        self._pipeline_inference_count = 0
+        self._pipeline_inference_s = 0.0
+        self._pipeline_started_mono = 0.0
+        self._pipeline_lost_results = 0
+        # Micro-batching (INFERENCE_BATCH_MAX > 1): batch runner of the direct YOLO path (None if the
+        # backend has no batch support) and the measured inference time per frame.
+        self._yolo_batch = None
+        self._tflite_runner: TFLiteRunner | None = None
+        self._batch_frame_time_s = 0.0
+        self._batches_since_log = 0
+        self._batched_frames_since_log = 0
+        # Model cascade (CASCADE_ENABLED): low-imgsz cat-presence gate before the full detector.
+        self._cascade = CascadeGate()
+        self._cascade_supported = True
+        # Processing rate governor (FPS_GOVERNOR_ENABLED): lower idle rate, thermal and latency aware
+        self._fps_governor = ProcessingRateGovernor()
+        self._fps_governed = False
+        self._missing_results = 0
+        self._missing_result_log_mono = 0.0
+        # Model artifact/warm-up cache; prepare() loads and warms up the model before run()
+        self._model_cache = ModelArtifactCache(max_entries=int(CONFIG.get('MODEL_CACHE_MAX_ENTRIES', 8) or 8))
+        self._prepared = False
+        self._interpreter = None
+        self._cache_key: str | None = None
 
         # Load labels early so the model loop cannot crash depending on whether a UI client
         # accessed the camera API during startup.
@@ -1129,8 +1417,7 @@ class ModelHandler:
         self._load_labels()
 
     def _uses_openvino_backend(self) -> bool:
-        device = str(self.inference_device or "").strip().lower()
-        return device in {"gpu", "intel:gpu", "intel:cpu", "intel:npu"}
+        return yolo_backend_for_device(self.inference_device) == "openvino"
 
     def _resolved_inference_device(self) -> str:
         device = str(self.inference_device or "cpu").strip().lower()
@@ -1139,14 +1426,28 @@ class ModelHandler:
         return device or "cpu"
 
     def _ensure_openvino_model_export(self) -> None:
-        """Export model.pt to OpenVINO IR on demand and verify the output exists."""
+        """Export model.pt to OpenVINO IR on demand and verify the output exists.
+
+        With MODEL_CACHE_ENABLED the export is stored in the model cache, keyed by the hash
+        of model.pt and the input size (the IR does not depend on the thread setting), and
+        reused on the next start. An existing export next to model.pt is used as well, if
+        it was exported for the same input size.
+        """
         if not self._uses_openvino_backend():
             return
 
-        xml_exists = os.path.isdir(self.modeldir) and any(
-            name.endswith(".xml") for name in os.listdir(self.modeldir)
-        )
-        if xml_exists:
+        legacy_dir = self.modeldir
+        artifact_key = self._model_artifact_key() if CONFIG.get('MODEL_CACHE_ENABLED', True) else None
+        if artifact_key is not None:
+            cached = self._model_cache.find_artifact_for_key(artifact_key, "model_openvino_model")
+            if cached is not None:
+                self.modeldir = cached
+                # Mark the entry as used, so pruning keeps it
+                self._model_cache.update_manifest(os.path.basename(os.path.dirname(cached)))
+                logging.info(f"[MODEL] Using cached OpenVINO export '{cached}'")
+                return
+        if self._openvino_export_matches(legacy_dir):
+            logging.info(f"[MODEL] Using existing OpenVINO export '{legacy_dir}'")
             return
 
         pt_model_path = os.path.join(self._model_rootdir, "model.pt")
@@ -1172,6 +1473,66 @@ class ModelHandler:
         if not xml_exists:
             raise RuntimeError(f"OpenVINO export did not produce a valid model directory: {self.modeldir}")
 
+        if artifact_key is not None:
+            try:
+                self.modeldir = self._model_cache.store_artifact(artifact_key, self.modeldir, "model_openvino_model")
+                self._model_cache.update_manifest(
+                    artifact_key, model_path=pt_model_path, backend="openvino", imgsz=int(self.input_size)
+                )
+                logging.info(f"[MODEL] Stored OpenVINO export in model cache '{self.modeldir}'")
+            except Exception as e:
+                logging.warning(f"[MODEL] Failed to store OpenVINO export in model cache: {e}")
+
+    def _openvino_export_matches(self, export_dir: str) -> bool:
+        """True if export_dir holds an OpenVINO IR that was exported for the current input size."""
+        if not os.path.isdir(export_dir) or not any(name.endswith(".xml") for name in os.listdir(export_dir)):
+            return False
+        try:
+            import yaml
+            with open(os.path.join(export_dir, "metadata.yaml"), "r") as f:
+                imgsz = (yaml.safe_load(f) or {}).get("imgsz")
+        except Exception:
+            # Exports without readable metadata were always used as they are
+            return True
+        if not imgsz:
+            return True
+        sizes = imgsz if isinstance(imgsz, (list, tuple)) else [imgsz]
+        return max(int(size) for size in sizes) == int(self.input_size)
+
+    def _model_source_path(self) -> str:
+        """Model file or directory the cache key is derived from."""
+        if self.model == "tflite":
+            return os.path.join(self.modeldir, self.graph)
+        if self._uses_openvino_backend():
+            return os.path.join(self._model_rootdir, "model.pt")
+        return self.modeldir
+
+    def _model_artifact_key(self) -> str | None:
+        """Cache key of compiled model artifacts: hash of the model files, backend and imgsz."""
+        try:
+            backend = "tflite" if self.model == "tflite" else self._inference_backend_name()
+            model_hash = self._model_cache.model_hash(self._model_source_path())
+            return self._model_cache.key(model_hash, backend, self.input_size)
+        except Exception as e:
+            logging.warning(f"[MODEL] Model cache unavailable: {e}")
+            return None
+
+    def _model_cache_key(self) -> str | None:
+        """Cache key of the load/warm-up manifest: the artifact key plus the thread configuration."""
+        cache_key = getattr(self, '_cache_key', None)
+        if cache_key is not None:
+            return cache_key
+        artifact_key = self._model_artifact_key()
+        if artifact_key is None:
+            return None
+        if self.model == "yolo":
+            worker_count = self._inference_worker_count()
+            threads = f"{worker_count}x{self._threads_per_worker(worker_count)}"
+        else:
+            threads = str(self.num_threads)
+        self._cache_key = f"{artifact_key}-t{threads}"
+        return self._cache_key
+
     def _load_labels(self) -> None:
         try:
             with open(self.labelfile, 'r') as f:
@@ -1204,7 +1565,6 @@ class ModelHandler:
         elif self.model == "yolo":
             from ultralytics import YOLO
             import multiprocessing
-            from multiprocessing import Queue
             import os
             from src.baseconfig import configure_logging
 
@@ -1213,13 +1573,22 @@ class ModelHandler:
 
             resolved_inference_device = self._resolved_inference_device()
 
+            # OpenVINO IR models are exported for a fixed input size, so the low-imgsz gate
+            # of the cascade cannot run on them.
+            self._cascade_supported = not self._uses_openvino_backend()
+            if CascadeGate.enabled() and not self._cascade_supported:
+                logging.warning("[MODEL] Model cascade is not supported with OpenVINO models (fixed input size). Disabled.")
+
             # Check if we're using all available cores
             all_cores = multiprocessing.cpu_count()
             # GPU devices always use the direct inference path (GPU handles its own parallelism)
             using_all_cores = self.num_threads >= all_cores or self.inference_device.lower() != 'cpu'
 
+            # A pool of several workers is used if configured for this backend (INFERENCE_WORKERS)
+            worker_count = self._inference_worker_count()
+
             # If using all cores (or GPU), run the model directly for better performance
-            if using_all_cores:
+            if using_all_cores and worker_count <= 1:
                 if self.inference_device.lower() == 'cpu':
                     _device_label = 'cpu (NCNN)'
                 elif self._uses_openvino_backend():
@@ -1237,9 +1606,8 @@ class ModelHandler:
                 _inference_device = resolved_inference_device
                 _is_openvino = self._uses_openvino_backend()
 
-                # Create a wrapper function to match the expected interface
-                def direct_inference(frame, input_size):
-                    # Run inference directly. Ultralytics handles letterboxing internally.
+                def predict_kwargs(input_size) -> dict:
+                    # Ultralytics handles letterboxing internally.
                     # For OpenVINO models, do NOT pass device: Ultralytics hardcodes
                     # device_name="AUTO" internally, and select_device() does not
                     # understand Intel GPU strings (it only knows CUDA/CPU/MPS).
@@ -1249,146 +1617,272 @@ class ModelHandler:
                     _predict_kwargs: dict = dict(stream=True, imgsz=input_size, verbose=False)
                     if _inference_device != 'cpu' and not _is_openvino:
                         _predict_kwargs['device'] = _inference_device
-                    results = self._yolo_model(frame, **_predict_kwargs)
+                    return _predict_kwargs
+
+                # Create a wrapper function to match the expected interface
+                def direct_inference(frame, input_size):
+                    # Run inference directly.
+                    results = self._yolo_model(frame, **predict_kwargs(input_size))
                     return _parse_yolo_detection_results(
                         results,
                         self.labels,
                         self.cat_names,
                         CONFIG.get('MIN_THRESHOLD', 0),
                     )
-                
+
+                def direct_inference_batch(frames, input_size):
+                    # Run several frames as one batch; returns one result per frame.
+                    results = self._yolo_model(list(frames), **predict_kwargs(input_size))
+                    return [
+                        _parse_yolo_detection_results([r], self.labels, self.cat_names, CONFIG.get('MIN_THRESHOLD', 0))
+                        for r in results
+                    ]
+
                 self._yolo = direct_inference
+                # The NCNN runtime of Ultralytics runs one image per call, batching only pays off
+                # on OpenVINO and PyTorch.
+                self._yolo_batch = direct_inference_batch if self._inference_backend_name() != "ncnn" else None
                 self._model_worker = None
             else:
-                # Use the multiprocessing approach for limited CPU cores
-                def model_worker_process(model_path, input_queue, output_queue, num_threads=1, inference_device='cpu'):
-                    try:
-                        # Set CPU affinity for this process based on num_threads
-                        import psutil
-                        process = psutil.Process()
-
-                        # Calculate which cores to use (0..num_threads-1) but respect cpuset/container limits.
-                        requested = list(range(int(num_threads) if num_threads else 1))
-                        try:
-                            allowed = process.cpu_affinity()  # type: ignore[call-arg]
-                        except Exception:
-                            allowed = []
-
-                        cores_to_use = requested
-                        if allowed:
-                            cores_to_use = [c for c in requested if c in allowed]
-                            if not cores_to_use:
-                                # Fallback: use whatever the OS allows.
-                                cores_to_use = list(allowed)
-
-                        # Best-effort pinning: may fail on some kernels/containers (e.g. Errno 22).
-                        try:
-                            if cores_to_use:
-                                process.cpu_affinity(cores_to_use)
-                                logging.info(f"[MODEL] Worker process running on CPU cores {cores_to_use}")
-                            else:
-                                logging.info("[MODEL] Worker process running without CPU affinity (no cores resolved)")
-                        except OSError as e:
-                            logging.warning(f"[MODEL] CPU affinity not supported/allowed here; continuing without pinning: {e}")
-                        except Exception as e:
-                            logging.warning(f"[MODEL] Failed to set CPU affinity; continuing without pinning: {e}")
-                        
-                        # Load the YOLO model in this process
-                        logging.getLogger("ultralytics").setLevel(logging.WARNING)
-                        logging.getLogger("ultralytics.yolo.engine.model").setLevel(logging.WARNING)
-                        model = YOLO(model_path, task="detect", verbose=False)
-                        # Re-Configure logging to silence the model's output
-                        configure_logging(CONFIG['LOGLEVEL'])
-                        
-                        while True:
-                            # Get input from queue
-                            job = input_queue.get()
-                            if job is None:  # None is our signal to exit
-                                break
-                                
-                            job_id, frame, input_size, labels, cat_names, min_threshold = job
-
-                            _worker_kwargs: dict = dict(stream=True, imgsz=input_size)
-                            if inference_device != 'cpu':
-                                _worker_kwargs['device'] = inference_device
-                            results = model(frame, **_worker_kwargs)
-
-                            mouse_probability, own_cat_probability, detected_objects = _parse_yolo_detection_results(
-                                results,
-                                labels,
-                                cat_names,
-                                min_threshold,
-                            )
-
-                            output_queue.put((job_id, mouse_probability, own_cat_probability, detected_objects))
-                            
-                    except Exception as e:
-                        logging.error(f"[MODEL] Worker process error: {e}")
-                        import traceback
-                        logging.error(traceback.format_exc())
-                    finally:
-                        logging.info("[MODEL] Worker process exiting")
-
-                # Create the queues for communication
-                self._input_queue = Queue()
-                self._output_queue = Queue()
-                
-                # Start the worker process with the specified number of threads
-                self._model_worker = multiprocessing.Process(
-                    target=model_worker_process,
-                    args=(self.modeldir, self._input_queue, self._output_queue, self.num_threads, resolved_inference_device)
+                # Use the multiprocessing approach for limited CPU cores or a pool of workers
+                ring_slots = max(1, int(CONFIG.get('YOLO_WORKER_RING_SLOTS', 3) or 3))
+                threads_per_worker = self._threads_per_worker(worker_count)
+
+                def make_start_worker(index):
+                    def start_worker(input_queue, output_queue, ring_names):
+                        # Start the worker process with the specified number of threads on its own cores
+                        process = multiprocessing.Process(
+                            target=yolo_worker_process,
+                            args=(self.modeldir, input_queue, output_queue, ring_names, ring_slots, self.input_size,
+                                  threads_per_worker, resolved_inference_device, index * threads_per_worker)
+                        )
+                        process.daemon = True
+                        process.start()
+                        logging.info(f"[MODEL] Started YOLO worker process {index} using {threads_per_worker} CPU cores")
+                        return process
+                    return start_worker
+
+                self._model_worker = WorkerPool(
+                    [
+                        WorkerRingClient(str(index), make_start_worker(index), ring_slots, self.input_size)
+                        for index in range(worker_count)
+                    ],
+                    dispatch=str(CONFIG.get('INFERENCE_WORKER_DISPATCH') or WorkerPool.DISPATCH_LEAST_LOADED),
                 )
-                self._model_worker.daemon = True
-                self._model_worker.start()
-                logging.info(f"[MODEL] Started YOLO worker process using {self.num_threads} CPU cores")
+                if worker_count > 1:
+                    logging.info(
+                        f"[MODEL] YOLO worker pool: {worker_count} workers x {threads_per_worker} threads, "
+                        f"{self._model_worker.dispatch} dispatch"
+                    )
 
                 self._yolo = self._send_to_worker
                 self._Interpreter = None
-                self._next_job_id = 0
-                self._job_results = {}
         else:
             logging.error(f"[MODEL] Unknown model type: {self.model}. Failed to start inference.")
             
+    def _inference_backend_name(self) -> str:
+        """Backend of the YOLO model: "ncnn", "openvino" or "pytorch"."""
+        return yolo_backend_for_device(self.inference_device)
+
+    def _inference_worker_count(self) -> int:
+        """Number of YOLO worker processes for the current backend.
+
+        INFERENCE_WORKERS is either a single count ("2") or counts per backend
+        ("ncnn:2,openvino:1"); backends that are not listed use one worker.
+        """
+        spec = str(CONFIG.get('INFERENCE_WORKERS', '1') or '1').strip().lower()
+        backend = self._inference_backend_name()
+        count = 1
+        for part in spec.replace(';', ',').split(','):
+            name, sep, value = part.strip().rpartition(':')
+            if sep and name.strip() != backend:
+                continue
+            try:
+                count = int(value)
+            except ValueError:
+                logging.warning(f"[MODEL] Ignoring invalid INFERENCE_WORKERS entry '{part.strip()}'")
+        return max(1, min(count, multiprocessing.cpu_count()))
+
+    def _threads_per_worker(self, worker_count: int) -> int:
+        """Inference threads of each YOLO worker (INFERENCE_THREADS_PER_WORKER, 0 = split num_threads)."""
+        threads_per_worker = int(CONFIG.get('INFERENCE_THREADS_PER_WORKER', 0) or 0)
+        if threads_per_worker <= 0:
+            threads_per_worker = max(1, self.num_threads // max(1, worker_count))
+        return threads_per_worker
+
+    def get_inference_worker_stats(self) -> dict | None:
+        """Return the state of the YOLO worker pool (None if the model runs in this process)."""
+        worker = getattr(self, '_model_worker', None)
+        if not worker:
+            return None
+        return worker.get_stats()
+
     def _send_to_worker(self, frame, input_size):
-        """Send a frame to the worker process and return a job ID"""
-        job_id = self._next_job_id
-        self._next_job_id += 1
-        self._input_queue.put((
-            job_id, frame, input_size, self.labels, self.cat_names, CONFIG['MIN_THRESHOLD'],
-        ))
-        return job_id
-    
+        """Copy a frame into a shared-memory slot of the worker and return a job ID (None if no slot is free)"""
+        return self._model_worker.submit(
+            frame, input_size, self.labels, self.cat_names, CONFIG['MIN_THRESHOLD'],
+        )
+
     def _get_result(self, job_id, timeout=1.0):
         """Get the result for a specific job ID"""
+        if job_id is None:
+            self._log_missing_result("the frame could not be handed to the YOLO worker")
+            return None
         try:
-            # Check if we've received the result
-            if job_id in self._job_results:
-                return self._job_results.pop(job_id)
-            
-            # Try to get new results from the output queue
-            while True:
-                try:
-                    result_job_id, mouse_prob, cat_prob, objects = self._output_queue.get(timeout=timeout)
-                except Exception:
-                    return None
-
-                # Drop results that arrived later than expected for an already-abandoned job_id.
-                if result_job_id < job_id:
-                    continue
-
-                self._job_results[result_job_id] = (mouse_prob, cat_prob, objects)
-                
-                if result_job_id == job_id:
-                    return self._job_results.pop(job_id)
+            result = self._model_worker.result(job_id, timeout=timeout)
         except Exception as e:
             logging.error(f"[MODEL] Error getting result: {e}")
             return None
-    
+        if result is None:
+            self._log_missing_result(f"no result for job {job_id} within {timeout:.1f}s")
+        return result
+
+    def _log_missing_result(self, reason: str) -> None:
+        """Warn about frames that get no detections (rate-limited, with the count since the last warning)."""
+        self._missing_results += 1
+        now = tm.monotonic()
+        if now - self._missing_result_log_mono >= 10.0:
+            logging.warning(
+                f"[MODEL] Frame stored without detections: {reason} "
+                f"({self._missing_results} frame(s) since the last warning)"
+            )
+            self._missing_results = 0
+            self._missing_result_log_mono = now
+
+    def _discard_worker_job(self, job: dict) -> None:
+        """Release the worker result of a pre-submitted job that will not be inferred (e.g. evicted frame)."""
+        worker = getattr(self, '_model_worker', None)
+        if worker and job.get("job_id") is not None:
+            worker.discard(job.pop("job_id"))
+
+    def _run_yolo(self, frame, input_size):
+        """Run the YOLO model on one frame and wait for the result (direct path or worker pool)."""
+        if getattr(self, '_model_worker', None):
+            return self._get_result(self._yolo(frame, input_size))
+        return self._yolo(frame, input_size)
+
+    def _cascade_active(self) -> bool:
+        return self.model == "yolo" and self._cascade_supported and CascadeGate.enabled()
+
+    def _full_stage_wanted(self) -> bool:
+        """False if the cascade gate has to check the next frame before the full detector runs."""
+        if not self._cascade_active():
+            return True
+        return self._cascade.full_stage_open(self._motion_active())
+
+    def get_cascade_stats(self) -> dict | None:
+        """Return the stage counters of the model cascade (None if it is not active)."""
+        if not self._cascade_active():
+            return None
+        return self._cascade.get_stats()
+
+    def _motion_active(self) -> bool:
+        try:
+            return image_buffer.is_motion_active()
+        except Exception:
+            return False
+
+    def get_fps_governor_stats(self) -> dict | None:
+        """Return the processing rate governor state (None if it is not enabled)."""
+        if not ProcessingRateGovernor.enabled():
+            return None
+        return self._fps_governor.get_stats()
+
+    def _stop_model_worker(self):
+        """Stop the YOLO worker process (if any) and release its shared memory"""
+        worker = getattr(self, '_model_worker', None)
+        if worker:
+            worker.stop(timeout=2)  # Give it 2 seconds to exit gracefully
+
     def __del__(self):
         """Cleanup when the object is deleted"""
-        if hasattr(self, '_model_worker') and self._model_worker and self._model_worker.is_alive():
-            self._input_queue.put(None)  # Signal to exit
-            self._model_worker.join(timeout=2)  # Give it 2 seconds to exit gracefully
+        self._stop_model_worker()
+
+    def prepare(self) -> None:
+        """Load the model and warm it up with synthetic frames; the camera is not touched.
+
+        reload_model_handler_runtime() calls this while the previous handler keeps processing
+        frames, so a model change or reload only switches over to an already warm model.
+        run() calls it itself if it was not done before. Raises if the model cannot be loaded.
+        """
+        if self._prepared:
+            return
+        t_load = tm.monotonic()
+        self.load_model()
+        if self.model == "tflite":
+            self._interpreter = self._create_tflite_interpreter()
+        load_ms = (tm.monotonic() - t_load) * 1000.0
+        warmup_ms = self._warm_up()
+        self._prepared = True
+        if warmup_ms:
+            logging.info(
+                f"[MODEL] Model loaded in {load_ms:.0f}ms, warm-up: first inference {warmup_ms[0]:.0f}ms, "
+                f"last {warmup_ms[-1]:.0f}ms ({len(warmup_ms)} synthetic frames)"
+            )
+
+        cache_key = self._model_cache_key() if CONFIG.get('MODEL_CACHE_ENABLED', True) else None
+        if cache_key is not None:
+            try:
+                manifest = self._model_cache.get_manifest(cache_key) or {}
+                self._model_cache.update_manifest(
+                    cache_key,
+                    model=self.model,
+                    model_path=self._model_source_path(),
+                    backend="tflite" if self.model == "tflite" else self._inference_backend_name(),
+                    imgsz=int(self.input_size),
+                    load_ms=round(load_ms, 1),
+                    warmup_ms=[round(v, 1) for v in warmup_ms],
+                    loads=int(manifest.get("loads", 0) or 0) + 1,
+                )
+            except Exception as e:
+                logging.debug(f"[MODEL] Failed to update model cache manifest: {e}")
+
+    def _warm_up(self) -> list[float]:
+        """Run MODEL_WARMUP_FRAMES synthetic frames through the model; returns the time per round in ms.
+
+        Every worker of a YOLO pool gets a frame per round, and the cascade gate size is warmed
+        up as well if the cascade is enabled.
+        """
+        rounds = max(0, int(CONFIG.get('MODEL_WARMUP_FRAMES', 3) or 0))
+        if rounds == 0 or self.model not in ("tflite", "yolo"):
+            return []
+        timings = []
+        try:
+            rng = np.random.default_rng(0)
+            if self.model == "tflite":
+                frame = rng.integers(0, 255, (int(self.tf_height), int(self.tf_width), 3), dtype=np.uint8)
+            else:
+                frame = rng.integers(0, 255, (self.input_size * 3 // 4, self.input_size, 3), dtype=np.uint8)
+            sizes = [self.input_size]
+            if self.model == "yolo" and self._cascade_active():
+                sizes.append(self._cascade.gate_imgsz())
+
+            worker = getattr(self, '_model_worker', None)
+            if worker and not worker.wait_ready(120.0):
+                logging.warning("[MODEL] YOLO workers not ready after 120s, skipping the warm-up.")
+                return []
+            for __ in range(rounds):
+                t_start = tm.monotonic()
+                for size in sizes:
+                    if self.model == "tflite":
+                        self._process_frame_tflite(frame, self._interpreter)
+                    elif worker:
+                        job_ids = [self._send_to_worker(frame, size) for __ in worker.clients]
+                        for job_id in job_ids:
+                            self._get_result(job_id, timeout=30.0)
+                    else:
+                        self._yolo(frame, size)
+                timings.append((tm.monotonic() - t_start) * 1000.0)
+        except Exception as e:
+            logging.warning(f"[MODEL] Model warm-up failed: {e}")
+        return timings
+
+    def unload(self) -> None:
+        """Release the model runtime of a handler that will not run (e.g. after a failed reload)."""
+        self._stop_model_worker()
+        self._yolo_model = None
+        self._interpreter = None
+        self._prepared = False
 
     def run(self):
         """Run the model on the video stream."""
@@ -1400,7 +1894,8 @@ class ModelHandler:
         resW, resH = self.resolution.split('x')
         imW, imH = int(resW), int(resH)
 
-        self.load_model()
+        # Load and warm up the model (already done if the handler was prepared before switch-over)
+        self.prepare()
 
         # Store the last used effective camera config to detect changes
         last_camera_source, last_ip_camera_url = _effective_camera_stream_config()
@@ -1409,6 +1904,8 @@ class ModelHandler:
         last_ip_camera_pipeline_fps_limit = int(CONFIG.get('IP_CAMERA_PIPELINE_FPS_LIMIT', 10) or 10)
         last_ip_camera_hw_decode = str(CONFIG.get('IP_CAMERA_HW_DECODE', 'auto') or 'auto')
 
+        interpreter = None
+
         # Check if the model is a YOLO model
         if self.model == "tflite":
             # ------------- TFLite Model -------------
@@ -1417,25 +1914,7 @@ class ModelHandler:
 
             logging.info(f"[MODEL] Preparing to run TFLite model {PATH_TO_TFLITE} on video stream with resolution {imW}x{imH} @ {self.framerate}fps and quality {self.jpeg_quality}%")
 
-            # Load the Tensorflow Lite model.
-            interpreter = self._Interpreter(model_path=PATH_TO_TFLITE, num_threads=self.num_threads)
-            interpreter.allocate_tensors()
-
-            # Get model details
-            self.tf_input_details = interpreter.get_input_details()
-            self.tf_output_details = interpreter.get_output_details()
-            self.tf_height = self.tf_input_details[0]['shape'][1]
-            self.tf_width = self.tf_input_details[0]['shape'][2]
-
-            self.input_size = max(self.tf_height, self.tf_width)
-
-            self.tf_floating_model = (self.tf_input_details[0]['dtype'] == np.float32)
-            logging.info(f"[MODEL] Floating model: {self.tf_floating_model}")
-            logging.info(f"[MODEL] Input details: {self.tf_input_details} (model shape: {self.tf_height}x{self.tf_width} --> {self.input_size})")
-
-            # Check output layer name to determine if this model was created with TF2 or TF1,
-            # because outputs are ordered differently for TF2 and TF1 models
-            self.tf_outname = self.tf_output_details[0]['name']
+            interpreter = self._interpreter
         
         elif self.model == "yolo":
             # ------------- YOLO Model -------------
@@ -1478,6 +1957,11 @@ class ModelHandler:
                 ip_camera_target_resolution=CONFIG.get('IP_CAMERA_TARGET_RESOLUTION', '640x360'),
                 ip_camera_pipeline_fps_limit=int(CONFIG.get('IP_CAMERA_PIPELINE_FPS_LIMIT', 10) or 10),
                 ip_camera_hw_decode=str(CONFIG.get('IP_CAMERA_HW_DECODE', 'auto') or 'auto'),
+                jpeg_quality=self.jpeg_quality,
+                inference_size=self._inference_input_size(),
+                inference_keep_aspect=(self.model != "tflite"),
+                **self._capture_governor_kwargs(),
+                **self._replay_kwargs(),
             ).start()
             logging.info(f"[CAMERA] Starting video stream...")
 
@@ -1500,18 +1984,19 @@ class ModelHandler:
             first_run = True
             
             # Recovery watchdog for rare camera handover races (e.g. remote-control takeover timeout).
-            no_frame_reinit_after_s = 8.0
-            no_frame_reinit_cooldown_s = 10.0
-            no_frame_warn_after_s = 3.0
+            # Stall detection and cooldown follow the CameraHealth thresholds.
             last_good_frame_ts = tm.time()
             last_no_frame_reinit_ts = 0.0
-            no_frame_since_ts = 0.0
-            try:
-                last_seen_camera_frame_id = int(videostream.get_latest_frame_id()) if videostream is not None else 0
-            except Exception:
-                last_seen_camera_frame_id = 0
+            last_consumer_fps_cap = None
+
+            # Pipelined mode starts its stage threads after the warm-up inference
+            use_pipeline = bool(CONFIG.get('PIPELINED_INFERENCE', False))
+            pipeline_active = False
 
             while not sigterm_monitor.stop_now and not self._stop_requested.is_set():
+                if videostream is not None:
+                    videostream.set_motion_detection(self._software_motion_wanted())
+
                 # --- Detect camera config changes and re-init videostream if needed ---
                 current_camera_source, current_ip_camera_url = _effective_camera_stream_config()
                 current_enable_ip_camera_decode_scale_pipeline = CONFIG.get('ENABLE_IP_CAMERA_DECODE_SCALE_PIPELINE', False)
@@ -1556,122 +2041,175 @@ class ModelHandler:
                 # When paused (after the initial warm-up iteration that primes the
                 # YOLO worker so the next real inference is fast), skip the entire
                 # inference + buffer-append work. Without this, the worker process
-                # keeps re-processing the last frame at full FPS, pegging a CPU core
-                # and leaking memory in self._job_results.
+                # keeps re-processing the last frame at full FPS, pegging a CPU core.
                 if not first_run and self.paused:
                     elapsed_time = (cv2.getTickCount() - t1) / freq
                     sleep_time = max(0.0, 0.1 - elapsed_time)  # poll for resume at ~10 Hz
                     tm.sleep(sleep_time)
                     continue
 
-                # Grab frame from video stream
-                frame = videostream.read_oldest()
+                if use_pipeline and not pipeline_active and not first_run:
+                    self._start_pipeline()
+                    pipeline_active = True
 
-                if frame is not None:
+                if pipeline_active:
+                    # Pipelined mode: the preprocess thread delivers prepared frames, the JPEG
+                    # encoding and buffer append run on the postprocess thread.
+                    job = self._pipeline_input.get(timeout=0.2)
+                    t1 = cv2.getTickCount()
+                else:
+                    # Grab frame from video stream. The model consumes the reduced inference array,
+                    # while the camera JPEG (if any) is reused for the image buffer and live view.
+                    if self._fps_governed and videostream is not None:
+                        # Below the camera framerate the oldest frames would only get staler
+                        videostream.skip_to_latest_frame()
+                    job = self._prepare_inference_job(videostream.read_oldest_frame(), first_run)
+
+                if job is not None:
                     last_good_frame_ts = tm.time()
-                    no_frame_since_ts = 0.0
-                    try:
-                        current_latest_id = int(videostream.get_latest_frame_id()) if videostream is not None else 0
-                        if current_latest_id > last_seen_camera_frame_id:
-                            last_seen_camera_frame_id = current_latest_id
-                    except Exception:
-                        pass
-                    # Run the CPU intensive model inference only if not paused
-                    timestamp = tm.time()
-                    try:
-                        timestamp_mono = tm.monotonic()
-                    except Exception:
-                        timestamp_mono = None
-
-                    if self.model == "tflite":
-                        own_cat_probability = 0 # Not supported in the original Kittyflap TFLite models
-                        mouse_probability, no_mouse_probability, detected_objects = self._process_frame_tflite(frame, interpreter)
-                    elif self.model == "yolo":
-                        if hasattr(self, '_model_worker') and self._model_worker:
-                            job_id = self._yolo(frame, self.input_size)
-                            result = self._get_result(job_id)
-
-                            if result:
-                                mouse_probability, own_cat_probability, obj_list = result
-                                no_mouse_probability = 0
-
-                                detected_objects = []
-                                for obj in obj_list:
-                                    detected_objects.append(DetectedObject(
-                                        obj['x'], obj['y'], obj['w'], obj['h'], obj['name'], obj['probability']
-                                    ))
-                            else:
-                                mouse_probability = 0
-                                no_mouse_probability = 0
-                                own_cat_probability = 0
-                                detected_objects = []
-                        else:
-                            mouse_probability, own_cat_probability, obj_list = self._yolo(frame, self.input_size)
-                            no_mouse_probability = 0
-
-                            detected_objects = []
-                            for obj in obj_list:
-                                detected_objects.append(DetectedObject(
-                                    obj['x'], obj['y'], obj['w'], obj['h'], obj['name'], obj['probability']
-                                ))
+                    # Opportunistic micro-batching: frames that are already waiting join the batch
+                    jobs = [job] if first_run else self._collect_batch(job, pipeline_active)
+                    latency_stage = STAGE_FULL if self._full_stage_wanted() else STAGE_GATE
+                    results = self._run_inference_batch(jobs, interpreter)
+                    decision_mono = tm.monotonic()
 
                     if not first_run:
-                        try:
-                            frame_jpg = encode_frame_jpg(frame, jpeg_quality=self.jpeg_quality)
-                        except Exception as e:
-                            logging.error(f"[MODEL] Failed to encode frame to JPEG: {e}")
-                            frame_jpg = None
-                        if frame_jpg is not None:
-                            with self._live_frame_lock:
-                                self._live_frame_jpg = frame_jpg
-                                self._live_frame_jpg_ts = tm.monotonic()
-                            image_buffer.append(
-                                timestamp, frame_jpg, None,
-                                mouse_probability, no_mouse_probability, own_cat_probability,
-                                detected_objects=detected_objects,
-                                timestamp_mono=timestamp_mono,
-                            )
+                        # Results are split back per frame and stored in capture order
+                        for batch_job, result in zip(jobs, results):
+                            captured_frame = batch_job["captured"]
+                            self._latency_samples_since_log.append(max(0.0, decision_mono - float(captured_frame.timestamp_mono)))
+                            if pipeline_active:
+                                # Blocks while the postprocess stage is behind; fails only on a closed queue
+                                if not self._pipeline_output.put((captured_frame, result, decision_mono), timeout=None):
+                                    self._pipeline_lost_results += 1
+                                    logging.warning(
+                                        f"[MODEL] Pipeline output queue closed, result of frame {captured_frame.frame_id} lost "
+                                        f"({self._pipeline_lost_results} in total)"
+                                    )
+                            else:
+                                self._store_inference_result((captured_frame, result, decision_mono))
+                    inferred_frames = sum(1 for batch_job in jobs if not batch_job["skip"])
+                    skipped_frames = len(jobs) - inferred_frames
 
-                    # Calculate framerate
+                    # Calculate framerate (per frame of the batch)
                     t2 = cv2.getTickCount()
                     time1 = (t2 - t1) / freq
-                    frame_rate_calc = 1 / time1
+                    frame_rate_calc = len(jobs) / time1
+                    if pipeline_active and inferred_frames:
+                        self._pipeline_inference_count += inferred_frames
+                        self._pipeline_inference_s += time1
+                    if inferred_frames and not first_run and ProcessingRateGovernor.enabled():
+                        self._fps_governor.record_latency(latency_stage, time1 / inferred_frames)
 
                     # Track effective FPS (frames actually processed over time) independent of motion mode.
                     if not hasattr(self, '_last_model_log_time'):
                         self._last_model_log_time = tm.time()
                         self._frame_count_since_log = 0
                         self._fps_sum_since_log = 0.0
-                    self._frame_count_since_log += 1
-                    self._fps_sum_since_log += float(frame_rate_calc)
+                    self._static_skips_since_log += skipped_frames
+                    self._frame_count_since_log += inferred_frames
+                    self._fps_sum_since_log += float(frame_rate_calc) * inferred_frames
 
                     now = tm.time()
                     if now - self._last_model_log_time >= 60:
                         interval_s = max(0.001, float(now - self._last_model_log_time))
-                        effective_processing_fps = (
-                            float(self._frame_count_since_log) / interval_s
-                            if self._frame_count_since_log > 0
-                            else 0.0
-                        )
+                        # Frames answered by the motion pre-filter count as processed, not as inferences.
+                        processed_frames = self._frame_count_since_log + self._static_skips_since_log
+                        effective_processing_fps = float(processed_frames) / interval_s
                         avg_inference_fps = (
                             self._fps_sum_since_log / self._frame_count_since_log
                             if self._frame_count_since_log > 0
-                            else 0.0
+                            else float(self._last_avg_inference_fps or 0.0)
                         )
+                        capture_latency = None
+                        if self._latency_samples_since_log:
+                            latencies = np.asarray(self._latency_samples_since_log, dtype=np.float64)
+                            capture_latency = {
+                                "samples": int(latencies.size),
+                                "avg_s": float(latencies.mean()),
+                                "p50_s": float(np.percentile(latencies, 50)),
+                                "p95_s": float(np.percentile(latencies, 95)),
+                                "max_s": float(latencies.max()),
+                            }
                         with self._fps_lock:
                             self._last_effective_fps = float(effective_processing_fps)
                             self._last_avg_inference_fps = float(avg_inference_fps)
                             self._last_fps_update_tm = float(now)
+                            self._last_capture_latency = capture_latency
 
                         if CONFIG.get('USE_CAMERA_FOR_MOTION_DETECTION', False):
                             logging.info(
                                 f"[MODEL] Model processing: {self._frame_count_since_log} frames in last {interval_s:.0f}s, "
                                 f"effective FPS: {effective_processing_fps:.2f}, avg inference FPS: {avg_inference_fps:.2f}"
                             )
+                        if self._static_skips_since_log > 0:
+                            logging.info(
+                                f"[MODEL] Motion pre-filter: skipped inference on {self._static_skips_since_log} of "
+                                f"{processed_frames} frames in last {interval_s:.0f}s (static scene)"
+                            )
+                        if capture_latency is not None:
+                            logging.info(
+                                f"[MODEL] Capture-to-decision latency: avg {capture_latency['avg_s'] * 1000:.0f}ms, "
+                                f"p95 {capture_latency['p95_s'] * 1000:.0f}ms, max {capture_latency['max_s'] * 1000:.0f}ms "
+                                f"({capture_latency['samples']} frames)"
+                            )
+                        pipeline_stats = self.get_pipeline_stats()
+                        if pipeline_stats is not None:
+                            logging.info(
+                                "[MODEL] Pipeline: " + ", ".join(
+                                    f"{name} {stats['avg_ms']:.0f}ms/frame busy {stats['busy_ratio'] * 100:.0f}%"
+                                    for name, stats in pipeline_stats["stages"].items()
+                                ) + "; queues: " + ", ".join(
+                                    f"{name} avg {stats['avg_occupancy']:.1f}/{stats['capacity']} dropped {stats['dropped']}"
+                                    for name, stats in pipeline_stats["queues"].items()
+                                )
+                            )
+                        if self._batches_since_log > 0:
+                            logging.info(
+                                f"[MODEL] Micro-batching: {self._batches_since_log} batches, avg "
+                                f"{self._batched_frames_since_log / self._batches_since_log:.1f} frames per batch "
+                                f"in last {interval_s:.0f}s"
+                            )
+                        cascade_stats = self.get_cascade_stats()
+                        if cascade_stats is not None:
+                            stages = cascade_stats["stages"]
+                            logging.info(
+                                f"[MODEL] Cascade: gate {stages['gate']['runs']} runs avg {stages['gate']['avg_ms']:.0f}ms "
+                                f"(cpu {stages['gate']['avg_cpu_ms']:.0f}ms), full {stages['full']['runs']} runs avg "
+                                f"{stages['full']['avg_ms']:.0f}ms (cpu {stages['full']['avg_cpu_ms']:.0f}ms), "
+                                f"full detector skipped on {cascade_stats['full_skipped_ratio'] * 100:.0f}% of gated frames"
+                            )
+                        governor_stats = self.get_fps_governor_stats()
+                        if governor_stats is not None:
+                            temperature = governor_stats["temperature_c"]
+                            temperature_text = "unknown" if temperature is None else f"{temperature:.1f}°C"
+                            pressure_text = (
+                                f", thermal pressure ({', '.join(governor_stats['pressure_reasons'])})"
+                                if governor_stats["thermal_pressure"] else ""
+                            )
+                            logging.info(
+                                f"[MODEL] FPS governor: {governor_stats['state']} at {governor_stats['target_fps'] or 0:.1f} FPS, "
+                                f"temperature {temperature_text}{pressure_text}, time per state: " + ", ".join(
+                                    f"{state} {seconds:.0f}s" for state, seconds in governor_stats["seconds_per_state"].items()
+                                )
+                            )
+                        worker_stats = self.get_inference_worker_stats()
+                        if worker_stats is not None and len(worker_stats["workers"]) > 1:
+                            logging.info(
+                                f"[MODEL] Worker pool ({worker_stats['dispatch']}): " + ", ".join(
+                                    f"#{index} {stats['completed']} frames avg {stats['avg_latency_ms']:.0f}ms"
+                                    f"{' (down)' if not stats['alive'] else ''}"
+                                    for index, stats in enumerate(worker_stats["workers"])
+                                )
+                            )
 
                         self._last_model_log_time = now
                         self._frame_count_since_log = 0
                         self._fps_sum_since_log = 0.0
+                        self._static_skips_since_log = 0
+                        self._latency_samples_since_log = []
+                        self._batches_since_log = 0
+                        self._batched_frames_since_log = 0
                     elif not CONFIG.get('USE_CAMERA_FOR_MOTION_DETECTION', False):
                         logging.debug(f"[MODEL] Model processing time: {time1:.2f} sec, Frame Rate: {frame_rate_calc:.2f} fps")
 
@@ -1680,43 +2218,29 @@ class ModelHandler:
 
                 else:
                     current_time = tm.time()
-                    # Distinguish between "no unread frame yet" and a truly stalled stream.
-                    # read_oldest() may return None while the stream is still progressing.
-                    stream_progressed = False
-                    try:
-                        current_latest_id = int(videostream.get_latest_frame_id()) if videostream is not None else 0
-                        if current_latest_id > last_seen_camera_frame_id:
-                            last_seen_camera_frame_id = current_latest_id
-                            last_good_frame_ts = current_time
-                            stream_progressed = True
-                    except Exception:
-                        pass
-
-                    if stream_progressed:
-                        no_frame_since_ts = 0.0
+                    # read_oldest() may return None while the stream is still progressing, so
+                    # judge staleness by the camera health (time since the last captured frame).
+                    health = self.get_camera_health_snapshot()
+                    if health is not None:
+                        since_last_frame = float(health.get("time_since_last_frame_s") or 0.0)
+                        stalled = health.get("recommended_action") == CameraHealth.ACTION_REINIT_STREAM
                     else:
-                        if no_frame_since_ts <= 0.0:
-                            no_frame_since_ts = current_time
+                        since_last_frame = current_time - last_good_frame_ts
+                        stalled = since_last_frame >= CameraHealth.STALL_AFTER_S
 
                     if (
-                        (not stream_progressed)
-                        and (no_frame_since_ts > 0.0)
-                        and ((current_time - no_frame_since_ts) >= no_frame_warn_after_s)
+                        since_last_frame >= CameraHealth.STALE_WARN_AFTER_S
                         and (current_time - self.last_log_time > 20)
                     ):
                         logging.warning("[CAMERA] No frame received!")
                         self.last_log_time = current_time
 
                     # Auto-recover if stream got stuck after startup/handover.
-                    if (
-                        (not stream_progressed)
-                        and
-                        (current_time - last_good_frame_ts) >= no_frame_reinit_after_s
-                        and (current_time - last_no_frame_reinit_ts) >= no_frame_reinit_cooldown_s
-                    ):
+                    if stalled and (current_time - last_no_frame_reinit_ts) >= CameraHealth.REINIT_COOLDOWN_S:
                         logging.warning(
-                            "[CAMERA] No frames for %.1fs. Reinitializing videostream...",
-                            float(current_time - last_good_frame_ts),
+                            "[CAMERA] No frames for %.1fs (camera health: %s). Reinitializing videostream...",
+                            since_last_frame,
+                            health.get("status") if health is not None else "unknown",
                         )
                         try:
                             self.reinit_videostream()
@@ -1769,14 +2293,42 @@ class ModelHandler:
                     effective_fps = 1.0
                 if effective_fps > 60.0:
                     effective_fps = 60.0
-
-                sleep_time = max(0, (1.0 / effective_fps) - elapsed_time)
-                tm.sleep(sleep_time)
+                full_rate_fps = effective_fps
+
+                # Let the capture framerate governor cap the active rate at what we can consume.
+                consumer_fps_cap = effective_fps
+                if self._last_avg_inference_fps:
+                    consumer_fps_cap = min(consumer_fps_cap, max(1.0, float(self._last_avg_inference_fps)))
+                # Hysteresis: the moving average hovering around x.5 must not flip the cap every minute
+                if videostream is not None and (
+                    last_consumer_fps_cap is None or abs(consumer_fps_cap - last_consumer_fps_cap) >= 1.0
+                ):
+                    consumer_fps_cap = float(round(consumer_fps_cap))
+                    videostream.set_consumer_fps_cap(consumer_fps_cap)
+                    last_consumer_fps_cap = consumer_fps_cap
+
+                # Lower the processing rate while nothing happens at the flap (the capture rate stays).
+                if ProcessingRateGovernor.enabled():
+                    effective_fps = self._fps_governor.target_fps(full_rate_fps, self._motion_active())
+                self._fps_governed = effective_fps < full_rate_fps
+
+                if pipeline_active:
+                    # The preprocess thread reads the frames at the target framerate
+                    self._pipeline_frame_interval = 1.0 / effective_fps
+                else:
+                    sleep_time = max(0, (1.0 / effective_fps) - elapsed_time)
+                    tm.sleep(sleep_time)
         except Exception as e:
             logging.error(f"[MODEL] Unhandled error in model loop: {e}")
             import traceback
             logging.error(traceback.format_exc())
         finally:
+            # Stop the pipeline stages first, so the last results still reach the image buffer
+            try:
+                self._stop_pipeline()
+            except Exception as e:
+                logging.error(f"[MODEL] Error stopping the inference pipeline during shutdown: {e}")
+
             # Stop the video stream
             try:
                 if videostream is not None:
@@ -1786,9 +2338,7 @@ class ModelHandler:
 
             # Stop the worker process (if any)
             try:
-                if hasattr(self, '_model_worker') and self._model_worker and self._model_worker.is_alive():
-                    self._input_queue.put(None)
-                    self._model_worker.join(timeout=2)
+                self._stop_model_worker()
             except Exception:
                 pass
 
@@ -1799,6 +2349,9 @@ class ModelHandler:
     def pause(self):
         logging.info("[MODEL] Pausing model processing.")
         self.paused = True
+        if self._pipeline_input is not None:
+            # Frames prepared before the pause are stale on resume
+            self._pipeline_input.clear()
 
     def stop(self):
         logging.info("[MODEL] Stop requested.")
@@ -1828,6 +2381,11 @@ class ModelHandler:
                 float(self._last_fps_update_tm),
             )
 
+    def get_capture_latency_snapshot(self) -> dict | None:
+        """Return capture-to-decision latency stats (avg/p50/p95/max in seconds) of the last interval."""
+        with self._fps_lock:
+            return dict(self._last_capture_latency) if self._last_capture_latency else None
+
     def reinit_videostream(self):
         """
         Re-initialize the videostream if CAMERA_SOURCE or IP_CAMERA_URL has changed.
@@ -1863,6 +2421,11 @@ class ModelHandler:
             ip_camera_target_resolution=CONFIG.get('IP_CAMERA_TARGET_RESOLUTION', '640x360'),
             ip_camera_pipeline_fps_limit=int(CONFIG.get('IP_CAMERA_PIPELINE_FPS_LIMIT', 10) or 10),
             ip_camera_hw_decode=str(CONFIG.get('IP_CAMERA_HW_DECODE', 'auto') or 'auto'),
+            jpeg_quality=self.jpeg_quality,
+            inference_size=self._inference_input_size(),
+            inference_keep_aspect=(self.model != "tflite"),
+            **self._capture_governor_kwargs(),
+            **self._replay_kwargs(),
         ).start()
         if is_remote_mode() and str(CONFIG.get('CAMERA_SOURCE') or '').strip().lower() == 'internal' and effective_camera_source == 'ip_camera':
             logging.info(f"[MODEL] Re-initialized videostream with implicit remote MJPEG relay source: {effective_ip_camera_url}.")
@@ -1870,6 +2433,8 @@ class ModelHandler:
             logging.info("[MODEL] Re-initialized videostream in disconnected mode (IP camera stream closed).")
         elif CONFIG['CAMERA_SOURCE'] == "internal":
             logging.info(f"[MODEL] Re-initialized videostream with internal camera source.")
+        elif effective_camera_source == "replay":
+            logging.info(f"[MODEL] Re-initialized videostream with replay source: {effective_ip_camera_url}.")
         else:
             logging.info(f"[MODEL] Re-initialized videostream with external camera source: {effective_ip_camera_url}.")
 
@@ -1889,84 +2454,435 @@ class ModelHandler:
     def get_run_state(self):
         return not self.paused
 
-    def _process_frame_tflite(self, frame: np.ndarray, interpreter: "Interpreter") -> tuple:
+    def _capture_governor_kwargs(self) -> dict:
+        """VideoStream arguments for the adaptive capture framerate governor and motion detection."""
+        return {
+            "adaptive_framerate": bool(CONFIG.get('ADAPTIVE_CAPTURE_FRAMERATE', False)),
+            "idle_framerate": int(CONFIG.get('CAPTURE_IDLE_FRAMERATE', 2) or 2),
+            "active_hold_s": float(CONFIG.get('CAPTURE_ACTIVE_HOLD_S', 10.0) or 10.0),
+            "motion_detection": self._software_motion_wanted(),
+        }
+
+    @staticmethod
+    def _replay_kwargs() -> dict:
+        """VideoStream arguments for the recorded-stream replay source (CAMERA_SOURCE=replay)."""
+        return {
+            "replay_path": str(CONFIG.get('REPLAY_PATH') or ""),
+            "replay_rate": str(CONFIG.get('REPLAY_RATE') or "realtime"),
+            "replay_loop": bool(CONFIG.get('REPLAY_LOOP', False)),
+        }
+
+    @staticmethod
+    def _software_motion_wanted() -> bool:
+        """True if the motion pre-filter or the software motion signal for the backend is enabled."""
+        mode = str(CONFIG.get('SOFTWARE_MOTION_MODE', 'off') or 'off').strip().lower()
+        return bool(CONFIG.get('MOTION_PREFILTER_ENABLED', False)) or mode in ("or", "and")
+
+    def _is_static_frame(self, captured_frame, first_run: bool) -> bool:
+        """Motion pre-filter: True if inference can be skipped because the scene did not change.
+
+        Static frames reuse the last detection, but the model is still run at least every
+        MOTION_PREFILTER_STATIC_INTERVAL_S seconds (0.5 to 30 s) to pick up slow changes.
         """
-        Process a single frame for object detection using TensorFlow Lite.
-        This method handles the preprocessing of the frame, performs inference using the TensorFlow Lite
-        interpreter, and processes the detection results.
-        Args:
-            frame (np.ndarray): Input frame in BGR format
-            interpreter (tensorflow.lite.python.interpreter.Interpreter): TFLite interpreter
-        Returns:
-            tuple: Contains:
-                - mouse_probability (float): Probability of mouse detection (0-100)
-                - no_mouse_probability (float): Probability of no mouse present (0-100)
-                - detected_objects (list): List of DetectedObject instances containing detection results
+        if first_run or captured_frame is None or not CONFIG.get('MOTION_PREFILTER_ENABLED', False):
+            return False
+        if captured_frame.motion is not False or self._last_detection is None:
+            return False
+        try:
+            interval = float(CONFIG.get('MOTION_PREFILTER_STATIC_INTERVAL_S', 2.0))
+        except Exception:
+            interval = 2.0
+        interval = min(30.0, max(0.5, interval))
+        return (captured_frame.timestamp_mono - self._last_detection[4]) < interval
+
+    def _prepare_inference_job(self, captured_frame, first_run: bool = False) -> dict | None:
+        """Preprocess stage: build the model input of a captured frame (None if there is no usable frame).
+
+        Static frames (motion pre-filter) carry no model input; the inference stage reuses the last detection.
         """
+        if captured_frame is None:
+            return None
+        roi = self._inference_roi()
+        skip_inference = self._is_static_frame(captured_frame, first_run)
+        frame = None
+        if not skip_inference:
+            if roi is not None:
+                frame = roi.crop(captured_frame, self._inference_input_size(), keep_aspect=(self.model != "tflite"))
+            else:
+                frame = captured_frame.inference_array()
+            if frame is None:
+                return None
+        return {"captured": captured_frame, "frame": frame, "roi": roi, "skip": skip_inference}
 
-        input_mean = 127.5
-        input_std = 127.5
+    def _run_inference_job(self, job: dict, interpreter: "Interpreter | None" = None) -> tuple:
+        """Inference stage: run the model on a prepared job.
 
-        if ('StatefulPartitionedCall' in self.tf_outname): # This is a TF2 model
-            boxes_idx, classes_idx, scores_idx = 1, 3, 0
-        elif ('detected_scores:0' in self.tf_outname):
-            boxes_idx, classes_idx, scores_idx = 1, 2, 0
-        else: # This is a TF1 model
-            boxes_idx, classes_idx, scores_idx = 0, 1, 2
-        
+        Returns (mouse_probability, no_mouse_probability, own_cat_probability, detected_objects)
+        with the boxes in full-frame coordinates.
+        """
+        if job["skip"]:
+            mouse_probability, no_mouse_probability, own_cat_probability, last_objects, __ = self._last_detection
+            detected_objects = [
+                DetectedObject(obj.x, obj.y, obj.width, obj.height, obj.object_name, obj.probability)
+                for obj in last_objects
+            ]
+            return mouse_probability, no_mouse_probability, own_cat_probability, detected_objects
 
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        frame_resized = cv2.resize(frame_rgb, (self.tf_width, self.tf_height))
-        input_data = np.expand_dims(frame_resized, axis=0)
+        frame = job["frame"]
+        mouse_probability = 0
+        no_mouse_probability = 0
+        own_cat_probability = 0
+        detected_objects = []
+        if self.model == "tflite":
+            # own_cat_probability is not supported in the original Kittyflap TFLite models
+            mouse_probability, no_mouse_probability, detected_objects = self._process_frame_tflite(frame, interpreter)
+        elif self.model == "yolo":
+            if "batch_result" in job:
+                # Already inferred as part of a batch
+                mouse_probability, own_cat_probability, detections = job.pop("batch_result")
+            elif job.get("job_id") is not None:
+                # In pipelined mode the preprocess thread already submitted the frame
+                result = self._get_result(job["job_id"])
+                detections = None
+                if result:
+                    mouse_probability, own_cat_probability, detections = result
+            else:
+                result = None
+                cascade = self._cascade_active()
+                if cascade and not self._full_stage_wanted():
+                    # First stage: cheap low-imgsz run; the full detector only runs if it sees something
+                    t_wall, t_cpu = tm.monotonic(), tm.process_time()
+                    result = self._run_yolo(frame, self._cascade.gate_imgsz())
+                    self._cascade.record(STAGE_GATE, tm.monotonic() - t_wall, tm.process_time() - t_cpu)
+                    if result and self._cascade.evaluate_gate(result[2]):
+                        result = None
+                if result is None:
+                    t_wall, t_cpu = tm.monotonic(), tm.process_time()
+                    result = self._run_yolo(frame, self.input_size)
+                    if cascade:
+                        self._cascade.record(STAGE_FULL, tm.monotonic() - t_wall, tm.process_time() - t_cpu)
+                detections = None
+                if result:
+                    mouse_probability, own_cat_probability, detections = result
+
+            if detections is not None and len(detections):
+                # Only boxes above the detection floor become DetectedObject instances
+                min_probability = float(CONFIG.get('DETECTION_MIN_PROBABILITY', 0.0) or 0.0)
+                if min_probability > 0:
+                    detections = detections[detections["probability"] >= min_probability]
+                detected_objects = DetectedObject.from_detections(detections, self.labels)
+
+        if job["roi"] is not None:
+            # Boxes are relative to the ROI crop; store them in full-frame coordinates.
+            job["roi"].map_objects(detected_objects)
+        self._last_detection = (
+            mouse_probability, no_mouse_probability, own_cat_probability, detected_objects, job["captured"].timestamp_mono
+        )
+        return mouse_probability, no_mouse_probability, own_cat_probability, detected_objects
 
-        original_h, original_w, __ = frame.shape
+    def _collect_batch(self, first_job: dict, from_pipeline: bool) -> list[dict]:
+        """Opportunistic micro-batching: add frames that are already waiting to first_job.
 
-        if self.tf_floating_model:
-            input_data = (np.float32(input_data) - input_mean) / input_std
+        Frames are only added while the oldest frame of the batch still gets its decision
+        within INFERENCE_BATCH_LATENCY_MS (estimated from the measured time per frame), and
+        up to INFERENCE_BATCH_MAX frames. Nothing is waited for; a single pending frame is
+        run on its own.
+        """
+        max_batch = int(CONFIG.get('INFERENCE_BATCH_MAX', 1) or 1)
+        if max_batch <= 1:
+            return [first_job]
+        try:
+            budget_s = float(CONFIG.get('INFERENCE_BATCH_LATENCY_MS', 300)) / 1000.0
+        except Exception:
+            budget_s = 0.3
+        jobs = [first_job]
+        oldest_mono = float(first_job["captured"].timestamp_mono)
+        while len(jobs) < max_batch:
+            if (tm.monotonic() - oldest_mono) + self._batch_frame_time_s * (len(jobs) + 1) > budget_s:
+                break
+            if from_pipeline:
+                job = self._pipeline_input.get(timeout=0)
+            elif videostream is not None and videostream.pending_frame_count() > 0:
+                job = self._prepare_inference_job(videostream.read_oldest_frame())
+            else:
+                job = None
+            if job is None:
+                break
+            jobs.append(job)
+        return jobs
 
-        interpreter.set_tensor(self.tf_input_details[0]['index'], input_data)
-        interpreter.invoke()
+    def _run_inference_batch(self, jobs: list[dict], interpreter: "Interpreter | None" = None) -> list[tuple]:
+        """Run the model on a batch of prepared jobs; returns one _run_inference_job result per job.
 
-        boxes = interpreter.get_tensor(self.tf_output_details[boxes_idx]['index'])[0]
-        classes = interpreter.get_tensor(self.tf_output_details[classes_idx]['index'])[0]
-        scores = interpreter.get_tensor(self.tf_output_details[scores_idx]['index'])[0]
+        Worker pools get all frames at once and run them in parallel; the direct YOLO path runs
+        one batched call if the backend supports it. Otherwise the frames run one by one.
+        """
+        model_jobs = [job for job in jobs if not job["skip"]]
+        t_start = tm.monotonic()
+        # With the cascade gate closed, every frame first goes through the gate on its own
+        if len(model_jobs) > 1 and self._full_stage_wanted():
+            self._batches_since_log += 1
+            self._batched_frames_since_log += len(model_jobs)
+            if getattr(self, '_model_worker', None):
+                # Frames that were not pre-submitted get newer job ids than the queued ones; the
+                # worker keeps every result until it is collected, so the collection order below
+                # (capture order) does not need to follow the job ids.
+                for job in model_jobs:
+                    if job.get("job_id") is None:
+                        job["job_id"] = self._send_to_worker(job["frame"], self.input_size)
+            elif self._yolo_batch is not None:
+                try:
+                    batch_results = self._yolo_batch([job["frame"] for job in model_jobs], self.input_size)
+                    for job, batch_result in zip(model_jobs, batch_results):
+                        job["batch_result"] = batch_result
+                except Exception as e:
+                    logging.warning(f"[MODEL] Batched inference failed, running frames one by one from now on: {e}")
+                    self._yolo_batch = None
+        results = []
+        try:
+            for job in jobs:
+                results.append(self._run_inference_job(job, interpreter))
+        finally:
+            # Release the worker results of the frames that were not collected because of an error
+            for job in jobs[len(results):]:
+                self._discard_worker_job(job)
+        if model_jobs:
+            frame_time = (tm.monotonic() - t_start) / len(model_jobs)
+            self._batch_frame_time_s = frame_time if self._batch_frame_time_s <= 0 else (
+                0.8 * self._batch_frame_time_s + 0.2 * frame_time
+            )
+        return results
 
-        if np.isscalar(scores):
-            scores = np.array([scores])
-        if np.isscalar(classes):
-            classes = np.array([classes])
-        if boxes.ndim == 1:
-            boxes = np.expand_dims(boxes, axis=0)
-        
-        no_mouse_probability = 0.0
-        mouse_probability = 0.0
-        detected_objects = []
+    def _store_inference_result(self, item: tuple) -> None:
+        """Postprocess stage: encode the captured frame and append it with its result to the image buffer.
 
-        for i in range(len(scores)):
-            ymin = int(max(1, (boxes[i][0] * original_h)))
-            xmin = int(max(1, (boxes[i][1] * original_w)))
-            ymax = int(min(original_h, (boxes[i][2] * original_h)))
-            xmax = int(min(original_w, (boxes[i][3] * original_w)))
+        item is (captured_frame, result, decision_mono) with result as returned by _run_inference_job.
+        """
+        captured_frame, result, decision_mono = item
+        mouse_probability, no_mouse_probability, own_cat_probability, detected_objects = result
+        try:
+            frame_jpg = captured_frame.jpeg(self.jpeg_quality)
+        except Exception as e:
+            logging.error(f"[MODEL] Failed to encode frame to JPEG: {e}")
+            frame_jpg = None
+        if frame_jpg is not None:
+            # Stamp the frame with its capture time (not the inference start time), so the
+            # image buffer lines up with the PIR/RFID timeline used to cut motion blocks.
+            image_buffer.append(
+                captured_frame.timestamp, frame_jpg, None,
+                mouse_probability, no_mouse_probability, own_cat_probability,
+                detected_objects=detected_objects,
+                timestamp_mono=captured_frame.timestamp_mono,
+                frame_id=captured_frame.frame_id,
+                decision_timestamp_mono=decision_mono,
+            )
 
-            object_name = str(self.labels[int(classes[i])])
-            probability = float(scores[i] * 100)
-            
-            detected_objects.append(DetectedObject(
-                float(xmin / original_w * 100),
-                float(ymin / original_h * 100),
-                float((xmax - xmin) / original_w * 100),
-                float((ymax - ymin) / original_h * 100),
-                object_name,
-                probability
-            ))
+    def _pipeline_read_job(self) -> dict | None:
+        """Preprocess stage source: read and prepare the next frame at the model framerate."""
+        if self.paused or videostream is None:
+            return None
+        now = tm.monotonic()
+        if now < self._pipeline_next_read_mono:
+            return None
+        if self._fps_governed:
+            videostream.skip_to_latest_frame()
+        job = self._prepare_inference_job(videostream.read_oldest_frame())
+        if job is not None:
+            self._pipeline_next_read_mono = now + self._pipeline_frame_interval
+            if not job["skip"] and getattr(self, '_model_worker', None) and self._full_stage_wanted():
+                # Hand the frame to the YOLO worker right away, so it can start while the
+                # inference stage still waits for the previous result.
+                job["job_id"] = self._send_to_worker(job["frame"], self.input_size)
+        return job
+
+    def _start_pipeline(self) -> None:
+        """Start the preprocess and postprocess threads of the pipelined mode.
+
+        The input queue keeps only the newest prepared frames (drop-oldest), so inference always
+        works on a fresh frame. The output queue blocks the inference stage without a timeout when
+        the postprocess stage falls behind (backpressure); a result is only lost if the queue is
+        already closed, which is logged and counted.
+        """
+        self._stop_pipeline()
+        input_size = max(1, int(CONFIG.get('PIPELINE_INPUT_QUEUE_SIZE', 2) or 2))
+        output_size = max(1, int(CONFIG.get('PIPELINE_OUTPUT_QUEUE_SIZE', 8) or 8))
+        if getattr(self, '_model_worker', None):
+            # Keep every worker of the pool supplied with a frame
+            input_size = max(input_size, len(self._model_worker.clients))
+        # Room for a full micro-batch
+        input_size = max(input_size, int(CONFIG.get('INFERENCE_BATCH_MAX', 1) or 1))
+        # Evicted frames may already be submitted to the worker; their results are released
+        self._pipeline_input = StageQueue("input", input_size, drop_oldest=True, on_drop=self._discard_worker_job)
+        self._pipeline_output = StageQueue("output", output_size)
+        self._pipeline_next_read_mono = 0.0
+        self._pipeline_inference_count = 0
+        self._pipeline_inference_s = 0.0
+        self._pipeline_started_mono = tm.monotonic()
+        self._pipeline_lost_results = 0
+        self._pipeline_stages = {
+            "preprocess": PipelineStage(
+                "preprocess", self._pipeline_read_job, out_queue=self._pipeline_input, idle_s=0.01
+            ).start(),
+            "postprocess": PipelineStage(
+                "postprocess", self._store_inference_result, in_queue=self._pipeline_output
+            ).start(),
+        }
+        logging.info(
+            f"[MODEL] Pipelined inference active (input queue {input_size}, drop-oldest; output queue {output_size})"
+        )
+
+    def _stop_pipeline(self) -> None:
+        """Stop the pipeline threads; pending results are still written to the image buffer."""
+        if not self._pipeline_stages:
+            return
+        self._pipeline_stages["preprocess"].stop()
+        self._pipeline_input.clear()
+        postprocess = self._pipeline_stages["postprocess"]
+        if not postprocess.drain(timeout=2.0):
+            logging.warning(f"[MODEL] Dropping {len(self._pipeline_output)} pending results on pipeline stop.")
+        postprocess.stop()
+        self._pipeline_stages = {}
+        self._pipeline_input = None
+        self._pipeline_output = None
+
+    def get_pipeline_stats(self) -> dict | None:
+        """Return per-stage timing and queue occupancy of the pipelined mode (None if not active)."""
+        stages = self._pipeline_stages
+        input_queue, output_queue = self._pipeline_input, self._pipeline_output
+        if not stages or input_queue is None or output_queue is None:
+            return None
+        running_s = max(1e-6, tm.monotonic() - self._pipeline_started_mono)
+        count = self._pipeline_inference_count
+        return {
+            "stages": {
+                "preprocess": stages["preprocess"].get_stats(),
+                "inference": {
+                    "alive": True,
+                    "processed": count,
+                    "errors": 0,
+                    "avg_ms": (self._pipeline_inference_s / count * 1000.0) if count else 0.0,
+                    "busy_ratio": self._pipeline_inference_s / running_s,
+                },
+                "postprocess": stages["postprocess"].get_stats(),
+            },
+            "queues": {
+                "input": input_queue.get_stats(),
+                "output": {**output_queue.get_stats(), "lost": self._pipeline_lost_results},
+            },
+        }
 
-            if object_name == "Maus":
-                mouse_probability = int(probability)
-            elif object_name == "Keine Maus":
-                no_mouse_probability = int(probability)
+    def get_software_motion(self) -> bool | None:
+        """Software motion signal of the camera (None if motion detection is not running)."""
+        if videostream is None or not videostream.motion_detection:
+            return None
+        return videostream.motion_detector.is_motion()
+
+    def get_motion_detector_stats(self) -> dict | None:
+        """Return the software motion detector counters of the current videostream."""
+        if videostream is None:
+            return None
+        stats = videostream.motion_detector.get_stats()
+        stats["enabled"] = videostream.motion_detection
+        return stats
+
+    def notify_capture_activity(self, source: str = "pir") -> None:
+        """Forward activity (e.g. PIR motion) to the capture framerate governor."""
+        if videostream is not None:
+            videostream.notify_activity(source)
+
+    def get_camera_decode_error_stats(self) -> dict | None:
+        """Return classified FFmpeg decode error counters of the current videostream."""
+        if videostream is None:
+            return None
+        return videostream.get_decode_error_stats()
+
+    def get_camera_health_snapshot(self) -> dict | None:
+        """Return the camera health snapshot (FPS, jitter, drops, decode failures, status) of the current videostream."""
+        if videostream is None:
+            return None
+        try:
+            return videostream.get_health_snapshot()
+        except Exception as e:
+            logging.debug(f"[CAMERA] Failed to read camera health: {e}")
+            return None
+
+    def get_capture_governor_stats(self) -> dict | None:
+        """Return the capture framerate governor state and effective FPS per state."""
+        if videostream is None:
+            return None
+        return videostream.get_governor_stats()
+
+    def _inference_roi(self) -> InferenceROI | None:
+        """Return the configured inference ROI, or None if disabled or invalid (parsed once per change)."""
+        key = (bool(CONFIG.get('INFERENCE_ROI_ENABLED', False)), str(CONFIG.get('INFERENCE_ROI', '') or ''))
+        cached = getattr(self, "_roi_cache", None)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        roi = None
+        if key[0] and key[1].strip():
+            try:
+                roi = InferenceROI.parse(key[1])
+                logging.info(f"[MODEL] Inference ROI active: {key[1]}")
+            except ValueError as e:
+                logging.warning(f"[MODEL] Ignoring invalid inference ROI '{key[1]}': {e}")
+        self._roi_cache = (key, roi)
+        return roi
+
+    def _create_tflite_interpreter(self) -> "Interpreter":
+        """Load the TFLite model and read its input/output details."""
+        # Path to .tflite file, which contains the model that is used for object detection
+        PATH_TO_TFLITE = os.path.join(self.modeldir, self.graph)
+
+        # Load the Tensorflow Lite model.
+        interpreter = self._Interpreter(model_path=PATH_TO_TFLITE, num_threads=self.num_threads)
+        interpreter.allocate_tensors()
+
+        # Get model details
+        self.tf_input_details = interpreter.get_input_details()
+        self.tf_output_details = interpreter.get_output_details()
+        self.tf_height = self.tf_input_details[0]['shape'][1]
+        self.tf_width = self.tf_input_details[0]['shape'][2]
+
+        self.input_size = max(self.tf_height, self.tf_width)
+
+        self.tf_floating_model = (self.tf_input_details[0]['dtype'] == np.float32)
+        logging.info(f"[MODEL] Floating model: {self.tf_floating_model}")
+        logging.info(f"[MODEL] Input details: {self.tf_input_details} (model shape: {self.tf_height}x{self.tf_width} --> {self.input_size})")
+
+        # Check output layer name to determine if this model was created with TF2 or TF1,
+        # because outputs are ordered differently for TF2 and TF1 models
+        self.tf_outname = self.tf_output_details[0]['name']
+        return interpreter
+
+    def _inference_input_size(self) -> tuple[int, int] | None:
+        """Return the model input size (w, h) used to size the reduced inference frames."""
+        try:
+            if self.model == "tflite":
+                return (int(self.tf_width), int(self.tf_height))
+            return (int(self.input_size), int(self.input_size))
+        except Exception:
+            return None
 
+    def _process_frame_tflite(self, frame: np.ndarray, interpreter: "Interpreter") -> tuple:
+        """
+        Process a single frame for object detection using TensorFlow Lite.
+        This method handles the preprocessing of the frame, performs inference using the TensorFlow Lite
+        interpreter, and processes the detection results.
+        Args:
+            frame (np.ndarray): Input frame in BGR format
+            interpreter (tensorflow.lite.python.interpreter.Interpreter): TFLite interpreter
+        Returns:
+            tuple: Contains:
+                - mouse_probability (float): Probability of mouse detection (0-100)
+                - no_mouse_probability (float): Probability of no mouse present (0-100)
+                - detected_objects (list): List of DetectedObject instances containing detection results
+        """
 
-        return mouse_probability, no_mouse_probability, detected_objects
+        runner = self._tflite_runner
+        if runner is None or runner.interpreter is not interpreter:
+            # Input/output buffers are allocated once per model
+            runner = self._tflite_runner = TFLiteRunner(interpreter, self.labels)
+        return runner.process(frame)
 
     def get_camera_frame(self):
         if videostream is not None:
@@ -1977,24 +2893,18 @@ class ModelHandler:
     def get_camera_frame_jpg(self, jpeg_quality: int | None = None) -> bytes | None:
         """Return a JPEG for the latest camera frame.
 
-        Keep a short-lived cache, but refresh on demand so live-view cadence is not
-        bound to model inference throughput.
+        Served from the frame bus, so the live-view cadence is not bound to model
+        inference throughput and the encoding is shared with other consumers.
         """
-        max_cache_age_s = 0.2
-        now_mono = tm.monotonic()
-        with self._live_frame_lock:
-            if self._live_frame_jpg is not None and (now_mono - float(self._live_frame_jpg_ts or 0.0)) <= max_cache_age_s:
-                return self._live_frame_jpg
-        frame = self.get_camera_frame()
-        if frame is None:
+        if videostream is None:
+            self._log_videostream_not_ready("Get Frame")
+            return None
+        latest = frame_bus.latest()
+        if latest is None:
             return None
         quality = int(jpeg_quality if jpeg_quality is not None else self.jpeg_quality)
         try:
-            jpg = encode_frame_jpg(frame, jpeg_quality=quality)
-            with self._live_frame_lock:
-                self._live_frame_jpg = jpg
-                self._live_frame_jpg_ts = now_mono
-            return jpg
+            return latest.encoded(jpeg_quality=quality)
         except Exception as e:
             logging.error(f"[MODEL] Failed to encode live-view JPEG: {e}")
             return None
@@ -0,0 +1,308 @@
+"""Offline inference benchmark: latency, throughput, memory and CPU use per model configuration.
+
+A configuration is a model (TFLite version or YOLO model), a backend (tflite, ncnn,
+openvino, pytorch), an input size and a thread count. Each configuration runs in its
+own process, pinned to as many cores as it has threads (the highest-numbered ones,
+away from the live YOLO workers), so the thread setting, the peak RSS and the CPU time
+belong to that configuration alone and a crashing runtime does not take the caller
+down. A run can be aborted from the caller (e.g. on motion at the flap); the process
+is then terminated right away.
+
+Frames come from a directory of JPEG files (by default the stored event pictures) or
+are synthetic noise frames. YOLO frames are downscaled to the input size first, like
+the reduced inference frames of the live loop.
+
+Results are stored in models/cache/benchmarks.json per device fingerprint (see
+get_device_fingerprint()); the auto-tuner and the UI read them with
+load_benchmark_results(). Besides the timings, every result keeps the classes detected
+with at least DETECTION_AGREEMENT_PROBABILITY percent per frame, so configurations can
+be compared for agreement with a reference configuration.
+"""
+
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time as tm
+from typing import Any, Callable
+
+import cv2
+import numpy as np
+
+from src.helper import get_device_fingerprint
+from src.paths import kittyhack_root, models_cache_root, models_yolo_root, pictures_original_dir
+
+BENCHMARK_FILE = "benchmarks.json"
+DETECTION_AGREEMENT_PROBABILITY = 50.0
+DEFAULT_FRAME_COUNT = 40
+
+_store_lock = threading.Lock()
+
+
+# ---- models and frames ----
+
+def discover_models(backends: list[str] | None = None) -> list[dict[str, Any]]:
+    """Return benchmark specs (without imgsz/threads) for every installed model and available backend.
+
+    TFLite models are found under tflite/<version>/, YOLO models under models/yolo/. A YOLO
+    model yields one spec per exported format on disk (NCNN, OpenVINO, PyTorch model.pt).
+    """
+    from src.model import YoloModel  # lazy import to avoid an import cycle with src.model
+    from src.model_cache import ModelArtifactCache
+
+    cache = ModelArtifactCache()
+    specs = []
+    for graph in sorted(glob.glob(os.path.join(kittyhack_root(), "tflite", "*", "cv-lite-model.tflite"))):
+        version = os.path.basename(os.path.dirname(graph))
+        specs.append({
+            "model_id": f"tflite::{version}",
+            "model_name": version,
+            "kind": "tflite",
+            "backend": "tflite",
+            "path": graph,
+            "labelfile": os.path.join(os.path.dirname(graph), "labels.txt"),
+            "imgsz_options": [300],
+        })
+
+    for model in YoloModel.get_model_list():
+        model_dir = os.path.join(models_yolo_root(), model["directory"])
+        formats = [
+            ("ncnn", os.path.join(model_dir, "best_ncnn_model")),
+            ("openvino", os.path.join(model_dir, "model_openvino_model")),
+            ("pytorch", os.path.join(model_dir, "model.pt")),
+        ]
+        for backend, path in formats:
+            if backend == "openvino" and not os.path.exists(path):
+                # OpenVINO exports are kept in the model cache
+                path = cache.find_artifact(os.path.join(model_dir, "model.pt"), "model_openvino_model") or path
+            if not os.path.exists(path):
+                continue
+            spec = {
+                "model_id": model["unique_id"] or model["directory"],
+                "model_name": model["display_name"],
+                "kind": "yolo",
+                "backend": backend,
+                "path": path,
+                "labelfile": os.path.join(model_dir, "labels.txt"),
+                "imgsz_options": None,
+                "model_imgsz": int(model["model_image_size"]),
+            }
+            if backend == "openvino":
+                # OpenVINO IR models are exported for a fixed input size
+                spec["imgsz_options"] = [int(model["model_image_size"])]
+            specs.append(spec)
+
+    if backends:
+        specs = [spec for spec in specs if spec["backend"] in backends]
+    return specs
+
+
+def load_benchmark_frames(directory: str | None = None, count: int = DEFAULT_FRAME_COUNT) -> list[np.ndarray]:
+    """Load up to count JPEG frames (default: the stored event pictures) or synthetic 800x600 frames."""
+    directory = directory or pictures_original_dir()
+    files = []
+    if directory and os.path.isdir(directory):
+        files = sorted(
+            (f for f in glob.glob(os.path.join(directory, "*")) if f.lower().endswith((".jpg", ".jpeg"))),
+            key=os.path.getmtime,
+            reverse=True,
+        )[:count]
+    frames = [frame for frame in (cv2.imread(f) for f in files) if frame is not None]
+    if frames:
+        return frames
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, (600, 800, 3), dtype=np.uint8) for __ in range(min(count, 8))]
+
+
+def _read_labels(labelfile: str) -> list[str]:
+    try:
+        with open(labelfile, "r") as f:
+            return [line.strip() for line in f if line.strip()]
+    except OSError:
+        return []
+
+
+def _downscale(frame: np.ndarray, max_side: int) -> np.ndarray:
+    h, w = frame.shape[:2]
+    if max(h, w) <= max_side:
+        return frame
+    scale = max_side / float(max(h, w))
+    return cv2.resize(frame, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+
+
+# ---- benchmark process ----
+
+def _benchmark_process(spec: dict, frames_dir: str | None, frame_count: int, seconds: float,
+                       warmup: int, result_queue) -> None:
+    """Child process: load the model, warm it up and time it over the frames."""
+    import resource
+
+    try:
+        threads = max(1, int(spec["threads"]))
+        try:
+            allowed = sorted(os.sched_getaffinity(0))
+            os.sched_setaffinity(0, allowed[-threads:])
+        except Exception:
+            pass
+
+        frames = load_benchmark_frames(frames_dir, frame_count)
+        labels = _read_labels(spec.get("labelfile", ""))
+        imgsz = int(spec["imgsz"])
+
+        t_load = tm.monotonic()
+        if spec["kind"] == "tflite":
+            from tflite_runtime.interpreter import Interpreter
+            from src.tflite_runner import TFLiteRunner
+
+            interpreter = Interpreter(model_path=spec["path"], num_threads=threads)
+            interpreter.allocate_tensors()
+            runner = TFLiteRunner(interpreter, labels)
+            imgsz = max(runner.width, runner.height)
+
+            def run(frame):
+                __, __, objects = runner.process(frame)
+                return sorted({
+                    labels.index(o.object_name) if o.object_name in labels else -1
+                    for o in objects if o.probability >= DETECTION_AGREEMENT_PROBABILITY
+                })
+        else:
+            from ultralytics import YOLO
+            from src.model import _parse_yolo_detection_results
+
+            logging.getLogger("ultralytics").setLevel(logging.WARNING)
+            model = YOLO(spec["path"], task="detect", verbose=False)
+            frames = [_downscale(frame, imgsz) for frame in frames]
+
+            def run(frame):
+                results = model(frame, stream=True, imgsz=imgsz, verbose=False)
+                __, __, detections = _parse_yolo_detection_results(results, labels, [], 101)
+                keep = detections["probability"] >= DETECTION_AGREEMENT_PROBABILITY
+                return sorted(set(detections["cls"][keep].tolist()))
+        load_ms = (tm.monotonic() - t_load) * 1000.0
+
+        for i in range(max(0, warmup)):
+            run(frames[i % len(frames)])
+
+        # Detected classes per frame, to compare configurations for agreement
+        detections = [run(frame) for frame in frames]
+        latencies = []
+        usage_start = resource.getrusage(resource.RUSAGE_SELF)
+        t_start = tm.monotonic()
+        index = 0
+        while index < len(frames) or tm.monotonic() - t_start < seconds:
+            t_frame = tm.perf_counter()
+            run(frames[index % len(frames)])
+            latencies.append((tm.perf_counter() - t_frame) * 1000.0)
+            index += 1
+        elapsed = tm.monotonic() - t_start
+        usage_end = resource.getrusage(resource.RUSAGE_SELF)
+        cpu_s = (usage_end.ru_utime - usage_start.ru_utime) + (usage_end.ru_stime - usage_start.ru_stime)
+
+        lat = np.asarray(latencies)
+        result_queue.put({
+            "ok": True,
+            "imgsz": imgsz,
+            "frames": len(latencies),
+            "load_ms": round(load_ms, 1),
+            "mean_ms": round(float(lat.mean()), 2),
+            "p50_ms": round(float(np.percentile(lat, 50)), 2),
+            "p95_ms": round(float(np.percentile(lat, 95)), 2),
+            "p99_ms": round(float(np.percentile(lat, 99)), 2),
+            "fps": round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+            # ru_maxrss is in KiB on Linux
+            "peak_rss_mb": round(usage_end.ru_maxrss / 1024.0, 1),
+            "cpu_percent": round(cpu_s / elapsed * 100.0, 1) if elapsed > 0 else 0.0,
+            "detections": detections,
+        })
+    except Exception as e:
+        result_queue.put({"ok": False, "error": f"{type(e).__name__}: {e}"})
+
+
+def run_benchmark(spec: dict, frames_dir: str | None = None, frame_count: int = DEFAULT_FRAME_COUNT,
+                  seconds: float = 10.0, warmup: int = 3, timeout: float = 600.0,
+                  abort: Callable[[], bool] | None = None) -> dict[str, Any]:
+    """Benchmark one configuration (spec with imgsz and threads) in a separate process.
+
+    abort() is polled while the benchmark runs; if it returns True, the process is
+    terminated and the result has "aborted" set.
+    Returns the spec fields plus the measurements; on failure "ok" is False and "error" set.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    result_queue = ctx.Queue()
+    process = ctx.Process(
+        target=_benchmark_process,
+        args=(spec, frames_dir, frame_count, seconds, warmup, result_queue),
+        daemon=True,
+    )
+    process.start()
+    deadline = tm.monotonic() + timeout
+    outcome = None
+    while outcome is None:
+        try:
+            outcome = result_queue.get(timeout=max(0.0, min(0.5, deadline - tm.monotonic())))
+        except queue.Empty:
+            if abort is not None and abort():
+                outcome = {"ok": False, "aborted": True, "error": "aborted"}
+            elif tm.monotonic() >= deadline:
+                outcome = {"ok": False, "error": f"no result within {timeout:.0f}s"}
+    process.join(timeout=0.0 if outcome.get("aborted") else 10)
+    if process.is_alive():
+        process.terminate()
+        process.join(timeout=2)
+    elif process.exitcode not in (0, None) and outcome.get("ok"):
+        logging.debug(f"[MODEL] Benchmark process exited with code {process.exitcode}")
+
+    result = {
+        key: spec[key] for key in ("model_id", "model_name", "kind", "backend", "imgsz", "threads") if key in spec
+    }
+    result.update(outcome)
+    result["timestamp"] = tm.time()
+    return result
+
+
+# ---- result store ----
+
+def benchmark_results_path() -> str:
+    return os.path.join(models_cache_root(), BENCHMARK_FILE)
+
+
+def _read_store() -> dict[str, Any]:
+    try:
+        with open(benchmark_results_path(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+
+def _result_identity(result: dict) -> tuple:
+    return (str(result.get("model_id")), result.get("backend"), int(result.get("imgsz") or 0), int(result.get("threads") or 0))
+
+
+def store_benchmark_results(results: list[dict[str, Any]], fingerprint: dict | None = None) -> None:
+    """Add results for this device; an existing result of the same configuration is replaced."""
+    fingerprint = fingerprint or get_device_fingerprint()
+    with _store_lock:
+        store = _read_store()
+        device = store.setdefault(fingerprint["id"], {"device": fingerprint, "results": []})
+        device["device"] = fingerprint
+        identities = {_result_identity(result) for result in results}
+        device["results"] = [r for r in device.get("results", []) if _result_identity(r) not in identities]
+        device["results"].extend(results)
+        os.makedirs(models_cache_root(), exist_ok=True)
+        tmp = f"{benchmark_results_path()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(store, f, indent=2)
+        os.replace(tmp, benchmark_results_path())
+
+
+def load_benchmark_results(model_id: str | None = None, fingerprint_id: str | None = None) -> list[dict[str, Any]]:
+    """Stored results of this device (or of fingerprint_id), optionally of one model only."""
+    fingerprint_id = fingerprint_id or get_device_fingerprint()["id"]
+    results = _read_store().get(fingerprint_id, {}).get("results", [])
+    if model_id is not None:
+        results = [r for r in results if str(r.get("model_id")) == str(model_id)]
+    return results
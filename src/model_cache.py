@@ -0,0 +1,189 @@
+"""Persistent cache of compiled model artifacts and their warm-up data.
+
+Entries are keyed by the hash of the model files, the inference backend and the input
+size, so a changed model.pt or another imgsz never reuses a stale artifact. Load and
+warm-up timings depend on the thread configuration as well, so their entries add it
+to the key; compiled artifacts (OpenVINO exports) do not, and are shared by all thread
+settings. Each entry is a directory below models/cache/ with a manifest.json (timings,
+last use) and, for artifact entries, the exported artifact itself.
+
+Hashing a model file of several MB takes noticeable time on the Raspberry Pi, so the
+hashes are remembered in hashes.json by path, size and modification time.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time as tm
+from typing import Any
+
+from src.paths import models_cache_root
+
+MANIFEST_NAME = "manifest.json"
+HASH_INDEX_NAME = "hashes.json"
+
+
+def _read_json(path: str) -> dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+
+def _atomic_write_json(path: str, data: dict[str, Any]) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+class ModelArtifactCache:
+    """Model artifact and warm-up cache below models/cache/."""
+
+    def __init__(self, root: str | None = None, max_entries: int = 8):
+        self.root = root or models_cache_root()
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+
+    # ---- keys ----
+
+    def model_hash(self, path: str) -> str:
+        """SHA-256 over a model file or over all files of a model directory (sorted by name)."""
+        files = []
+        if os.path.isdir(path):
+            for dirpath, __, filenames in os.walk(path):
+                files.extend(os.path.join(dirpath, name) for name in filenames)
+            files.sort()
+        elif os.path.exists(path):
+            files = [path]
+        if not files:
+            raise FileNotFoundError(f"Model '{path}' not found")
+
+        signature = [(os.path.relpath(f, path) if f != path else "", os.path.getsize(f), os.stat(f).st_mtime_ns) for f in files]
+        index_path = os.path.join(self.root, HASH_INDEX_NAME)
+        abs_path = os.path.abspath(path)
+        with self._lock:
+            index = _read_json(index_path)
+            cached = index.get(abs_path)
+            if isinstance(cached, dict) and cached.get("signature") == [list(s) for s in signature]:
+                return str(cached["sha256"])
+
+        digest = hashlib.sha256()
+        for f, (relpath, __, __) in zip(files, signature):
+            digest.update(relpath.encode("utf-8"))
+            with open(f, "rb") as fh:
+                for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+                    digest.update(chunk)
+        sha256 = digest.hexdigest()
+
+        with self._lock:
+            try:
+                os.makedirs(self.root, exist_ok=True)
+                index = _read_json(index_path)
+                index[abs_path] = {"sha256": sha256, "signature": [list(s) for s in signature]}
+                _atomic_write_json(index_path, index)
+            except Exception as e:
+                logging.debug(f"[MODEL] Failed to store model hash in cache index: {e}")
+        return sha256
+
+    @staticmethod
+    def key(model_hash: str, backend: str, imgsz: int, threads: str | None = None) -> str:
+        """Cache key, also the directory name of the entry (without threads for artifacts)."""
+        key = f"{model_hash[:16]}-{backend}-{int(imgsz)}"
+        return key if threads is None else f"{key}-t{threads}"
+
+    def entry_dir(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    # ---- manifests ----
+
+    def get_manifest(self, key: str) -> dict[str, Any] | None:
+        manifest = _read_json(os.path.join(self.entry_dir(key), MANIFEST_NAME))
+        return manifest or None
+
+    def update_manifest(self, key: str, **updates) -> dict[str, Any]:
+        """Merge updates into the manifest of an entry (created if missing) and mark it as used."""
+        with self._lock:
+            entry_dir = self.entry_dir(key)
+            os.makedirs(entry_dir, exist_ok=True)
+            path = os.path.join(entry_dir, MANIFEST_NAME)
+            manifest = _read_json(path)
+            if not manifest:
+                manifest = {"key": key, "created": tm.time()}
+            manifest.update(updates)
+            manifest["last_used"] = tm.time()
+            _atomic_write_json(path, manifest)
+        self.prune(keep=key)
+        return manifest
+
+    def artifact_path(self, key: str, name: str) -> str | None:
+        """Path of a stored artifact of an entry (None if it does not exist)."""
+        manifest = self.get_manifest(key)
+        path = os.path.join(self.entry_dir(key), name)
+        if manifest is None or manifest.get("artifact") != name or not os.path.exists(path):
+            return None
+        return path
+
+    def store_artifact(self, key: str, source: str, name: str) -> str:
+        """Move an exported artifact (file or directory) into the entry and return its new path."""
+        entry_dir = self.entry_dir(key)
+        os.makedirs(entry_dir, exist_ok=True)
+        target = os.path.join(entry_dir, name)
+        if os.path.abspath(source) != os.path.abspath(target):
+            if os.path.isdir(target):
+                shutil.rmtree(target, ignore_errors=True)
+            elif os.path.exists(target):
+                os.remove(target)
+            shutil.move(source, target)
+        self.update_manifest(key, artifact=name)
+        return target
+
+    def find_artifact(self, model_path: str, name: str) -> str | None:
+        """Most recently used stored artifact of a model (any input size or thread setting)."""
+        model_path = os.path.abspath(model_path)
+        for manifest in self.list_entries():
+            if manifest.get("artifact") != name or os.path.abspath(str(manifest.get("model_path") or "")) != model_path:
+                continue
+            path = os.path.join(self.entry_dir(str(manifest.get("key"))), name)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def find_artifact_for_key(self, key: str, name: str) -> str | None:
+        """Stored artifact of an artifact key, also from entries that add a thread setting to it."""
+        for manifest in self.list_entries():
+            entry_key = str(manifest.get("key") or "")
+            if manifest.get("artifact") != name or (entry_key != key and not entry_key.startswith(f"{key}-t")):
+                continue
+            path = os.path.join(self.entry_dir(entry_key), name)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def list_entries(self) -> list[dict[str, Any]]:
+        """Manifests of all entries, most recently used first."""
+        entries = []
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return []
+        for name in names:
+            manifest = _read_json(os.path.join(self.root, name, MANIFEST_NAME))
+            if manifest:
+                entries.append(manifest)
+        entries.sort(key=lambda m: float(m.get("last_used", 0.0) or 0.0), reverse=True)
+        return entries
+
+    def prune(self, keep: str | None = None) -> None:
+        """Remove the least recently used entries beyond max_entries."""
+        for manifest in self.list_entries()[self.max_entries:]:
+            key = str(manifest.get("key") or "")
+            if not key or key == keep:
+                continue
+            shutil.rmtree(self.entry_dir(key), ignore_errors=True)
+            logging.info(f"[MODEL] Removed model cache entry {key}")
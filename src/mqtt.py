@@ -20,6 +20,7 @@ class MQTTConfig:
         "manual_override": f"kittyhack/{device_id}/manual/override", # toggle_inside
         "prey_detected": f"kittyhack/{device_id}/prey/detected",
         "camera_image": f"kittyhack/{device_id}/camera/image",
+        "camera_health": f"kittyhack/{device_id}/camera/health",
         "allowed_to_exit": f"kittyhack/{device_id}/config/allowed_to_exit",
         "allowed_to_exit_set": f"kittyhack/{device_id}/config/allowed_to_exit/set",
         "allowed_to_enter": f"kittyhack/{device_id}/config/allowed_to_enter",
@@ -344,16 +345,30 @@ class StatePublisher:
             if not success:
                 logging.warning("[MQTT] Failed to encode image")
                 return
-                
-            img_str = base64.b64encode(buffer).decode()
+
+            self.publish_jpeg(buffer.tobytes(), retain=retain)
             
-            # Publish the image
+        except Exception as e:
+            logging.warning(f"[MQTT] Could not publish image: {e}")
+
+    def publish_jpeg(self, jpeg_data: bytes, retain=False):
+        """Publish already encoded JPEG bytes to the camera image topic"""
+        try:
+            img_str = base64.b64encode(jpeg_data).decode()
             topic = MQTTConfig.topics["camera_image"]
             self.mqtt_client.client.publish(topic, img_str, retain)
-            
         except Exception as e:
             logging.warning(f"[MQTT] Could not publish image: {e}")
     
+    def publish_camera_health(self, health: dict | None):
+        """Publish the camera health snapshot (see CameraHealth.snapshot()) as JSON."""
+        if not health or not self.mqtt_client.connected:
+            return
+        try:
+            self.mqtt_client.client.publish(MQTTConfig.topics["camera_health"], json.dumps(health), retain=True)
+        except Exception as e:
+            logging.warning(f"[MQTT] Could not publish camera health: {e}")
+
     def start_periodic_image_publishing(self, interval=None):
         """Start a thread that periodically publishes the latest camera image
         
@@ -377,15 +392,18 @@ class StatePublisher:
                 try:
                     # Get the model handler instance from the backend
                     from src.backend import model_handler
+                    from src.camera import frame_bus
                     
                     # Check if model_handler exists and has initialized the videostream
                     if model_handler and model_handler.check_videostream_status():
-                        # Get frame directly through model_handler
-                        frame = model_handler.get_camera_frame()
+                        # Take the latest frame from the shared frame bus. The 1280px/q70
+                        # derivative is cached on the frame and shared with other consumers.
+                        frame = frame_bus.latest()
                         if frame is not None:
-                            self.publish_image(frame, retain=True)
+                            self.publish_jpeg(frame.encoded(max_size=1280, jpeg_quality=70), retain=True)
                         else:
                             logging.debug("[MQTT] No frame available from model_handler")
+                        self.publish_camera_health(model_handler.get_camera_health_snapshot())
                     else:
                         logging.debug("[MQTT] Waiting for videostream to be initialized")
                 except Exception as e:
@@ -575,6 +593,16 @@ class StatePublisher:
                     "availability_topic": f"kittyhack/{device_id}/status",
                     "payload_available": "online",
                     "payload_not_available": "offline"
+                },
+                {
+                    "name": "Camera Health",
+                    "unique_id": f"{device_id}_camera_health",
+                    "default_entity_id": f"sensor.{device_id}_camera_health",
+                    "state_topic": f"kittyhack/{device_id}/camera/health",
+                    "value_template": "{{ value_json.status }}",
+                    "json_attributes_topic": f"kittyhack/{device_id}/camera/health",
+                    "icon": "mdi:camera-wireless",
+                    "entity_category": "diagnostic"
                 }
             ]
         }
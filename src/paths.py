@@ -44,5 +44,9 @@ def models_yolo_root() -> str:
     return os.path.join(install_base(), "models", "yolo")
 
 
+def models_cache_root() -> str:
+    return os.path.join(install_base(), "models", "cache")
+
+
 def labelstudio_root() -> str:
     return os.path.join(install_base(), "labelstudio")
@@ -0,0 +1,210 @@
+"""Bounded queues and worker-thread stages for the pipelined model loop.
+
+The model loop splits into stages connected by bounded queues:
+
+    preprocess (read frame, decode/crop)  ->  inference  ->  postprocess (JPEG, image buffer)
+
+Each stage runs on its own thread. The heavy parts (JPEG decode/encode, resize,
+NCNN/TFLite inference) release the GIL, so the stages overlap on a multi-core CPU
+and the sustained rate approaches the inference-only rate.
+
+Queues either drop the oldest item when full (live frames: only the newest one
+matters) or block the producer until there is room (backpressure: results must
+not be lost). Items dropped by a drop-oldest queue or by clear() are handed to the
+queue's on_drop callback, so their owner can release what they hold. Every queue
+and stage keeps counters for the occupancy readout.
+"""
+
+import logging
+import threading
+import time as tm
+from collections import deque
+
+
+class StageQueue:
+    """Bounded FIFO between two pipeline stages."""
+
+    def __init__(self, name: str, maxsize: int, drop_oldest: bool = False, on_drop=None):
+        self.name = name
+        self.maxsize = max(1, int(maxsize))
+        self.drop_oldest = bool(drop_oldest)
+        self.on_drop = on_drop
+        self._items: deque = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.put_count = 0
+        self.dropped = 0
+        self.high_water = 0
+        self._occupancy_sum = 0
+        self._occupancy_samples = 0
+
+    def put(self, item, timeout: float | None = None) -> bool:
+        """Add an item. Returns False if it was not queued (backpressure timeout or closed queue).
+
+        With drop_oldest, a full queue discards its oldest item instead of blocking.
+        """
+        dropped = []
+        with self._cond:
+            queued = self._put_locked(item, timeout, dropped)
+        if not queued:
+            dropped.append(item)
+        self._handle_dropped(dropped)
+        return queued
+
+    def _put_locked(self, item, timeout: float | None, dropped: list) -> bool:
+        if self._closed:
+            return False
+        if len(self._items) >= self.maxsize:
+            if self.drop_oldest:
+                dropped.append(self._items.popleft())
+                self.dropped += 1
+            else:
+                deadline = None if timeout is None else tm.monotonic() + timeout
+                while len(self._items) >= self.maxsize and not self._closed:
+                    remaining = None if deadline is None else deadline - tm.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        self.dropped += 1
+                        return False
+                    self._cond.wait(remaining)
+                if self._closed:
+                    return False
+        self._items.append(item)
+        self.put_count += 1
+        self.high_water = max(self.high_water, len(self._items))
+        self._occupancy_sum += len(self._items)
+        self._occupancy_samples += 1
+        self._cond.notify_all()
+        return True
+
+    def _handle_dropped(self, items: list) -> None:
+        if self.on_drop is None:
+            return
+        for item in items:
+            try:
+                self.on_drop(item)
+            except Exception as e:
+                logging.error(f"[MODEL] Pipeline queue '{self.name}' failed to release a dropped item: {e}")
+
+    def get(self, timeout: float | None = None):
+        """Return the oldest item, or None if the queue stayed empty for timeout seconds."""
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait_for(lambda: self._items or self._closed, timeout)
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def clear(self) -> int:
+        """Discard all queued items; returns the number of discarded items."""
+        with self._cond:
+            items = list(self._items)
+            self._items.clear()
+            self._cond.notify_all()
+        self._handle_dropped(items)
+        return len(items)
+
+    def close(self) -> None:
+        """Wake up all waiting producers and consumers; further puts are rejected."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._items)
+
+    def get_stats(self) -> dict:
+        with self._cond:
+            return {
+                "size": len(self._items),
+                "capacity": self.maxsize,
+                "put": self.put_count,
+                "dropped": self.dropped,
+                "high_water": self.high_water,
+                "avg_occupancy": (self._occupancy_sum / self._occupancy_samples) if self._occupancy_samples else 0.0,
+            }
+
+
+class PipelineStage:
+    """Worker thread that runs func on the items of in_queue and passes the results to out_queue.
+
+    Without in_queue the stage is a source: func() is called in a loop and returns the
+    next item, or None if nothing is available yet (the stage then idles for idle_s).
+    Results of None are not forwarded, so a stage without out_queue is a sink.
+    """
+
+    def __init__(self, name: str, func, in_queue: StageQueue | None = None, out_queue: StageQueue | None = None,
+                 idle_s: float = 0.005, put_timeout: float | None = 1.0):
+        self.name = name
+        self.func = func
+        self.in_queue = in_queue
+        self.out_queue = out_queue
+        self.idle_s = idle_s
+        self.put_timeout = put_timeout
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.processed = 0
+        self.errors = 0
+        self._busy_s = 0.0
+        self._started_mono = 0.0
+
+    def start(self) -> "PipelineStage":
+        self._stop.clear()
+        self._started_mono = tm.monotonic()
+        self._thread = threading.Thread(target=self._run, name=f"pipeline-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        if self.in_queue is not None:
+            self.in_queue.close()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def drain(self, timeout: float = 2.0) -> bool:
+        """Wait until in_queue is empty (e.g. before stopping a sink). Returns True if drained."""
+        deadline = tm.monotonic() + timeout
+        while self.in_queue is not None and len(self.in_queue) > 0 and self.is_alive():
+            if tm.monotonic() >= deadline:
+                return False
+            tm.sleep(0.01)
+        return True
+
+    def is_alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if self.in_queue is not None:
+                item = self.in_queue.get(timeout=0.1)
+                if item is None:
+                    continue
+            t0 = tm.perf_counter()
+            try:
+                result = self.func(item) if self.in_queue is not None else self.func()
+            except Exception as e:
+                self.errors += 1
+                logging.error(f"[MODEL] Pipeline stage '{self.name}' failed: {e}")
+                continue
+            if result is None and self.in_queue is None:
+                # Source without a new item
+                self._stop.wait(self.idle_s)
+                continue
+            self._busy_s += tm.perf_counter() - t0
+            self.processed += 1
+            if result is not None and self.out_queue is not None:
+                self.out_queue.put(result, timeout=self.put_timeout)
+
+    def get_stats(self) -> dict:
+        running_s = max(1e-6, tm.monotonic() - self._started_mono) if self._started_mono else 0.0
+        return {
+            "alive": self.is_alive(),
+            "processed": self.processed,
+            "errors": self.errors,
+            "avg_ms": (self._busy_s / self.processed * 1000.0) if self.processed else 0.0,
+            "busy_ratio": (self._busy_s / running_s) if running_s else 0.0,
+        }
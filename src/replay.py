@@ -0,0 +1,338 @@
+"""Recorded-stream replay for reproducible end-to-end runs.
+
+A replay source feeds VideoStream (source="replay") from a recording instead of a
+camera:
+  - a directory of JPEG files (played in file name order),
+  - an MJPEG file (concatenated JPEGs, e.g. a libcamera-vid --codec mjpeg dump),
+  - any video file OpenCV can open (e.g. MP4), using the container timestamps.
+
+Directory and MJPEG recordings carry no timing, they are played at the stream
+framerate. The playback rate is "realtime" (recording timing), "fast" (as fast as
+the consumer reads frames) or a fixed number of frames per second.
+
+Optionally, an event track scripts the PIR and RFID inputs against the replay
+position, so the whole detection path (motion -> camera -> RFID -> decision) runs
+the same way on every replay. The track is a JSON list or JSON lines file:
+
+    {"t": 1.5, "pir_outside": 1}
+    {"t": 4.0, "rfid": "0123456789ABCDEF"}
+    {"t": 6.0, "rfid": null, "pir_outside": 0}
+
+"t" is the replay position in seconds. A PIR value holds until the next event for
+that PIR. An RFID tag is present until cleared with null; while it is present and
+the RFID field is on, it is reported like a real reader would.
+"""
+
+import bisect
+import glob
+import json
+import logging
+import os
+import threading
+import time as tm
+from typing import Iterator, Optional
+
+import cv2
+import numpy as np
+
+from src.helper import sigterm_monitor
+
+REPLAY_RATE_REALTIME = "realtime"
+REPLAY_RATE_FAST = "fast"
+
+JPEG_EXTENSIONS = (".jpg", ".jpeg")
+MJPEG_EXTENSIONS = (".mjpg", ".mjpeg")
+
+# Interval of the replay PIR/RFID polling loops (same cadence as the hardware PIR loop)
+REPLAY_EVENT_INTERVAL = 0.05
+# Interval at which a present tag is reported again while the RFID field is on
+REPLAY_RFID_REPORT_INTERVAL = 0.5
+
+
+def parse_replay_rate(rate) -> str | float:
+    """Normalize a REPLAY_RATE value to "realtime", "fast" or a positive fps number."""
+    text = str(rate or "").strip().lower()
+    if text in ("", REPLAY_RATE_REALTIME):
+        return REPLAY_RATE_REALTIME
+    if text in (REPLAY_RATE_FAST, "max"):
+        return REPLAY_RATE_FAST
+    try:
+        fps = float(text)
+    except ValueError:
+        logging.warning(f"[REPLAY] Invalid replay rate '{rate}', using realtime playback.")
+        return REPLAY_RATE_REALTIME
+    if fps <= 0:
+        return REPLAY_RATE_FAST
+    return fps
+
+
+def replay_source_kind(path: str) -> str:
+    """Return "jpeg_dir", "mjpeg" or "video" for a replay path (raises FileNotFoundError)."""
+    if not path or not os.path.exists(path):
+        raise FileNotFoundError(f"Replay source not found: '{path}'")
+    if os.path.isdir(path):
+        return "jpeg_dir"
+    if path.lower().endswith(MJPEG_EXTENSIONS):
+        return "mjpeg"
+    return "video"
+
+
+def iter_replay_frames(path: str, fps: float) -> Iterator[tuple[float, Optional[bytes], Optional[np.ndarray]]]:
+    """Yield (position_s, jpeg_bytes, bgr_array) for every frame of a recording.
+
+    Exactly one of jpeg_bytes / bgr_array is set: JPEG recordings are passed through
+    undecoded (like the internal camera MJPEG stream), video files are decoded by OpenCV.
+    fps is the frame spacing used for recordings without timestamps.
+    """
+    kind = replay_source_kind(path)
+    frame_interval = 1.0 / max(0.1, float(fps))
+
+    if kind == "jpeg_dir":
+        files = sorted(
+            f for f in glob.glob(os.path.join(path, "*")) if f.lower().endswith(JPEG_EXTENSIONS)
+        )
+        for index, filename in enumerate(files):
+            try:
+                with open(filename, "rb") as f:
+                    data = f.read()
+            except Exception as e:
+                logging.warning(f"[REPLAY] Failed to read '{filename}': {e}")
+                continue
+            yield index * frame_interval, data, None
+
+    elif kind == "mjpeg":
+        index = 0
+        buffer = b""
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(1 << 16)
+                if chunk:
+                    buffer += chunk
+                # Same SOI/EOI splitting as the libcamera-vid MJPEG reader
+                while True:
+                    start = buffer.find(b'\xff\xd8')
+                    if start < 0:
+                        buffer = b""
+                        break
+                    end = buffer.find(b'\xff\xd9', start + 2)
+                    if end < 0:
+                        buffer = buffer[start:]
+                        break
+                    yield index * frame_interval, buffer[start:end + 2], None
+                    index += 1
+                    buffer = buffer[end + 2:]
+                if not chunk:
+                    break
+
+    else:
+        cap = cv2.VideoCapture(path)
+        if not cap.isOpened():
+            raise IOError(f"Failed to open replay video '{path}'")
+        try:
+            index = 0
+            while True:
+                ok, frame = cap.read()
+                if not ok or frame is None:
+                    break
+                position_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
+                position_s = (position_ms / 1000.0) if position_ms and position_ms > 0 else index * frame_interval
+                yield position_s, None, frame
+                index += 1
+        finally:
+            cap.release()
+
+
+class ReplayClock:
+    """Replay position shared between the video replay and the event track.
+
+    The video replay advances the position with every frame it publishes; the replay
+    PIR/RFID read their state at the same position. Events therefore stay aligned with
+    the video in every playback rate, including "fast".
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._position = 0.0
+        self._loop = 0
+
+    def set(self, position_s: float) -> None:
+        with self._lock:
+            self._position = float(position_s)
+
+    def restart(self) -> None:
+        """Start a new pass of the recording (looped replay)."""
+        with self._lock:
+            self._position = 0.0
+            self._loop += 1
+
+    def position(self) -> tuple[int, float]:
+        """Return (loop, position_s)."""
+        with self._lock:
+            return self._loop, self._position
+
+
+class ReplayEventTrack:
+    """Scripted PIR/RFID inputs of a replay, indexed by replay position."""
+
+    KEYS = ("pir_outside", "pir_inside", "rfid")
+
+    def __init__(self, events: list[dict]):
+        self.events = sorted((e for e in events if isinstance(e, dict) and "t" in e), key=lambda e: float(e["t"]))
+        self._times = [float(e["t"]) for e in self.events]
+
+    @classmethod
+    def load(cls, path: str) -> "ReplayEventTrack":
+        """Load a track from a JSON list or a JSON lines file."""
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        stripped = text.strip()
+        if stripped.startswith("["):
+            events = json.loads(stripped)
+        else:
+            events = [json.loads(line) for line in stripped.splitlines() if line.strip()]
+        track = cls(events)
+        logging.info(f"[REPLAY] Loaded {len(track.events)} events from '{path}'")
+        return track
+
+    def state_at(self, position_s: float) -> dict:
+        """Return the input state ({"pir_outside", "pir_inside", "rfid"}) at a replay position."""
+        state = {"pir_outside": 0, "pir_inside": 0, "rfid": None}
+        end = bisect.bisect_right(self._times, float(position_s))
+        for event in self.events[:end]:
+            for key in self.KEYS:
+                if key in event:
+                    state[key] = event[key]
+        return state
+
+
+# Process-wide replay position, advanced by VideoStream(source="replay")
+replay_clock = ReplayClock()
+
+
+class ReplayPir:
+    """PIR replacement that reads its states from a replay event track (same interface as Pir)."""
+
+    instance = None
+
+    def __init__(self, track: ReplayEventTrack, clock: ReplayClock = replay_clock):
+        self.track = track
+        self.clock = clock
+        self.state_outside = 0
+        self.state_inside = 0
+        self.thread_lock = threading.Lock()
+
+    def init(self):
+        ReplayPir.instance = self
+        logging.info("[REPLAY] PIR states are replayed from the event track.")
+
+    def read(self):
+        sigterm_monitor.register_task()
+        while not sigterm_monitor.stop_now:
+            __, position = self.clock.position()
+            state = self.track.state_at(position)
+            self.update_state("OUTSIDE", 1 if state["pir_outside"] else 0)
+            self.update_state("INSIDE", 1 if state["pir_inside"] else 0)
+            tm.sleep(REPLAY_EVENT_INTERVAL)
+        logging.info("[REPLAY] Stopped PIR replay.")
+        sigterm_monitor.signal_task_done()
+
+    def update_state(self, pir, state):
+        with self.thread_lock:
+            if pir == "OUTSIDE":
+                if state != self.state_outside:
+                    logging.info(f"[REPLAY] PIR outside: {state}")
+                self.state_outside = state
+            elif pir == "INSIDE":
+                if state != self.state_inside:
+                    logging.info(f"[REPLAY] PIR inside: {state}")
+                self.state_inside = state
+
+    def get_states(self):
+        """Return (outside, inside, outside_raw, inside_raw); raw states mirror the replayed states."""
+        with self.thread_lock:
+            return self.state_outside, self.state_inside, self.state_outside, self.state_inside
+
+
+class ReplayRfid:
+    """RFID replacement that reports the tags of a replay event track (same interface as Rfid).
+
+    run_states is the RfidRunState type the caller compares against (local or remote-mode).
+    """
+
+    def __init__(self, track: ReplayEventTrack, run_states, clock: ReplayClock = replay_clock):
+        self.track = track
+        self.clock = clock
+        self.run_states = run_states
+        self.tag_id = None
+        self.timestamp = 0.0
+        self.field_state = False
+        self.rfid_run_state = run_states.stopped
+        self.thread_lock = threading.Lock()
+
+    def init(self):
+        logging.info("[REPLAY] RFID tags are replayed from the event track.")
+
+    def set_power(self, state: bool):
+        pass
+
+    def set_field(self, state: bool):
+        with self.thread_lock:
+            self.field_state = bool(state)
+
+    def get_field(self):
+        with self.thread_lock:
+            return self.field_state
+
+    def run(self, read_cycles=0):
+        if self.get_run_state() != self.run_states.stopped:
+            logging.error("[REPLAY] Another RFID replay is already running.")
+            return
+        self.set_run_state(self.run_states.running)
+        last_reported = None
+        last_report_ts = 0.0
+        try:
+            while not sigterm_monitor.stop_now and self.get_run_state() != self.run_states.stop_requested:
+                __, position = self.clock.position()
+                present = self.track.state_at(position)["rfid"]
+                now = tm.time()
+                if present and self.get_field():
+                    # A real reader repeats the tag while it is in range
+                    if present != last_reported or (now - last_report_ts) >= REPLAY_RFID_REPORT_INTERVAL:
+                        if present != last_reported:
+                            logging.info(f"[REPLAY] RFID tag '{present}' at replay position {position:.2f}s")
+                        self.set_tag(str(present), now)
+                        last_report_ts = now
+                last_reported = present if present and self.get_field() else None
+                tm.sleep(REPLAY_EVENT_INTERVAL)
+        finally:
+            self.set_field(False)
+            self.set_run_state(self.run_states.stopped)
+
+    def stop_read(self, wait_for_stop=True):
+        if self.get_run_state() == self.run_states.stopped:
+            return
+        self.set_run_state(self.run_states.stop_requested)
+        if wait_for_stop:
+            while self.get_run_state() != self.run_states.stopped:
+                tm.sleep(0.1)
+
+    def time_delta_to_last_read(self):
+        with self.thread_lock:
+            return tm.time() - self.timestamp
+
+    def set_run_state(self, state):
+        with self.thread_lock:
+            self.rfid_run_state = state
+
+    def get_run_state(self):
+        with self.thread_lock:
+            return self.rfid_run_state
+
+    def get_tag(self):
+        with self.thread_lock:
+            return self.tag_id, self.timestamp
+
+    def set_tag(self, tag_id, timestamp):
+        with self.thread_lock:
+            self.tag_id = tag_id
+            self.timestamp = timestamp
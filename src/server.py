@@ -189,7 +189,8 @@ if is_remote_mode() and not CONFIG.get('USE_ALL_CORES_FOR_IMAGE_PROCESSING', Fal
     CONFIG['USE_ALL_CORES_FOR_IMAGE_PROCESSING'] = True
     update_single_config_parameter("USE_ALL_CORES_FOR_IMAGE_PROCESSING")
 
-from src.model import YoloModel
+from src.model import YoloModel, InferenceROI
+from src.camera import encode_frame_jpg
 
 
 def _ensure_valid_startup_model_selection() -> None:
@@ -3054,6 +3055,24 @@ def server(input, output, session):
             except Exception:
                 return
 
+        def _camera_health_html() -> str:
+            # Short diagnosis line from the camera health snapshot (empty if unavailable).
+            try:
+                health = model_handler.get_camera_health_snapshot()
+            except Exception:
+                health = None
+            if not health:
+                return ''
+            details = [str(health.get("status"))]
+            if health.get("issues"):
+                details.append(", ".join(health["issues"]))
+            details.append(f"{float(health.get('input_fps') or 0.0):.1f} FPS")
+            if health.get("reconnects"):
+                details.append(f"reconnects: {health['reconnects']}")
+            if health.get("backend"):
+                details.append(str(health["backend"]))
+            return '<div>' + _('Camera health: ') + ' | '.join(details) + '</div>'
+
         def _spinner_html() -> str:
             # Keep spinner phase continuous across output rerenders.
             try:
@@ -3120,6 +3139,7 @@ def server(input, output, session):
                             + _spinner_html() +
                             '<div>' + _('If you have just changed the camera settings, please wait a few seconds for the camera to reconnect.') + '</div>'
                             '<div>' + _('Current status: ') + cam_state_text + '</div>'
+                            + _camera_health_html()
                             + reconnect_hint +
                             '<div></div>'
                             '</div>'
@@ -3168,7 +3188,8 @@ def server(input, output, session):
                             '<div></div>'
                             '<div><strong>' + _('Camera stream appears to be frozen.') + '</strong></div>'
                             '<div>' + _("Please check your external IP camera connection or network settings.") + '</div>'
-                            + _spinner_html() +
+                            + _spinner_html()
+                            + _camera_health_html() +
                             '<div></div>'
                             '</div>'
                         )
@@ -6839,6 +6860,8 @@ def server(input, output, session):
                                     {
                                         "internal": _("Internal Camera"),
                                         "ip_camera": _("External IP Camera"),
+                                        # Replay is configured in config.ini only; keep it selectable while active.
+                                        **({"replay": _("Recorded stream (replay)")} if CONFIG['CAMERA_SOURCE'] == "replay" else {}),
                                     },
                                     selected=CONFIG['CAMERA_SOURCE'],
                                 ),
@@ -7008,6 +7031,70 @@ def server(input, output, session):
                             class_="kh-info-toggle",
                             style_="margin-top: 0.75rem;",
                         ),
+                        ui.div(
+                            ui.tags.button(
+                                ui.tags.span(
+                                    "\u25b6",
+                                    class_="toggle-chevron",
+                                    style_="display:inline-block; transition:transform .2s;",
+                                ),
+                                " ",
+                                _("Inference region (ROI)"),
+                                type="button",
+                                class_="btn btn-link p-0 info-toggle-btn",
+                                style_="text-decoration:none;",
+                                **{
+                                    "data-bs-toggle": "collapse",
+                                    "data-bs-target": "#inference_roi_settings_body",
+                                    "aria-expanded": "false",
+                                    "aria-controls": "inference_roi_settings_body",
+                                },
+                            ),
+                            ui.div(
+                                ui.div(
+                                    ui.br(),
+                                    ui.row(
+                                        ui.column(
+                                            12,
+                                            ui.input_switch(
+                                                "btnEnableInferenceRoi",
+                                                _("Crop the camera image to a region before detection"),
+                                                CONFIG.get('INFERENCE_ROI_ENABLED', False),
+                                            ),
+                                        ),
+                                        ui.column(
+                                            12,
+                                            ui.input_text(
+                                                "txtInferenceRoi",
+                                                _("Region (in percent of the image)"),
+                                                value=CONFIG.get('INFERENCE_ROI', ''),
+                                                placeholder="20,10,60,80",
+                                                width="100%",
+                                            ),
+                                        ),
+                                        ui.column(
+                                            12,
+                                            ui.markdown(
+                                                _("Only this part of the camera image is passed to the detection model, so the flap opening gets more of the model's input resolution.")
+                                                + "  \n"
+                                                + _("Rectangle: `x,y,width,height` (e.g. `20,10,60,80`). Polygon: at least three points `x,y` separated by spaces (e.g. `30,0 70,0 90,100 10,100`). All values are percent of the image width/height.")
+                                            ),
+                                            style_="color: grey;",
+                                        ),
+                                        ui.column(
+                                            12,
+                                            ui.output_ui("inference_roi_preview"),
+                                        ),
+                                    ),
+                                ),
+                                id="inference_roi_settings_body",
+                                class_="collapse info-toggle-body",
+                                style_="margin-top:6px;",
+                            ),
+                            id="inference_roi_settings",
+                            class_="kh-info-toggle",
+                            style_="margin-top: 0.75rem;",
+                        ),
                         ui.br(),
                         full_screen=False,
                         class_="generic-container align-left",
@@ -7925,6 +8012,32 @@ def server(input, output, session):
             min=input.sldMinThreshold(),
         )
 
+    @output
+    @render.ui
+    def inference_roi_preview():
+        roi_text = str(input.txtInferenceRoi() or "").strip()
+        enabled = bool(input.btnEnableInferenceRoi())
+        reactive.invalidate_later(5.0)
+        if not roi_text:
+            return ui.HTML("")
+        try:
+            roi = InferenceROI.parse(roi_text)
+        except ValueError as e:
+            return ui.div(_("Invalid region: {}").format(e), style_="color: #c0392b;")
+        frame = model_handler.get_camera_frame() if model_handler is not None else None
+        if frame is None:
+            return ui.div(_("No camera image available for the preview."), style_="color: grey;")
+        try:
+            preview_b64 = base64.b64encode(encode_frame_jpg(roi.draw(frame), jpeg_quality=70)).decode("utf-8")
+        except Exception as e:
+            logging.warning(f"[SERVER] Failed to render inference ROI preview: {e}")
+            return ui.HTML("")
+        hint = "" if enabled else '<div style="color: grey;">' + _("Preview only. Enable the switch above to use the region.") + '</div>'
+        return ui.HTML(
+            f'<img src="data:image/jpeg;base64,{preview_b64}" style="width:100%; max-width:640px; border-radius:6px;" />'
+            + hint
+        )
+
     @reactive.Effect
     @reactive.event(input.bSaveKittyhackConfig)
     def on_save_kittyhack_config():
@@ -8191,6 +8304,15 @@ def server(input, output, session):
             CONFIG['IP_CAMERA_HW_DECODE'] = 'auto'
         if CONFIG['IP_CAMERA_HW_DECODE'] not in {'auto', 'none', 'cuda', 'vaapi', 'qsv'}:
             CONFIG['IP_CAMERA_HW_DECODE'] = 'auto'
+        roi_text = str(input.txtInferenceRoi() or '').strip()
+        if roi_text:
+            try:
+                InferenceROI.parse(roi_text)
+            except ValueError as e:
+                ui.notification_show(_("Invalid inference region, the region was not saved: {}").format(e), duration=10, type="error")
+                roi_text = CONFIG.get('INFERENCE_ROI', '')
+        CONFIG['INFERENCE_ROI'] = roi_text
+        CONFIG['INFERENCE_ROI_ENABLED'] = bool(input.btnEnableInferenceRoi()) and bool(roi_text)
 
         if camera_settings_changed:
             # Ensure live view reacts immediately (do not keep showing an old frame).
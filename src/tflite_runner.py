@@ -0,0 +1,103 @@
+"""Allocation-free TFLite inference for the original Kittyflap models.
+
+TFLiteRunner prepares everything that does not change between frames once per
+model: tensor indices, the output layout (TF1/TF2), and a preallocated resize
+buffer. Per frame it:
+  - resizes the camera frame into the preallocated buffer (cv2.resize with dst),
+  - converts BGR to RGB directly into the interpreter's input tensor (uint8 models),
+    or normalizes into the float input tensor in place (float models),
+  - reads the outputs through tensor views instead of copies.
+
+The interpreter refuses to invoke() while numpy views of its tensors are alive, so
+the views are requested again for every frame and released before invoke().
+"""
+
+import cv2
+import numpy as np
+
+from src.camera import DetectedObject
+
+INPUT_MEAN = 127.5
+INPUT_STD = 127.5
+
+
+class TFLiteRunner:
+    """Runs a TFLite detection model on BGR frames with preallocated buffers."""
+
+    def __init__(self, interpreter, labels: list[str]):
+        self.interpreter = interpreter
+        self.labels = labels
+        self.input_details = interpreter.get_input_details()
+        self.output_details = interpreter.get_output_details()
+        self.height = int(self.input_details[0]['shape'][1])
+        self.width = int(self.input_details[0]['shape'][2])
+        self.floating_model = (self.input_details[0]['dtype'] == np.float32)
+        self._input_index = self.input_details[0]['index']
+
+        # Check output layer name to determine if this model was created with TF2 or TF1,
+        # because outputs are ordered differently for TF2 and TF1 models
+        outname = self.output_details[0]['name']
+        if 'StatefulPartitionedCall' in outname:  # This is a TF2 model
+            boxes_idx, classes_idx, scores_idx = 1, 3, 0
+        elif 'detected_scores:0' in outname:
+            boxes_idx, classes_idx, scores_idx = 1, 2, 0
+        else:  # This is a TF1 model
+            boxes_idx, classes_idx, scores_idx = 0, 1, 2
+        self._boxes_index = self.output_details[boxes_idx]['index']
+        self._classes_index = self.output_details[classes_idx]['index']
+        self._scores_index = self.output_details[scores_idx]['index']
+
+        self._resized = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        self._rgb = np.empty((self.height, self.width, 3), dtype=np.uint8) if self.floating_model else None
+
+    def set_input(self, frame: np.ndarray) -> None:
+        """Resize and convert a BGR frame into the input tensor."""
+        cv2.resize(frame, (self.width, self.height), dst=self._resized)
+        input_view = self.interpreter.tensor(self._input_index)()[0]
+        if self.floating_model:
+            cv2.cvtColor(self._resized, cv2.COLOR_BGR2RGB, dst=self._rgb)
+            np.subtract(self._rgb, INPUT_MEAN, out=input_view, casting='unsafe')
+            np.multiply(input_view, 1.0 / INPUT_STD, out=input_view)
+        else:
+            cv2.cvtColor(self._resized, cv2.COLOR_BGR2RGB, dst=input_view)
+        del input_view
+
+    def read_outputs(self, original_w: int, original_h: int) -> tuple:
+        """Decode the output tensors; returns (mouse_probability, no_mouse_probability, detected_objects)."""
+        scores = np.atleast_1d(self.interpreter.tensor(self._scores_index)()[0])
+        classes = np.atleast_1d(self.interpreter.tensor(self._classes_index)()[0])
+        boxes = np.atleast_2d(self.interpreter.tensor(self._boxes_index)()[0])
+
+        count = len(scores)
+        ymin = np.maximum(1, boxes[:count, 0] * original_h).astype(np.int64)
+        xmin = np.maximum(1, boxes[:count, 1] * original_w).astype(np.int64)
+        ymax = np.minimum(original_h, boxes[:count, 2] * original_h).astype(np.int64)
+        xmax = np.minimum(original_w, boxes[:count, 3] * original_w).astype(np.int64)
+        probabilities = (scores[:count] * 100).astype(np.float64).tolist()
+        class_ids = classes[:count].astype(np.int64).tolist()
+        x = (xmin / original_w * 100).tolist()
+        y = (ymin / original_h * 100).tolist()
+        w = ((xmax - xmin) / original_w * 100).tolist()
+        h = ((ymax - ymin) / original_h * 100).tolist()
+        # Release the tensor views before the next invoke()
+        del scores, classes, boxes
+
+        mouse_probability = 0.0
+        no_mouse_probability = 0.0
+        detected_objects = []
+        for i in range(count):
+            object_name = str(self.labels[class_ids[i]])
+            probability = probabilities[i]
+            detected_objects.append(DetectedObject(x[i], y[i], w[i], h[i], object_name, probability))
+            if object_name == "Maus":
+                mouse_probability = int(probability)
+            elif object_name == "Keine Maus":
+                no_mouse_probability = int(probability)
+        return mouse_probability, no_mouse_probability, detected_objects
+
+    def process(self, frame: np.ndarray) -> tuple:
+        """Run the model on a BGR frame; returns (mouse_probability, no_mouse_probability, detected_objects)."""
+        original_h, original_w = frame.shape[:2]
+        self.set_input(frame)
+        self.interpreter.invoke()
+        return self.read_outputs(original_w, original_h)
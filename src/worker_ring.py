@@ -0,0 +1,483 @@
+"""Shared-memory transport between the model loop and the YOLO worker process.
+
+Frames are not pickled onto a multiprocessing.Queue anymore. The main process copies
+each frame into a free slot of a shared-memory ring and sends only a small control
+message (job id, slot index, frame shape) to the worker. The worker reads the frame
+in place, runs the model and writes the detections into the result slot with the
+same index, then answers with (job id, slot index).
+
+Several slots can be in flight at the same time, so the next frame is already
+waiting when the worker finishes the current one and the worker stays busy with
+inference instead of waiting for round trips.
+
+A collector thread in the main process reads the answers and returns the slots to
+the free list. If the worker process dies or stops answering, its in-flight slots
+are reclaimed and a new worker is started on the same ring.
+
+Results are kept until they are collected with result(), in any order, or until the
+job is abandoned with discard() (e.g. a pre-submitted frame evicted from a queue).
+Results that are neither collected nor discarded expire after RESULT_TTL_S.
+
+Control messages (main -> worker):
+    ("params", labels, cat_names, min_threshold)   only sent when they change
+    (job_id, slot, shape, input_size)
+    None                                            exit
+Answers (worker -> main):
+    ("ready", pid)                                  model loaded
+    (job_id, slot)                                  result written to the slot
+"""
+
+import logging
+import multiprocessing
+import queue
+import threading
+import time as tm
+from collections import deque
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable
+
+import cv2
+import numpy as np
+
+from src.camera import DETECTION_DTYPE
+
+# Ultralytics reports at most 300 detections per image (max_det)
+MAX_RESULT_OBJECTS = 300
+
+# Per-slot detection result: probabilities plus the DETECTION_DTYPE rows of the decoder
+RESULT_DTYPE = np.dtype([
+    ("job_id", np.int64),
+    ("mouse_probability", np.float32),
+    ("own_cat_probability", np.float32),
+    ("count", np.int32),
+    ("objects", DETECTION_DTYPE, (MAX_RESULT_OBJECTS,)),
+])
+
+
+class FrameRing:
+    """Input frame slots and result slots in shared memory.
+
+    The creating process passes names=None; the worker attaches with the names of the creator.
+    Each frame slot holds up to max_side x max_side x 3 bytes.
+    """
+
+    def __init__(self, slots: int, max_side: int, names: tuple[str, str] | None = None):
+        self.slots = max(1, int(slots))
+        self.max_side = max(1, int(max_side))
+        self.frame_bytes = self.max_side * self.max_side * 3
+        self._owner = names is None
+        self._frames_shm = SharedMemory(
+            name=None if self._owner else names[0], create=self._owner, size=self.slots * self.frame_bytes
+        )
+        self._results_shm = SharedMemory(
+            name=None if self._owner else names[1], create=self._owner, size=self.slots * RESULT_DTYPE.itemsize
+        )
+        self.frames = np.ndarray((self.slots, self.frame_bytes), dtype=np.uint8, buffer=self._frames_shm.buf)
+        self.results = np.ndarray((self.slots,), dtype=RESULT_DTYPE, buffer=self._results_shm.buf)
+
+    @property
+    def names(self) -> tuple[str, str]:
+        return self._frames_shm.name, self._results_shm.name
+
+    def write_frame(self, slot: int, frame: np.ndarray) -> tuple[int, ...]:
+        """Copy a frame into a slot and return its shape.
+
+        Frames larger than the slot are downscaled to max_side on the longer side first.
+        The model letterboxes to its input size anyway, so this only moves the resize
+        out of the worker.
+        """
+        h, w = frame.shape[:2]
+        if max(h, w) > self.max_side:
+            scale = self.max_side / float(max(h, w))
+            frame = cv2.resize(
+                frame, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA
+            )
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        self.frames[slot, :frame.size] = frame.reshape(-1)
+        return tuple(frame.shape)
+
+    def read_frame(self, slot: int, shape: tuple[int, ...]) -> np.ndarray:
+        """Return a view of the frame in a slot (valid until the slot is reused)."""
+        size = int(np.prod(shape))
+        return self.frames[slot, :size].reshape(shape)
+
+    def write_result(self, slot: int, job_id: int, mouse_probability, own_cat_probability,
+                     detections: np.ndarray) -> None:
+        """Store a detection result (as returned by _parse_yolo_detection_results) in a result slot."""
+        count = min(len(detections), MAX_RESULT_OBJECTS)
+        self.results["objects"][slot, :count] = detections[:count]
+        record = self.results[slot]
+        record["job_id"] = job_id
+        record["mouse_probability"] = mouse_probability
+        record["own_cat_probability"] = own_cat_probability
+        record["count"] = count
+
+    def read_result(self, slot: int) -> tuple[int, int, int, np.ndarray]:
+        """Return (job_id, mouse_probability, own_cat_probability, detections) of a result slot."""
+        record = self.results[slot]
+        count = int(record["count"])
+        return (
+            int(record["job_id"]),
+            int(record["mouse_probability"]),
+            int(record["own_cat_probability"]),
+            self.results["objects"][slot, :count].copy(),
+        )
+
+    def close(self) -> None:
+        """Detach from the shared memory; the owner also removes it."""
+        # The numpy views must be released before the buffers can be closed
+        self.frames = None
+        self.results = None
+        for shm in (self._frames_shm, self._results_shm):
+            try:
+                shm.close()
+                if self._owner:
+                    shm.unlink()
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logging.warning(f"[MODEL] Failed to release shared memory '{shm.name}': {e}")
+
+
+class WorkerRingClient:
+    """Main-process side of a YOLO worker: slot bookkeeping, result collection and crash recovery.
+
+    start_worker(input_queue, output_queue, ring_names) must start and return the worker process.
+    """
+
+    # Restart delay after a crash, doubled for every further crash in a row (capped)
+    RESTART_DELAY_S = 2.0
+    RESTART_DELAY_MAX_S = 30.0
+    # Uncollected results are dropped after this time (safety net for leaked job ids)
+    RESULT_TTL_S = 60.0
+
+    def __init__(self, name: str, start_worker: Callable, slots: int, max_side: int, hang_timeout_s: float = 10.0):
+        self.name = name
+        self._start_worker = start_worker
+        self.ring = FrameRing(slots, max_side)
+        self.hang_timeout_s = float(hang_timeout_s)
+        self._cond = threading.Condition()
+        self._free: deque[int] = deque(range(self.ring.slots))
+        self._in_flight: dict[int, tuple[int, float]] = {}  # job_id -> (slot, submit time)
+        self._results: dict[int, tuple[tuple, float]] = {}  # job_id -> (result, completion time)
+        self._abandoned: set[int] = set()  # in-flight jobs whose result nobody will collect
+        self._next_job_id = 0
+        self._params = None
+        self._ready_mono: float | None = None
+        self._stop = threading.Event()
+        self.restarts = 0
+        self.completed = 0
+        self._latency_sum_s = 0.0
+        self._crashes_in_row = 0
+        self._restart_after_mono = 0.0
+        self.process: multiprocessing.Process | None = None
+        self.input_queue = None
+        self.output_queue = None
+        with self._cond:
+            self._spawn_locked()
+        self._collector = threading.Thread(target=self._collect, name=f"yolo-collector-{name}", daemon=True)
+        self._collector.start()
+
+    def _spawn_locked(self) -> None:
+        self.input_queue = multiprocessing.Queue()
+        self.output_queue = multiprocessing.Queue()
+        self._params = None
+        self._ready_mono = None
+        self.process = self._start_worker(self.input_queue, self.output_queue, self.ring.names)
+
+    def is_alive(self) -> bool:
+        process = self.process
+        return process is not None and process.is_alive()
+
+    def load(self) -> int:
+        """Number of jobs in flight (used for least-loaded dispatch)."""
+        with self._cond:
+            return len(self._in_flight)
+
+    def wait_ready(self, timeout: float) -> bool:
+        """Wait until the worker has loaded its model."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._ready_mono is not None or self._stop.is_set(), timeout) \
+                and self._ready_mono is not None
+
+    def submit(self, frame: np.ndarray, input_size: int, labels: list[str], cat_names: list[str],
+               min_threshold, timeout: float = 1.0) -> int | None:
+        """Copy a frame into a free slot and queue it for inference.
+
+        Waits up to timeout seconds for a free slot. Returns the job id, or None if no slot
+        became free or the worker is being restarted.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._free or self._stop.is_set(), timeout):
+                return None
+            if self._stop.is_set() or self.process is None:
+                return None
+            slot = self._free.popleft()
+            try:
+                shape = self.ring.write_frame(slot, frame)
+            except Exception as e:
+                self._free.append(slot)
+                logging.error(f"[MODEL] Failed to copy frame to worker slot: {e}")
+                return None
+            params = (list(labels), list(cat_names), min_threshold)
+            if params != self._params:
+                self.input_queue.put(("params",) + params)
+                self._params = params
+            job_id = self._next_job_id
+            self._next_job_id += 1
+            self._in_flight[job_id] = (slot, tm.monotonic())
+            self.input_queue.put((job_id, slot, shape, input_size))
+            return job_id
+
+    def result(self, job_id: int, timeout: float = 1.0) -> tuple | None:
+        """Wait for the result of a job: (mouse_probability, own_cat_probability, objects) or None.
+
+        Results can be collected in any order. A job that is still running when the timeout
+        expires is abandoned, its late result is dropped.
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: job_id in self._results or job_id not in self._in_flight or self._stop.is_set(), timeout
+            )
+            entry = self._results.pop(job_id, None)
+            if entry is None:
+                if job_id in self._in_flight:
+                    self._abandoned.add(job_id)
+                return None
+            return entry[0]
+
+    def discard(self, job_id: int) -> None:
+        """Abandon a job whose result will not be collected (its result is dropped)."""
+        with self._cond:
+            if self._results.pop(job_id, None) is None and job_id in self._in_flight:
+                self._abandoned.add(job_id)
+
+    def _collect(self) -> None:
+        while not self._stop.is_set():
+            output_queue = self.output_queue
+            try:
+                msg = output_queue.get(timeout=0.2) if output_queue is not None else None
+            except queue.Empty:
+                msg = None
+            except (EOFError, OSError, ValueError):
+                msg = None
+                tm.sleep(0.2)
+            with self._cond:
+                if self._stop.is_set():
+                    break
+                if msg is not None and output_queue is self.output_queue:
+                    self._handle_message_locked(msg)
+                self._check_worker_locked()
+
+    def _handle_message_locked(self, msg) -> None:
+        if msg[0] == "ready":
+            self._ready_mono = tm.monotonic()
+            self._crashes_in_row = 0
+            self._cond.notify_all()
+            logging.info(f"[MODEL] YOLO worker {self.name} ready (pid {msg[1]}, {self.ring.slots} shared-memory slots)")
+            return
+        job_id, slot = msg
+        entry = self._in_flight.pop(job_id, None)
+        if entry is None or entry[0] != slot:
+            # Answer for a slot that was already reclaimed
+            return
+        try:
+            __, mouse_probability, own_cat_probability, objects = self.ring.read_result(slot)
+            now = tm.monotonic()
+            if job_id in self._abandoned:
+                self._abandoned.discard(job_id)
+            else:
+                self._results[job_id] = ((mouse_probability, own_cat_probability, objects), now)
+            expired = [j for j, (__, completed) in self._results.items() if now - completed > self.RESULT_TTL_S]
+            for stale in expired:
+                del self._results[stale]
+            if expired:
+                logging.warning(f"[MODEL] YOLO worker {self.name}: dropped {len(expired)} results that were never collected")
+            self.completed += 1
+            self._latency_sum_s += tm.monotonic() - entry[1]
+        except Exception as e:
+            logging.error(f"[MODEL] Failed to read result of job {job_id} from worker slot {slot}: {e}")
+        self._free.append(slot)
+        self._cond.notify_all()
+
+    def _check_worker_locked(self) -> None:
+        now = tm.monotonic()
+        if self.process is None:
+            if now >= self._restart_after_mono:
+                self._spawn_locked()
+                self.restarts += 1
+                logging.info(f"[MODEL] Restarted YOLO worker {self.name} (restart #{self.restarts})")
+            return
+
+        reason = None
+        if not self.process.is_alive():
+            reason = f"process exited with code {self.process.exitcode}"
+        elif self._ready_mono is not None and self._in_flight:
+            oldest = min(max(submitted, self._ready_mono) for __, submitted in self._in_flight.values())
+            if now - oldest > self.hang_timeout_s:
+                reason = f"no result for {now - oldest:.1f}s"
+        if reason is None:
+            return
+
+        logging.error(
+            f"[MODEL] YOLO worker {self.name} failed ({reason}). "
+            f"Reclaiming {len(self._in_flight)} in-flight slots and restarting the worker."
+        )
+        self._terminate_locked()
+        self._free = deque(range(self.ring.slots))
+        self._in_flight.clear()
+        # Results that were already read stay collectable; the in-flight jobs are gone
+        self._abandoned.clear()
+        self._crashes_in_row += 1
+        delay = min(self.RESTART_DELAY_MAX_S, self.RESTART_DELAY_S * (2 ** (self._crashes_in_row - 1)))
+        self._restart_after_mono = now + delay
+        self._cond.notify_all()
+
+    def _terminate_locked(self) -> None:
+        process = self.process
+        self.process = None
+        try:
+            if process is not None and process.is_alive():
+                process.terminate()
+                process.join(timeout=2)
+        except Exception as e:
+            logging.warning(f"[MODEL] Failed to terminate YOLO worker {self.name}: {e}")
+        for q in (self.input_queue, self.output_queue):
+            try:
+                if q is not None:
+                    q.close()
+                    q.cancel_join_thread()
+            except Exception:
+                pass
+        self.input_queue = None
+        self.output_queue = None
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stop the worker and the collector and release the shared memory."""
+        with self._cond:
+            if self._stop.is_set():
+                return
+            self._stop.set()
+            self._cond.notify_all()
+            process = self.process
+        try:
+            if process is not None and process.is_alive():
+                self.input_queue.put(None)
+                process.join(timeout=timeout)
+        except Exception:
+            pass
+        self._collector.join(timeout=1.0)
+        with self._cond:
+            self._terminate_locked()
+        self.ring.close()
+
+    def get_stats(self) -> dict:
+        with self._cond:
+            return {
+                "alive": self.process is not None and self.process.is_alive(),
+                "ready": self._ready_mono is not None,
+                "slots": self.ring.slots,
+                "in_flight": len(self._in_flight),
+                "completed": self.completed,
+                "avg_latency_ms": (self._latency_sum_s / self.completed * 1000.0) if self.completed else 0.0,
+                "restarts": self.restarts,
+            }
+
+
+class WorkerPool:
+    """Several ring workers behind the submit/result interface of a single WorkerRingClient.
+
+    Jobs are dispatched round-robin or to the worker with the fewest jobs in flight. Job ids
+    are pool-wide and increase with every submitted frame; results are handed out per job
+    id, in any order, even if the workers finish out of order. Jobs whose result will not
+    be collected must be released with discard().
+    """
+
+    DISPATCH_ROUND_ROBIN = "round_robin"
+    DISPATCH_LEAST_LOADED = "least_loaded"
+
+    def __init__(self, clients: list[WorkerRingClient], dispatch: str = DISPATCH_LEAST_LOADED):
+        if not clients:
+            raise ValueError("WorkerPool needs at least one worker")
+        self.clients = clients
+        self.dispatch = dispatch if dispatch in (self.DISPATCH_ROUND_ROBIN, self.DISPATCH_LEAST_LOADED) \
+            else self.DISPATCH_LEAST_LOADED
+        self._lock = threading.Lock()
+        self._next_job_id = 0
+        self._next_client = 0
+        self._jobs: dict[int, tuple[WorkerRingClient, int, float]] = {}  # job_id -> (client, client job id, submit time)
+
+    def _dispatch_order(self) -> list[WorkerRingClient]:
+        """Workers in the order they should be tried for the next job."""
+        if self.dispatch == self.DISPATCH_ROUND_ROBIN:
+            with self._lock:
+                start = self._next_client
+                self._next_client = (self._next_client + 1) % len(self.clients)
+            return self.clients[start:] + self.clients[:start]
+        return sorted(self.clients, key=lambda client: client.load())
+
+    def submit(self, frame: np.ndarray, input_size: int, labels: list[str], cat_names: list[str],
+               min_threshold, timeout: float = 1.0) -> int | None:
+        order = self._dispatch_order()
+        # Prefer a worker with a free slot right now; otherwise wait for the preferred one
+        client_job_id = None
+        for client in order:
+            client_job_id = client.submit(frame, input_size, labels, cat_names, min_threshold, timeout=0)
+            if client_job_id is not None:
+                break
+        if client_job_id is None:
+            client = order[0]
+            client_job_id = client.submit(frame, input_size, labels, cat_names, min_threshold, timeout=timeout)
+            if client_job_id is None:
+                return None
+        now = tm.monotonic()
+        with self._lock:
+            job_id = self._next_job_id
+            self._next_job_id += 1
+            self._jobs[job_id] = (client, client_job_id, now)
+            # Safety net for job ids that were neither collected nor discarded
+            expired = [j for j, entry in self._jobs.items() if now - entry[2] > WorkerRingClient.RESULT_TTL_S]
+            expired_entries = [self._jobs.pop(j) for j in expired]
+        for expired_client, expired_job_id, __ in expired_entries:
+            expired_client.discard(expired_job_id)
+        if expired_entries:
+            logging.warning(f"[MODEL] YOLO worker pool: released {len(expired_entries)} jobs that were never collected")
+        return job_id
+
+    def discard(self, job_id: int | None) -> None:
+        """Abandon a job whose result will not be collected."""
+        if job_id is None:
+            return
+        with self._lock:
+            entry = self._jobs.pop(job_id, None)
+        if entry is not None:
+            client, client_job_id, __ = entry
+            client.discard(client_job_id)
+
+    def result(self, job_id: int | None, timeout: float = 1.0) -> tuple | None:
+        if job_id is None:
+            return None
+        with self._lock:
+            # Entries are released on collection or with discard(), never by id order
+            entry = self._jobs.pop(job_id, None)
+        if entry is None:
+            return None
+        client, client_job_id, __ = entry
+        return client.result(client_job_id, timeout=timeout)
+
+    def is_alive(self) -> bool:
+        return any(client.is_alive() for client in self.clients)
+
+    def wait_ready(self, timeout: float) -> bool:
+        deadline = tm.monotonic() + timeout
+        return all(client.wait_ready(max(0.0, deadline - tm.monotonic())) for client in self.clients)
+
+    def stop(self, timeout: float = 2.0) -> None:
+        for client in self.clients:
+            client.stop(timeout=timeout)
+
+    def get_stats(self) -> dict:
+        return {
+            "dispatch": self.dispatch,
+            "workers": [client.get_stats() for client in self.clients],
+        }
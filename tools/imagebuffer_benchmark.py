@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Scan latency of the ImageBuffer filter queries with a full buffer.
+
+Fills an ImageBuffer with MAX_IMAGE_BUFFER_SIZE frames and times the queries
+backend_main runs at every motion end (one time-window query plus three
+threshold queries), plus the 5 s lookback of the camera-based motion detection.
+For comparison, the same filters are timed as a plain Python scan over the
+elements (the previous implementation).
+
+Usage:
+    python tools/imagebuffer_benchmark.py [--frames 1000] [--iterations 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time as tm
+
+# Allow running the script directly from the repo root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.camera import ImageBuffer  # noqa: E402
+
+MIN_THRESHOLD = 30.0
+
+
+def fill(buffer: ImageBuffer, frames: int) -> tuple[float, float]:
+    """Append frames spaced 100 ms apart ending now; returns the (wall) time span."""
+    payload = b"\xff\xd8" + os.urandom(1024) + b"\xff\xd9"
+    now, now_mono = tm.time(), tm.monotonic()
+    for i in range(frames):
+        age = (frames - i) * 0.1
+        buffer.append(
+            now - age, payload, None,
+            random.uniform(0, 100), random.uniform(0, 100), random.uniform(0, 100),
+            timestamp_mono=now_mono - age,
+        )
+    return now - frames * 0.1, now
+
+
+def motion_end_queries(buffer: ImageBuffer, start: float, end: float) -> int:
+    ids = buffer.get_filtered_ids(start, end)
+    ids_mouse = buffer.get_filtered_ids(start, end, min_mouse_probability=MIN_THRESHOLD)
+    ids_nomouse = buffer.get_filtered_ids(start, end, min_no_mouse_probability=MIN_THRESHOLD)
+    ids_cat = buffer.get_filtered_ids(start, end, min_own_cat_probability=MIN_THRESHOLD)
+    return len(ids) + len(ids_mouse) + len(ids_nomouse) + len(ids_cat)
+
+
+def motion_end_queries_python(buffer: ImageBuffer, start: float, end: float) -> int:
+    elements = buffer.get_all()
+
+    def scan(min_mouse=0.0, min_nomouse=0.0, min_cat=0.0):
+        return [e.id for e in elements if
+                (start <= e.timestamp <= end) and
+                (min_mouse <= e.mouse_probability <= 100.0) and
+                (min_nomouse <= e.no_mouse_probability <= 100.0) and
+                (min_cat <= e.own_cat_probability <= 100.0)]
+
+    return (len(scan()) + len(scan(min_mouse=MIN_THRESHOLD)) +
+            len(scan(min_nomouse=MIN_THRESHOLD)) + len(scan(min_cat=MIN_THRESHOLD)))
+
+
+def measure(label: str, func, iterations: int) -> None:
+    samples = []
+    for __ in range(iterations):
+        t0 = tm.perf_counter()
+        func()
+        samples.append((tm.perf_counter() - t0) * 1e6)
+    samples.sort()
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<40} median {statistics.median(samples):9.1f} us   p95 {p95:9.1f} us")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="ImageBuffer filter query benchmark")
+    parser.add_argument("--frames", type=int, default=ImageBuffer.MAX_IMAGE_BUFFER_SIZE)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    buffer = ImageBuffer()
+    # Keep the retention policy from pruning the synthetic history.
+    buffer.set_motion_active(True)
+    start, end = fill(buffer, args.frames)
+    # A motion block covering the newest third of the buffer
+    block_start = end - (end - start) / 3
+    print(f"Buffer: {buffer.size()} frames, {buffer.get_stats()['bytes'] / 1024:.0f} KiB")
+
+    measure("motion end (4 queries), columnar", lambda: motion_end_queries(buffer, block_start, end), args.iterations)
+    measure("motion end (4 queries), python scan", lambda: motion_end_queries_python(buffer, block_start, end), args.iterations)
+    measure(
+        "5 s lookback (own cat)",
+        lambda: buffer.get_filtered_ids_recent(seconds=5.0, min_own_cat_probability=MIN_THRESHOLD),
+        args.iterations,
+    )
+    if motion_end_queries(buffer, block_start, end) != motion_end_queries_python(buffer, block_start, end):
+        print("MISMATCH between columnar and python scan results")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
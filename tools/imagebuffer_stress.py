@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Concurrency stress check for the ImageBuffer.
+
+Runs producer threads (like the model thread) that append frames, and
+consumer threads (like the backend and database threads) that query time
+ranges, assign motion blocks and delete them, all at the same time. Afterwards
+the buffer indexes are checked for consistency.
+
+Usage:
+    python tools/imagebuffer_stress.py [--producers 2] [--consumers 4] [--seconds 10]
+
+Exit code 0 if no errors occurred and the indexes are consistent, 1 otherwise.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import random
+import sys
+import threading
+import time as tm
+
+# Allow running the script directly from the repo root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.camera import ImageBuffer  # noqa: E402
+
+
+def producer(buffer: ImageBuffer, stop: threading.Event, counters: dict, lock: threading.Lock) -> None:
+    payload = b"\xff\xd8" + os.urandom(2048) + b"\xff\xd9"
+    while not stop.is_set():
+        buffer.append(
+            tm.time(), payload, None,
+            random.uniform(0, 100), random.uniform(0, 100), random.uniform(0, 100),
+            timestamp_mono=tm.monotonic(),
+        )
+        with lock:
+            counters["appended"] += 1
+
+
+def consumer(buffer: ImageBuffer, stop: threading.Event, counters: dict, lock: threading.Lock, block_ids) -> None:
+    while not stop.is_set():
+        now = tm.time()
+        ids = buffer.get_filtered_ids(now - 1.0, now, min_mouse_probability=random.uniform(0, 50))
+        buffer.get_filtered_ids_recent(seconds=0.5, min_own_cat_probability=50.0)
+        block_id = next(block_ids)
+        for id in ids:
+            buffer.update_block_id(id, block_id)
+            buffer.update_tag_id(id, "0123456789ABCDEF")
+        # Other consumers may re-assign the same elements concurrently; only the indexes must stay consistent.
+        elements = buffer.get_by_block_id(block_id)
+        for element in elements:
+            buffer.delete_by_id(element.id)
+        buffer.get_stats()
+        with lock:
+            counters["queries"] += 1
+            counters["assigned"] += len(elements)
+
+
+def check_consistency(buffer: ImageBuffer) -> list[str]:
+    """Compare the indexes against the element dict."""
+    problems = []
+    with buffer._lock:
+        ids = set(buffer._elements)
+        if set(int(id) for id in buffer._col_id if id >= 0) != ids:
+            problems.append("metadata columns do not match the elements")
+        for id, slot in buffer._slot_of.items():
+            element = buffer._elements.get(id)
+            if element is None or buffer._col_block_id[slot] != element.block_id:
+                problems.append(f"metadata slot {slot} of element {id} is stale")
+        if len(buffer._slot_of) + len(buffer._free_slots) != buffer.MAX_IMAGE_BUFFER_SIZE:
+            problems.append("metadata slots leaked")
+        indexed = set()
+        for block_id, block_ids in buffer._by_block.items():
+            for id in block_ids:
+                if id not in buffer._elements or buffer._elements[id].block_id != block_id:
+                    problems.append(f"block index entry {block_id}/{id} is stale")
+            indexed |= block_ids
+        if indexed != ids:
+            problems.append("block index does not match the elements")
+        if buffer._bytes != sum(e.nbytes for e in buffer._elements.values()):
+            problems.append("byte counter does not match the elements")
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="ImageBuffer concurrency stress check")
+    parser.add_argument("--producers", type=int, default=2)
+    parser.add_argument("--consumers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+    # Concurrent consumers delete each other's elements on purpose; keep those warnings out of the output.
+    logging.basicConfig(level=logging.ERROR)
+
+    buffer = ImageBuffer()
+    stop = threading.Event()
+    lock = threading.Lock()
+    counters = {"appended": 0, "queries": 0, "assigned": 0}
+    block_counter = iter(range(1, 1 << 30))
+    block_lock = threading.Lock()
+
+    def block_ids():
+        while True:
+            with block_lock:
+                yield next(block_counter)
+
+    threads = [threading.Thread(target=producer, args=(buffer, stop, counters, lock)) for __ in range(args.producers)]
+    threads += [
+        threading.Thread(target=consumer, args=(buffer, stop, counters, lock, block_ids()))
+        for __ in range(args.consumers)
+    ]
+    exceptions = []
+
+    def excepthook(hook_args):
+        exceptions.append(hook_args.exc_value)
+
+    threading.excepthook = excepthook
+    for t in threads:
+        t.start()
+    tm.sleep(args.seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    problems = check_consistency(buffer)
+    print(f"appended:  {counters['appended']}")
+    print(f"queries:   {counters['queries']}")
+    print(f"assigned:  {counters['assigned']}")
+    print(f"remaining: {buffer.size()}")
+    print(f"stats:     {buffer.get_stats()}")
+    for e in exceptions:
+        print(f"EXCEPTION: {e!r}")
+    for p in problems:
+        print(f"INCONSISTENT: {p}")
+    ok = not exceptions and not problems
+    print("OK" if ok else "FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""Throughput and latency of the YOLO worker pool for 1..N workers and several threads-per-worker settings.
+
+Runs the same shared-memory worker pool the model loop uses (INFERENCE_WORKERS,
+INFERENCE_THREADS_PER_WORKER) over a set of frames and keeps every worker busy, so the
+result is the sustained inference throughput of each configuration. Configurations
+that need more cores than available are skipped.
+
+Frames are read from a directory of JPEG files (e.g. images exported from the
+pictures view), or synthetic noise frames are used if no directory is given.
+
+Usage:
+    python tools/inference_worker_benchmark.py --model models/yolo/<model>/best_ncnn_model \\
+        [--frames DIR] [--imgsz 320] [--max-workers 4] [--threads 1,2,4] [--seconds 20] [--slots 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import multiprocessing
+import os
+import sys
+import time as tm
+
+import cv2
+import numpy as np
+
+# Allow running the script directly from the repo root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.model import yolo_worker_process  # noqa: E402
+from src.worker_ring import WorkerPool, WorkerRingClient  # noqa: E402
+
+
+def load_frames(directory: str | None, imgsz: int, count: int = 32) -> list[np.ndarray]:
+    if directory:
+        files = sorted(f for f in glob.glob(os.path.join(directory, "*")) if f.lower().endswith((".jpg", ".jpeg")))
+        frames = [cv2.imread(f) for f in files[:count]]
+        frames = [f for f in frames if f is not None]
+        if frames:
+            return frames
+        print(f"No JPEG frames found in '{directory}', using synthetic frames")
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, (imgsz * 3 // 4, imgsz, 3), dtype=np.uint8) for __ in range(count)]
+
+
+def load_labels(model_path: str) -> list[str]:
+    labelfile = os.path.join(os.path.dirname(os.path.abspath(model_path.rstrip("/"))), "labels.txt")
+    try:
+        with open(labelfile, "r") as f:
+            return [line.strip() for line in f if line.strip()]
+    except OSError:
+        return []
+
+
+def run_config(args, workers: int, threads: int, frames: list[np.ndarray], labels: list[str]) -> dict | None:
+    def make_start_worker(index):
+        def start_worker(input_queue, output_queue, ring_names):
+            process = multiprocessing.Process(
+                target=yolo_worker_process,
+                args=(args.model, input_queue, output_queue, ring_names, args.slots, args.imgsz,
+                      threads, "cpu", index * threads),
+                daemon=True,
+            )
+            process.start()
+            return process
+        return start_worker
+
+    pool = WorkerPool(
+        [WorkerRingClient(str(i), make_start_worker(i), args.slots, args.imgsz) for i in range(workers)],
+        dispatch=args.dispatch,
+    )
+    try:
+        if not pool.wait_ready(120.0):
+            print(f"  workers={workers} threads={threads}: model did not load")
+            return None
+        # Warm-up: one frame per worker
+        for frame in frames[:workers]:
+            pool.result(pool.submit(frame, args.imgsz, labels, [], 100), timeout=30.0)
+
+        in_flight: list[tuple[int, float]] = []
+        latencies = []
+        completed = 0
+        index = 0
+        depth = workers * args.slots
+        start = tm.monotonic()
+        while tm.monotonic() - start < args.seconds:
+            while len(in_flight) < depth:
+                job_id = pool.submit(frames[index % len(frames)], args.imgsz, labels, [], 100, timeout=0)
+                if job_id is None:
+                    break
+                in_flight.append((job_id, tm.monotonic()))
+                index += 1
+            if not in_flight:
+                tm.sleep(0.001)
+                continue
+            # Collect in submission order, like the model loop
+            job_id, submitted = in_flight.pop(0)
+            if pool.result(job_id, timeout=10.0) is not None:
+                latencies.append(tm.monotonic() - submitted)
+                completed += 1
+        elapsed = tm.monotonic() - start
+        for job_id, __ in in_flight:
+            pool.result(job_id, timeout=10.0)
+    finally:
+        pool.stop()
+
+    if not latencies:
+        return None
+    lat = np.asarray(latencies) * 1000.0
+    return {
+        "workers": workers,
+        "threads": threads,
+        "fps": completed / elapsed,
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p95_ms": float(np.percentile(lat, 95)),
+        "restarts": sum(client.restarts for client in pool.clients),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="YOLO worker pool benchmark")
+    parser.add_argument("--model", required=True, help="Path of the exported model (e.g. .../best_ncnn_model)")
+    parser.add_argument("--frames", default=None, help="Directory with JPEG frames (default: synthetic frames)")
+    parser.add_argument("--imgsz", type=int, default=320)
+    parser.add_argument("--max-workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--threads", default="1,2,4", help="Comma-separated threads-per-worker values")
+    parser.add_argument("--seconds", type=float, default=20.0, help="Measurement time per configuration")
+    parser.add_argument("--slots", type=int, default=3, help="Shared-memory slots per worker")
+    parser.add_argument("--dispatch", default=WorkerPool.DISPATCH_LEAST_LOADED,
+                        choices=[WorkerPool.DISPATCH_LEAST_LOADED, WorkerPool.DISPATCH_ROUND_ROBIN])
+    args = parser.parse_args()
+
+    cores = multiprocessing.cpu_count()
+    frames = load_frames(args.frames, args.imgsz)
+    labels = load_labels(args.model)
+    thread_options = sorted({max(1, int(t)) for t in args.threads.split(",") if t.strip()})
+
+    print(f"{cores} cores, {len(frames)} frames, imgsz {args.imgsz}, {args.dispatch} dispatch")
+    print(f"{'workers':>7} {'threads':>7} {'fps':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    results = []
+    for workers in range(1, max(1, args.max_workers) + 1):
+        for threads in thread_options:
+            if workers * threads > cores:
+                continue
+            result = run_config(args, workers, threads, frames, labels)
+            if result is None:
+                continue
+            results.append(result)
+            restarts = f"  ({result['restarts']} worker restarts)" if result["restarts"] else ""
+            print(f"{workers:>7} {threads:>7} {result['fps']:>8.2f} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f}{restarts}")
+
+    if not results:
+        print("No configuration completed.")
+        return 1
+    best = max(results, key=lambda r: r["fps"])
+    print(
+        f"Best throughput: {best['workers']} workers x {best['threads']} threads ({best['fps']:.2f} fps). "
+        f"Config: inference_workers = {best['workers']}, inference_threads_per_worker = {best['threads']}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
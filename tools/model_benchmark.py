@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Offline benchmark of the installed models on this board.
+
+Runs every installed model (TFLite versions, YOLO models in all exported formats) for
+each input size and thread count over a frame set and reports latency percentiles,
+throughput, peak memory and CPU use. Each configuration runs in its own process (see
+src/model_benchmark.py).
+
+Frames are the stored event pictures by default, or the JPEG files of --frames DIR;
+synthetic frames are used if neither has any. The results are stored per device in
+models/cache/benchmarks.json (unless --no-store) for the auto-tuner and the UI.
+
+Stop the kittyhack service first, otherwise the live model loop competes for the CPU.
+
+Usage:
+    python tools/model_benchmark.py [--list] [--models ID,...] [--backends ncnn,openvino,tflite] \\
+        [--imgsz 256,320,416] [--threads 1,2,4] [--frames DIR] [--seconds 10] [--no-store]
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import sys
+
+# Allow running the script directly from the repo root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.helper import get_device_fingerprint  # noqa: E402
+from src.model_benchmark import (  # noqa: E402
+    discover_models, run_benchmark, store_benchmark_results, benchmark_results_path,
+)
+
+
+def parse_int_list(value: str | None) -> list[int] | None:
+    if not value:
+        return None
+    return sorted({int(v) for v in value.split(",") if v.strip()})
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline model benchmark")
+    parser.add_argument("--list", action="store_true", help="Only list the models and backends found")
+    parser.add_argument("--models", default=None, help="Comma-separated model ids (default: all)")
+    parser.add_argument("--backends", default=None, help="Comma-separated backends: tflite, ncnn, openvino, pytorch")
+    parser.add_argument("--imgsz", default=None, help="Comma-separated YOLO input sizes (default: the model's size)")
+    parser.add_argument("--threads", default=None, help="Comma-separated thread counts (default: 1 and all cores)")
+    parser.add_argument("--frames", default=None, help="Directory with JPEG frames (default: stored event pictures)")
+    parser.add_argument("--frame-count", type=int, default=40, help="Number of frames to load")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Minimum measurement time per configuration")
+    parser.add_argument("--warmup", type=int, default=3, help="Warm-up frames before measuring")
+    parser.add_argument("--no-store", action="store_true", help="Do not store the results")
+    args = parser.parse_args()
+
+    backends = [b.strip() for b in args.backends.split(",")] if args.backends else None
+    specs = discover_models(backends)
+    if args.models:
+        wanted = {m.strip() for m in args.models.split(",")}
+        specs = [s for s in specs if s["model_id"] in wanted]
+    if not specs:
+        print("No models found.")
+        return 1
+
+    fingerprint = get_device_fingerprint()
+    print(f"Device: {fingerprint['model']} ({fingerprint['cores']} cores, {fingerprint['ram_mb']} MB, id {fingerprint['id']})")
+    if args.list:
+        for spec in specs:
+            print(f"  {spec['model_id']:<40} {spec['backend']:<9} {spec['model_name']}")
+        return 0
+
+    cores = multiprocessing.cpu_count()
+    thread_options = parse_int_list(args.threads) or sorted({1, cores})
+    imgsz_options = parse_int_list(args.imgsz)
+
+    print(f"{'model':<28} {'backend':<9} {'imgsz':>5} {'thr':>3} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'fps':>7} {'RSS MB':>7} {'CPU %':>6}")
+    results = []
+    for spec in specs:
+        sizes = spec["imgsz_options"] or imgsz_options or [spec.get("model_imgsz", 320)]
+        for imgsz in sizes:
+            for threads in thread_options:
+                if threads > cores:
+                    continue
+                result = run_benchmark(
+                    dict(spec, imgsz=imgsz, threads=threads), frames_dir=args.frames,
+                    frame_count=args.frame_count, seconds=args.seconds, warmup=args.warmup,
+                )
+                name = str(spec["model_name"])[:28]
+                if not result.get("ok"):
+                    print(f"{name:<28} {spec['backend']:<9} {imgsz:>5} {threads:>3} failed: {result.get('error')}")
+                    continue
+                results.append(result)
+                print(
+                    f"{name:<28} {spec['backend']:<9} {result['imgsz']:>5} {threads:>3} {result['p50_ms']:>8.1f} "
+                    f"{result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['fps']:>7.2f} "
+                    f"{result['peak_rss_mb']:>7.0f} {result['cpu_percent']:>6.0f}"
+                )
+
+    if results and not args.no_store:
+        store_benchmark_results(results, fingerprint)
+        print(f"Stored {len(results)} results in {benchmark_results_path()}")
+    return 0 if results else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""Per-frame overhead of the TFLite path outside interpreter.invoke().
+
+Compares the previous per-frame code (new resize/convert arrays, a new input tensor,
+copied outputs) with TFLiteRunner (preallocated buffers, in-place input tensor,
+output views). The time spent in invoke() is measured separately and subtracted,
+so the numbers show only the pre- and postprocessing cost per frame.
+
+With --model, a real .tflite model is used (requires tflite_runtime). With
+--synthetic, a NumPy stand-in interpreter with the tensor layout of the Kittyflap
+models (300x300x3 uint8 input, 10 detections) is used, which is enough to measure
+the overhead when no model or runtime is available.
+
+Usage:
+    python tools/tflite_runner_benchmark.py --model tflite/<version>/cv-lite-model.tflite [--frames 500]
+    python tools/tflite_runner_benchmark.py --synthetic [--float] [--frames 500]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time as tm
+
+import cv2
+import numpy as np
+
+# Allow running the script directly from the repo root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.camera import DetectedObject  # noqa: E402
+from src.tflite_runner import TFLiteRunner  # noqa: E402
+
+LABELS = ["Keine Maus", "Maus"]
+
+
+class SyntheticInterpreter:
+    """Stand-in with the tensor API of tflite_runtime's Interpreter (no model is run)."""
+
+    def __init__(self, floating: bool = False, detections: int = 10, size: int = 300):
+        dtype = np.float32 if floating else np.uint8
+        rng = np.random.default_rng(0)
+        self._tensors = {
+            0: np.zeros((1, size, size, 3), dtype=dtype),
+            1: np.sort(rng.random((1, detections, 4), dtype=np.float32), axis=2),
+            2: rng.integers(0, len(LABELS), (1, detections)).astype(np.float32),
+            3: rng.random((1, detections), dtype=np.float32),
+        }
+        self._input = [{'index': 0, 'shape': np.array([1, size, size, 3]), 'dtype': dtype}]
+        self._output = [
+            {'index': 1, 'name': 'TFLite_Detection_PostProcess'},
+            {'index': 2, 'name': 'TFLite_Detection_PostProcess:1'},
+            {'index': 3, 'name': 'TFLite_Detection_PostProcess:2'},
+        ]
+
+    def get_input_details(self):
+        return self._input
+
+    def get_output_details(self):
+        return self._output
+
+    def set_tensor(self, index, value):
+        np.copyto(self._tensors[index], value)
+
+    def get_tensor(self, index):
+        return self._tensors[index].copy()
+
+    def tensor(self, index):
+        return lambda: self._tensors[index]
+
+    def invoke(self):
+        pass
+
+
+class TimedInvoke:
+    """Wraps an interpreter and accumulates the time spent in invoke()."""
+
+    def __init__(self, interpreter):
+        self._interpreter = interpreter
+        self.invoke_s = 0.0
+
+    def __getattr__(self, name):
+        return getattr(self._interpreter, name)
+
+    def invoke(self):
+        t0 = tm.perf_counter()
+        self._interpreter.invoke()
+        self.invoke_s += tm.perf_counter() - t0
+
+
+def legacy_process(frame: np.ndarray, interpreter, labels: list[str]) -> tuple:
+    """The per-frame TFLite code before TFLiteRunner (kept here as the reference)."""
+    input_details = interpreter.get_input_details()
+    output_details = interpreter.get_output_details()
+    height, width = int(input_details[0]['shape'][1]), int(input_details[0]['shape'][2])
+    floating = input_details[0]['dtype'] == np.float32
+    outname = output_details[0]['name']
+    if 'StatefulPartitionedCall' in outname:
+        boxes_idx, classes_idx, scores_idx = 1, 3, 0
+    elif 'detected_scores:0' in outname:
+        boxes_idx, classes_idx, scores_idx = 1, 2, 0
+    else:
+        boxes_idx, classes_idx, scores_idx = 0, 1, 2
+
+    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    frame_resized = cv2.resize(frame_rgb, (width, height))
+    input_data = np.expand_dims(frame_resized, axis=0)
+    original_h, original_w, __ = frame.shape
+    if floating:
+        input_data = (np.float32(input_data) - 127.5) / 127.5
+    interpreter.set_tensor(input_details[0]['index'], input_data)
+    interpreter.invoke()
+
+    boxes = interpreter.get_tensor(output_details[boxes_idx]['index'])[0]
+    classes = interpreter.get_tensor(output_details[classes_idx]['index'])[0]
+    scores = interpreter.get_tensor(output_details[scores_idx]['index'])[0]
+    mouse_probability = no_mouse_probability = 0.0
+    detected_objects = []
+    for i in range(len(scores)):
+        ymin = int(max(1, (boxes[i][0] * original_h)))
+        xmin = int(max(1, (boxes[i][1] * original_w)))
+        ymax = int(min(original_h, (boxes[i][2] * original_h)))
+        xmax = int(min(original_w, (boxes[i][3] * original_w)))
+        object_name = str(labels[int(classes[i])])
+        probability = float(scores[i] * 100)
+        detected_objects.append(DetectedObject(
+            float(xmin / original_w * 100), float(ymin / original_h * 100),
+            float((xmax - xmin) / original_w * 100), float((ymax - ymin) / original_h * 100),
+            object_name, probability,
+        ))
+        if object_name == "Maus":
+            mouse_probability = int(probability)
+        elif object_name == "Keine Maus":
+            no_mouse_probability = int(probability)
+    return mouse_probability, no_mouse_probability, detected_objects
+
+
+def measure(name: str, process, interpreter: TimedInvoke, frames: list[np.ndarray], count: int) -> list:
+    for frame in frames[:5]:
+        process(frame)  # warm-up
+    overheads = []
+    last = None
+    for i in range(count):
+        frame = frames[i % len(frames)]
+        interpreter.invoke_s = 0.0
+        t0 = tm.perf_counter()
+        last = process(frame)
+        overheads.append((tm.perf_counter() - t0 - interpreter.invoke_s) * 1e6)
+    overheads.sort()
+    print(
+        f"{name:<8} overhead per frame: median {statistics.median(overheads):8.1f} us, "
+        f"p95 {overheads[int(len(overheads) * 0.95)]:8.1f} us"
+    )
+    return last
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="TFLite per-frame overhead benchmark")
+    parser.add_argument("--model", help="Path of a .tflite model (requires tflite_runtime)")
+    parser.add_argument("--synthetic", action="store_true", help="Use a stand-in interpreter instead of a model")
+    parser.add_argument("--float", action="store_true", help="Synthetic float32 input model")
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--resolution", default="800x600", help="Camera frame size")
+    args = parser.parse_args()
+
+    if args.model:
+        from tflite_runtime.interpreter import Interpreter
+        raw = Interpreter(model_path=args.model, num_threads=1)
+        raw.allocate_tensors()
+        labelfile = os.path.join(os.path.dirname(args.model), "labels.txt")
+        labels = LABELS
+        if os.path.exists(labelfile):
+            with open(labelfile, "r") as f:
+                labels = [line.strip() for line in f if line.strip()]
+    elif args.synthetic:
+        raw = SyntheticInterpreter(floating=args.float)
+        labels = LABELS
+    else:
+        parser.error("either --model or --synthetic is required")
+
+    w, h = (int(v) for v in args.resolution.lower().split("x"))
+    rng = np.random.default_rng(1)
+    frames = [rng.integers(0, 255, (h, w, 3), dtype=np.uint8) for __ in range(8)]
+
+    interpreter = TimedInvoke(raw)
+    runner = TFLiteRunner(interpreter, labels)
+    legacy_result = measure("legacy", lambda f: legacy_process(f, interpreter, labels), interpreter, frames, args.frames)
+    runner_result = measure("runner", runner.process, interpreter, frames, args.frames)
+
+    # Both paths must decode the same detections
+    same = legacy_result[:2] == runner_result[:2] and [
+        (o.x, o.y, o.width, o.height, o.object_name, o.probability) for o in legacy_result[2]
+    ] == [(o.x, o.y, o.width, o.height, o.object_name, o.probability) for o in runner_result[2]]
+    print("results identical" if same else "RESULTS DIFFER")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())